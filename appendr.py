@@ -6,6 +6,7 @@ from webob.exc import *
 from google.appengine.runtime import apiproxy_errors
 from google.appengine.runtime import DeadlineExceededError
 from google.appengine.api import urlfetch
+from google.appengine.api import memcache
 from google.appengine.api import taskqueue
 from google.appengine.ext import db
 from google.appengine.ext.db import polymodel
@@ -25,6 +26,16 @@ import appendr_cfg
 import re
 import traceback
 import base64
+import hashlib
+import mmap
+import collections
+import threading
+import time
+import string
+import shutil
+import bisect
+import urlparse
+import gzip
 
 ################################################################################
 # Config parameters and constants
@@ -39,9 +50,115 @@ if DEBUG:
 # How long should user agents cache CORS access control OPTIONS, in seconds
 CORS_ACCESS_CONTROL_MAX_AGE = 60*60*24*30 # 30 days
 
-# How many task queues exist for queuing append tasks
+# How many task queues exist for queuing append tasks, and their names, which
+# may be configured instead (all of them must be defined in queue.yaml)
 NUMBER_OF_APPEND_TASK_QUEUES = 10
 APPEND_TASK_QUEUES_PREFIX = 'queue'
+APPEND_TASK_QUEUES = getattr(
+    appendr_cfg, 'append_task_queues',
+    [APPEND_TASK_QUEUES_PREFIX + str(queue_num)
+     for queue_num in range(NUMBER_OF_APPEND_TASK_QUEUES)])
+
+# Number of points of each append task queue on the consistent hash ring which
+# assigns bins to queues (more points spread bins more evenly)
+QUEUE_HASH_RING_POINTS_PER_QUEUE = 100
+
+# Number of bins reassigned to queues per request of the rebalancing job, and
+# the maximum number of bins counted per queue in the queue load report
+QUEUE_REBALANCE_BATCH_SIZE = 200
+QUEUE_REPORT_MAX_BINS = 10000
+
+# Dedicated task queues for bins with a high rate of append requests (all of
+# them must be defined in queue.yaml), so that these bins don't delay appends
+# for other bins in the same queue. A bin is promoted to a free dedicated
+# queue when it gets more than HOT_BIN_PROMOTE_TASKS_PER_MINUTE tasks in two
+# consecutive minutes, and demoted back when it gets less than
+# HOT_BIN_DEMOTE_TASKS_PER_MINUTE tasks in each of the last
+# HOT_BIN_DEMOTE_MINUTES minutes
+HOT_BIN_QUEUES = getattr(appendr_cfg, 'hot_bin_queues',
+                         ['hotqueue0', 'hotqueue1', 'hotqueue2', 'hotqueue3'])
+HOT_BIN_PROMOTE_TASKS_PER_MINUTE = 60
+HOT_BIN_DEMOTE_TASKS_PER_MINUTE = 20
+HOT_BIN_DEMOTE_MINUTES = 5
+INGEST_COUNTER_KEY_PREFIX = 'ingest/'
+# For how long the counters of tasks created in a minute are kept, in seconds
+INGEST_COUNTER_SECONDS = (HOT_BIN_DEMOTE_MINUTES + 1) * 60
+
+# For how long an append task holds the lease on the data of a bin, in
+# seconds. Leases are released when the append finishes, so this only
+# matters for appends whose request was aborted, and must not be shorter than
+# the deadline of task requests
+BIN_LEASE_SECONDS = 10 * 60
+BIN_LEASE_HOLDER_LENGTH = 16
+# After how long an append task is executed again if the lease on the data of
+# its bin is held by another append, in seconds
+BIN_LEASE_RETRY_SECONDS = 2
+
+# Memcache key prefix under which the last known rate limit of storage
+# service API tokens is kept, and for how long, in seconds. Requests on
+# behalf of a token are not made while its rate limit is exhausted
+RATE_LIMIT_CACHE_KEY_PREFIX = 'rate_limit/'
+RATE_LIMIT_CACHE_SECONDS = 60 * 60
+# How long to wait after a rate limited response which doesn't say when to
+# retry, in seconds
+RATE_LIMIT_DEFAULT_RETRY_SECONDS = 60
+
+# Number of consecutive failed storage service API requests to a host, or
+# with a token, after which further requests to that host or with that
+# token are paused (the circuit breaker opens), for how long requests are
+# paused, and after how long without failures the count is reset, in
+# seconds. Once the pause is over, the next request is made; if it fails
+# again, requests are paused again
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+CIRCUIT_BREAKER_OPEN_SECONDS = 60
+CIRCUIT_BREAKER_RESET_SECONDS = 10 * 60
+CIRCUIT_BREAKER_KEY_PREFIX = 'circuit/'
+# Status codes of responses which are failures of the token, not the host
+CIRCUIT_BREAKER_TOKEN_STATUS_CODES = [401, 403]
+
+# Status codes of storage service API errors which fail again if retried,
+# so append tasks which get them fail without being retried
+PERMANENT_ERROR_STATUS_CODES = [400, 401, 403, 404, 410, 413, 422]
+
+# Classes of errors of append tasks
+ERROR_CLASS_PERMANENT = 'permanent'
+ERROR_CLASS_THROTTLED = 'throttled'
+ERROR_CLASS_TRANSIENT = 'transient'
+
+# Whether API and HTML responses are compressed with gzip for clients which
+# accept it, and the minimum size of compressed responses, in bytes. App
+# Engine compresses responses itself for such clients and doesn't pass on a
+# Content-Encoding header set by the application, so this is meant for
+# deployments behind other frontends
+GZIP_RESPONSES = getattr(appendr_cfg, 'gzip_responses', False)
+GZIP_MIN_BYTES = 1024
+
+# Memcache key prefix of the counters of status changes of the tasks of
+# bins, which requests waiting for task status changes watch
+TASK_CHANGES_KEY_PREFIX = 'task_changes/'
+# Maximum time that requests wait for task status changes, which must be
+# shorter than the request deadline, and how often they check for changes,
+# starting with the minimum interval and doubling it up to the maximum, in
+# seconds
+TASK_WAIT_MAX_SECONDS = 25
+TASK_WAIT_MIN_POLL_SECONDS = 0.5
+TASK_WAIT_MAX_POLL_SECONDS = 4
+# Maximum number of requests of an instance that wait for task status changes
+# at the same time (further requests are answered without waiting)
+TASK_WAIT_MAX_WAITERS = 10
+# How long clients wait before reconnecting to an event stream, in
+# milliseconds
+TASK_EVENTS_RETRY_MILLISECONDS = 1000
+
+# Header of append task requests with the name of the Task, for requests that
+# are not named by the Task name (e.g. tasks forwarded to another queue)
+TASK_NAME_HEADER = 'X-Appendr-TaskName'
+
+# Should the append worker coalesce all queued append tasks for a bin into a
+# single read-modify-write, and how many tasks/bytes may be coalesced at once
+APPEND_COALESCE_ENABLED = True
+APPEND_COALESCE_MAX_TASKS = 100
+APPEND_COALESCE_MAX_BYTES = 512*1024
 
 # Jinja environment global variable
 JINJA_ENVIRONMENT = jinja2.Environment(
@@ -54,6 +171,8 @@ MIME_TYPE_FORM = 'application/x-www-form-urlencoded'
 MIME_TYPE_TEXT = 'text/plain'
 MIME_TYPE_HTML = 'text/html'
 MIME_TYPE_CSV = 'text/csv'
+MIME_TYPE_NDJSON = 'application/x-ndjson'
+MIME_TYPE_EVENT_STREAM = 'text/event-stream'
 
 # HTML Template names
 TEMPLATE_BASE = 'base.html'
@@ -70,35 +189,97 @@ CSV_DELIMITER = ','
 CSV_QUOTECHAR = '"'
 JSON_INDENT = 2
 
+# Opening, separator and closing strings of a top-level JSON array serialized
+# with JSON_INDENT, used for splicing new elements into an existing document
+JSON_ARRAY_OPEN, JSON_ARRAY_SEPARATOR, JSON_ARRAY_CLOSE = \
+    json.dumps([0, 0], indent=JSON_INDENT).split('0')
+
 # urlfetch params
 URLFETCH_DEADLINE = 10
 URLFETCH_VALIDATE_CERTS = True
 
-# Length of Bin and Task ids
+# How long is the last content written to a bin kept in memcache, in seconds,
+# and how large may that content be (memcache values are limited to 1MB)
+CONTENT_CACHE_SECONDS = 60*60
+CONTENT_CACHE_MAX_BYTES = 900*1024
+CONTENT_CACHE_KEY_PREFIX = 'content/'
+
+# How long is the storage user id of an API token kept in memcache, and how
+# long is a token that the storage service rejected remembered, in seconds
+USER_ID_CACHE_SECONDS = 60*60
+USER_ID_CACHE_REJECTED_SECONDS = 5*60
+USER_ID_CACHE_KEY_PREFIX = 'user_id/'
+# Status codes of storage service responses which mean that a token is invalid
+USER_ID_CACHE_REJECTED_STATUS_CODES = [401, 403]
+
+# How many of the most recently appended key-value datasets are kept for each
+# bin, how large they may be when serialized (the BinTail entity is limited to
+# 1MB), and how many are returned by default
+TAIL_CACHE_SIZE = 1000
+TAIL_CACHE_MAX_BYTES = 900*1024
+TAIL_CACHE_KEY_PREFIX = 'tail/'
+DEFAULT_TAIL_RECORDS = 100
+
+# Maximum number of bins kept in the in-process bin cache of an instance, and
+# for how long, in seconds (bins changed by other instances are seen by this
+# instance after at most this long)
+BIN_CACHE_SIZE = 1000
+BIN_CACHE_SECONDS = 60
+
+# Default and maximum number of bins or tasks returned in a single response,
+# and the number of most recent tasks included in the information of a bin
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+BIN_INFO_TASKS_LIMIT = 20
+
+# Length of Bin and Task ids, and of the creation time prefix of Task ids (8
+# base 62 digits of milliseconds since the epoch last until the year 8900)
 BIN_NAME_LENGTH = 20
 TASK_NAME_LENGTH = 20
+TASK_NAME_TIME_LENGTH = 8
+
+# Digits of base 62 numbers, in ASCII order so that numbers of the same length
+# are sorted the same as their encodings
+BASE62_DIGITS = string.digits + string.ascii_uppercase + string.ascii_lowercase
 
 # Storage backends
 STORAGE_BACKEND_GIST = 'github-gist'
 STORAGE_BACKEND_GITHUB_REPO = 'github-repo'
 STORAGE_BACKEND_DROPBOX = 'dropbox'
-SUPPORTED_STORAGE_BACKENDS = {
-    STORAGE_BACKEND_GIST : 0,
-    STORAGE_BACKEND_DROPBOX : 1,
-    STORAGE_BACKEND_GITHUB_REPO : 2
-}
+STORAGE_BACKEND_LOCAL_FS = 'local-fs'
+# Registry of storage backends, maps storage backend ids to the Bin
+# subclasses which implement them (see register_storage_backend)
+SUPPORTED_STORAGE_BACKENDS = {}
 DEFAULT_STORAGE_BACKEND = STORAGE_BACKEND_GIST
 
+# Root directory for the local filesystem storage backend, which is only
+# enabled if the root is configured, and permissions of created files
+LOCAL_FS_ROOT = getattr(appendr_cfg, 'local_fs_root', None)
+LOCAL_FS_FILE_MODE = 0644
+LOCAL_FS_TEMP_SUFFIX = '.tmp'
+
+# Size of chunks in which raw content of local files is sent, in bytes
+LOCAL_FS_CHUNK_SIZE = 64*1024
+
 # Default format for serializing date and time
 DEFAULT_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
 
 # Supported output formats for external service and default values
 # (because gists don't support empty files)
-SUPPORTED_OUTPUT_EXTERNAL_DATA_MIME_TYPES = [MIME_TYPE_JSON, MIME_TYPE_CSV]
+SUPPORTED_OUTPUT_EXTERNAL_DATA_MIME_TYPES = [MIME_TYPE_JSON,
+                                             MIME_TYPE_CSV,
+                                             MIME_TYPE_NDJSON]
 DEFAULT_OUTPUT_EXTERNAL_DATA_MIME_TYPE = MIME_TYPE_JSON
 OUTPUT_FORMATS_EMPTY_DATA = {
     MIME_TYPE_JSON : '[]\n',
-    MIME_TYPE_CSV : 'date_created\n'
+    MIME_TYPE_CSV : 'date_created\n',
+    MIME_TYPE_NDJSON : '\n'
+}
+APPEND_ONLY_OUTPUT_FORMATS = [MIME_TYPE_CSV, MIME_TYPE_NDJSON]
+OUTPUT_FORMATS_FILE_EXTENSIONS = {
+    MIME_TYPE_JSON : 'json',
+    MIME_TYPE_CSV : 'csv',
+    MIME_TYPE_NDJSON : 'ndjson'
 }
 
 # Supported output formats for appendr application
@@ -107,13 +288,44 @@ SUPPORTED_OUTPUT_APPENDR_MIME_TYPES = [MIME_TYPE_HTML,
                                        MIME_TYPE_JSON]
 DEFAULT_OUTPUT_APPENDR_MIME_TYPE = MIME_TYPE_JSON
 
+# Supported output formats for recently appended data of a bin
+SUPPORTED_OUTPUT_TAIL_MIME_TYPES = [MIME_TYPE_JSON,
+                                    MIME_TYPE_CSV,
+                                    MIME_TYPE_NDJSON,
+                                    MIME_TYPE_TEXT]
+
 # Supported input mime types
 SUPPORTED_INPUT_PARAMS_MIME_TYPES = [MIME_TYPE_FORM, MIME_TYPE_JSON]
-SUPPORTED_APPEND_DATA_MIME_TYPES = [MIME_TYPE_FORM, MIME_TYPE_JSON]
+SUPPORTED_APPEND_DATA_MIME_TYPES = [MIME_TYPE_FORM,
+                                    MIME_TYPE_JSON,
+                                    MIME_TYPE_CSV,
+                                    MIME_TYPE_NDJSON]
+
+# Maximum number of key-value datasets and size of request body for a single
+# append request, and maximum size of the data of the request as stored in
+# the Task entity, which is limited to 1MB (JSON escaping can make the data
+# larger than the request body)
+APPEND_MAX_RECORDS = 1000
+APPEND_MAX_BYTES = 512*1024
+TASK_PAYLOAD_MAX_BYTES = 1000*1024
 
 # Default filename into which data will be stored
 DEFAULT_FILENAME = 'appendr_data.%s'
 
+# Filename of segments of bin data after the first one, constructed from the
+# filename of the first segment, e.g. appendr_data.0003.json
+SEGMENT_FILENAME = '%s.%04d%s'
+
+# Supported periods for rotating bin data to a new segment and the datetime
+# formats which are equal for dates in the same period
+ROTATION_PERIOD_HOUR = 'hour'
+ROTATION_PERIOD_DAY = 'day'
+ROTATION_PERIOD_FORMATS = {
+    ROTATION_PERIOD_HOUR : '%Y-%m-%dT%H',
+    ROTATION_PERIOD_DAY : '%Y-%m-%d'
+}
+SUPPORTED_ROTATION_PERIODS = ROTATION_PERIOD_FORMATS.keys()
+
 # Default message that will be set in the Gist description if the backend
 # is Gist
 DEFAULT_GIST_MESSAGE = ('Gist created automatically by Appendr. '
@@ -128,12 +340,18 @@ OAUTH_DROPBOX_CLIENT_SECRET = appendr_cfg.dropbox_client_secret
 # Route names
 ROUTE_NAME_INDEX = 'main'
 ROUTE_NAME_BIN = 'bin'
+ROUTE_NAME_BIN_CONTENT = 'bin_content'
+ROUTE_NAME_BIN_DATA = 'bin_data'
 ROUTE_NAME_BINS = 'bins'
 ROUTE_NAME_TASKS = 'tasks'
 ROUTE_NAME_TASK_STATUS = 'task_status'
+ROUTE_NAME_TASK_EVENTS = 'task_events'
 ROUTE_NAME_TASK_APPEND = 'task_append'
 ROUTE_NAME_TASK_BIN_CLEANUP = 'task_bin_cleanup'
 ROUTE_NAME_TASK_STATUS_CLEANUP = 'task_status_cleanup'
+ROUTE_NAME_TASK_QUEUE_REBALANCE = 'task_queue_rebalance'
+ROUTE_NAME_TASK_QUEUE_REPORT = 'task_queue_report'
+ROUTE_NAME_TASK_HOT_BIN_DEMOTION = 'task_hot_bin_demotion'
 ROUTE_NAME_OAUTH_GITHUB = 'oauth_github'
 ROUTE_NAME_OAUTH_DROPBOX = 'oauth_dropbox'
 
@@ -141,6 +359,27 @@ ROUTE_NAME_OAUTH_DROPBOX = 'oauth_dropbox'
 TASK_CLEANUP_MAX_AGE = 24
 BIN_CLEANUP_MAX_AGE = 24*40
 
+# Number of entities deleted per datastore call by cleanup jobs (bins are
+# deleted in smaller batches since their remote content is deleted one by
+# one), how long a single cleanup request may run before the job is continued
+# in a new task, in seconds (requests are limited to 10 minutes), and how long
+# a cleanup job that has made no progress is considered to be running, in hours
+CLEANUP_BATCH_SIZE = 500
+BIN_CLEANUP_BATCH_SIZE = 50
+CLEANUP_REQUEST_SECONDS = 8*60
+CLEANUP_STALLED_HOURS = 1
+
+# Whether or not the files storing the data of a bin on the external storage
+# service are deleted when the bin is cleaned up
+BIN_CLEANUP_DELETE_REMOTE_CONTENT = \
+    getattr(appendr_cfg, 'bin_cleanup_delete_remote_content', False)
+
+# Cleanup job names and statuses
+CLEANUP_JOB_BINS = 'bins'
+CLEANUP_JOB_TASKS = 'tasks'
+CLEANUP_STATUS_RUNNING = 'running'
+CLEANUP_STATUS_COMPLETED = 'completed'
+
 # How long for will a task be retried before giving up
 TASK_RETRY_HOURS = 24*2
 
@@ -153,6 +392,11 @@ TASK_STATUS_FAILED = 'failed'
 # Regular expression to extract dropbox share IDs from URLs
 DROPBOX_ID_REGEX = re.compile(r'https://www\.dropbox\.com/s/(\w+?)/.*')
 
+# Regular expression to recognize 403 responses of storage services which
+# reject requests because of a rate limit, e.g. GitHub secondary rate limits,
+# which don't always have rate limit headers
+RATE_LIMIT_MESSAGE_REGEX = re.compile(r'rate limit|abuse', re.IGNORECASE)
+
 # Error messages
 ERROR_MSG_NON_EMPTY_STRING_PARAM = ('Invalid value for parameter %s: %s. '
                                     'Parameter must be a non-empty string.')
@@ -162,6 +406,25 @@ ERROR_MSG_DEFINED = 'Parameter %s must be defined.'
 ERROR_MSG_NOT_ACCEPTABLE = ('The application can not return response in the '
                            'requested mime type. Accept header was: %s. '
                            'Acceptable mime types are: %s.')
+ERROR_MSG_POSITIVE_INTEGER_PARAM = ('Invalid value for parameter %s: %s. '
+                                    'Parameter must be a positive integer.')
+ERROR_MSG_CURSOR_PARAM = ('Invalid value for parameter %s: %s. '
+                          'Parameter must be a cursor returned in a link to '
+                          'the next page of the same listing.')
+ERROR_MSG_LOCAL_FILENAME_PARAM = ('Invalid value for parameter %s: %s. '
+                                  'Parameter must be a filename without a '
+                                  'directory.')
+ERROR_MSG_OBJECT_TOO_LARGE = ('Appending the data would make the file %s '
+                              'larger than the maximum of %s bytes of the '
+                              'storage service. Set rotation_max_bytes to '
+                              'write data to multiple files.')
+ERROR_MSG_RATE_LIMIT = ('The rate limit of the storage service API for the '
+                        'token is exceeded. Retry in %s seconds.')
+ERROR_MSG_CIRCUIT_OPEN = ('Requests to the storage service API are paused '
+                          'after repeated failures. Retry in %s seconds.')
+ERROR_MSG_TOKEN_REJECTED = ('The storage service API rejected the token '
+                            'repeatedly. Requests with the token are paused '
+                            'for %s seconds.')
 ERROR_MSG_NON_REPO_STRING_PARAM = ('Invalid value for parameter %s: %s. '
                                    'Parameter must be a non-empty string with '
                                    'format owner/repo.')
@@ -236,6 +499,44 @@ def validate_non_empty_string(param_name, param_value):
     if not (isinstance(param_value, basestring) and param_value != ''):
         raise HTTPClientError(ERROR_MSG_NON_EMPTY_STRING_PARAM % (param_name, param_value))
 
+def validate_local_filename(param_name, param_value):
+    """ Validates that the value of a parameter is a plain filename which
+        can't refer to a file outside of a directory.
+
+    Args:
+        param_name: name of parameter
+        param_value: value of parameter
+
+    Raises:
+        HTTPClientError if param_value is not a non-empty string or contains
+        directory components.
+    """
+
+    validate_non_empty_string(param_name, param_value)
+
+    if os.path.basename(param_value) != param_value or \
+       param_value.startswith('.'):
+        raise HTTPClientError(ERROR_MSG_LOCAL_FILENAME_PARAM % \
+                              (param_name, param_value))
+
+def validate_positive_integer(param_name, param_value):
+    """ Validates that the value of a parameter is a positive integer.
+
+    Args:
+        param_name: name of parameter
+        param_value: value of parameter
+
+    Raises:
+        HTTPClientError if param_value is not a positive integer.
+    """
+
+    if isinstance(param_value, basestring) and param_value.isdigit():
+        param_value = int(param_value)
+
+    if not (isinstance(param_value, (int, long)) and param_value > 0):
+        raise HTTPClientError(ERROR_MSG_POSITIVE_INTEGER_PARAM % \
+                              (param_name, param_value))
+
 def validate_element_of_list(param_name, param_value, allowed_values):
     """ Validates that the value of a parameter is a member of a list.
 
@@ -282,1516 +583,4557 @@ def validate_input_param(params, param_name, must_exist,
     else:
         params[param_name] = default
 
-def get_request_params(request):
-    """ Extracts a dictionary of params passed in the HTTP request, based on
-        the content type of the request. For example, for url-encoded params
-        these are just extracted from the request, but for JSON params in the
-        body - these are parsed via JSON into a dict and then returned.
+def get_page_params(params):
+    """ Validates the pagination parameters of a listing request and sets their
+        default values.
 
     Args:
-        request: the HTTP request
+        params: dictionary of request parameters
 
     Returns:
-        A dict of HTTP request parameters.
+        Tuple of the maximum number of entities on the requested page, and the
+        cursor of that page or None for the first page.
 
     Raises:
-        HTTPUnsupportedMediaType if request content type is unsupported.
+        HTTPClientError if the parameters are not valid.
     """
 
-    params = None
-    if request.content_type == MIME_TYPE_FORM or request.method == 'GET':
-        params = dict(request.params.copy())
-    elif request.content_type == MIME_TYPE_JSON:
-        params = json.loads(request.body)
-    else:
-        raise HTTPUnsupportedMediaType('Unsupported body mime type: ' + \
-                                        request.content_type)
+    validate_input_param(params, 'limit', False,
+                         validate_positive_integer,
+                         DEFAULT_PAGE_SIZE)
 
-    logging.debug('Parsed request params: %s.' % \
-                  json.dumps(params, indent=JSON_INDENT))
-    return params
+    validate_input_param(params, 'cursor', False,
+                         validate_non_empty_string,
+                         None)
 
-def get_queue_name_for_bin(bin_name):
-    """ Gets the name of the task queue which stores append tasks for a
-        specific bin. This is done by "sharding" tasks to queues based on
-        the name of the bin.
+    return min(int(params['limit']), MAX_PAGE_SIZE), params['cursor']
+
+def fetch_page(query, limit, cursor):
+    """ Fetches a page of results of a datastore query.
 
     Args:
-        bin_name: name of a bin
+        query: the datastore query
+        limit: maximum number of entities on the page
+        cursor: cursor from which the page starts, or None for the first page
 
     Returns:
-        Name of task queue responsible for storing tasks for a bin_name bin.
+        Tuple of the list of entities on the page and the cursor of the next
+        page. The cursor is None if the page is not full, so the last page
+        of results may be empty.
+
+    Raises:
+        HTTPClientError if cursor is not a valid cursor for the query.
     """
 
-    queue_num = sum([ord(ch) for ch in bin_name]) % NUMBER_OF_APPEND_TASK_QUEUES
-    return APPEND_TASK_QUEUES_PREFIX + str(queue_num)
+    try:
+        if cursor is not None:
+            query.with_cursor(cursor)
+        entities = query.fetch(limit)
+    except (db.BadValueError, db.BadRequestError):
+        raise HTTPClientError(ERROR_MSG_CURSOR_PARAM % ('cursor', cursor))
 
-def get_data_csv_key_list(params):
-    """ Sorts keys of a dictionary, with the creation date key in first place.
-        This is used for CSV output in order to have the creation date in
-        first place always, and the other keys sorted (in the same order).
+    next_cursor = None
+    if len(entities) == limit:
+        next_cursor = query.cursor()
+
+    return entities, next_cursor
+
+def get_page_url(url, params, cursor):
+    """ Constructs the URL of a page of a listing.
 
     Args:
-        params: dictionary object
+        url: URL of the listing, without the query string
+        params: dictionary of query string parameters of the listing
+        cursor: cursor from which the page starts
 
     Returns:
-        List of keys in params with 'date_created' key in first place
+        String URL of the page.
     """
 
-    keys = params.keys()
-    keys.remove('date_created')
-    keys.sort()
-    keys.insert(0, 'date_created')
-    return keys
+    params = dict(params)
+    params['cursor'] = cursor
 
-def get_dict_values_sorted(params, keys):
-    """ Gets a list of dict values sorted by the order of keys in another list.
+    return url + '?' + urllib.urlencode(params)
+
+def set_next_page_link(response, next_url):
+    """ Adds the link to the next page of a listing to an HTTP response, as a
+        Link header with the "next" relation.
 
     Args:
-        params: dictionary-like object
-        keys: list of keys
+        response: the HTTP response
+        next_url: URL of the next page, or None if there is no next page
+    """
+
+    response.headers.add_header('Access-Control-Expose-Headers', 'Link')
+
+    if next_url is not None:
+        response.headers['Link'] = '<%s>; rel="next"' % (next_url,)
+
+def get_etag(*values):
+    """ Constructs a strong entity tag for a response from the values that
+        the response is derived from. The version of the application is
+        included, since another version may represent the same values
+        differently.
+
+    Args:
+        values: values that the response is derived from
 
     Returns:
-        List of values in params, but sorted according to order of related keys
-        in keys.
+        String quoted entity tag.
     """
 
-    return [params.get(key) for key in keys]
+    values = (os.environ.get('CURRENT_VERSION_ID'),) + values
+    return '"%s"' % (hashlib.md5(repr(values)).hexdigest(),)
 
-def append_data_csv(old_content, params):
-    """ Appends key-value data to an existing CSV document.
+def is_not_modified(request, response, etag):
+    """ Sets the ETag header of a response, and checks if the client already
+        has the same representation, based on the If-None-Match header of the
+        request. If so, the response becomes a 304 Not Modified response,
+        and its content must not be written.
 
     Args:
-        old_content: string with existing CSV data
-        params: dictionary-like object with key-value data
+        request: the HTTP request
+        response: the HTTP response
+        etag: quoted entity tag of the representation, see get_etag
 
     Returns:
-        String representing CSV data that contains both old_content and params,
-        where params was appended as a new row of CSV data.
+        True if the representation was not modified.
     """
 
-    key_list = get_data_csv_key_list(params)
+    response.headers['ETag'] = etag
+    response.headers.add_header('Access-Control-Expose-Headers', 'ETag')
 
-    output = cStringIO.StringIO()
-    csv_writer = csv.writer(
-        output,
-        delimiter=CSV_DELIMITER,
-        quotechar=CSV_QUOTECHAR,
-        quoting=csv.QUOTE_MINIMAL)
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is None:
+        return False
 
-    if old_content == OUTPUT_FORMATS_EMPTY_DATA[MIME_TYPE_CSV]:
-        csv_writer.writerow(key_list)
+    # If-None-Match uses the weak comparison of entity tags
+    client_etags = [client_etag.strip() for client_etag in
+                    if_none_match.split(',')]
+    client_etags = [client_etag[2:] if client_etag.startswith('W/') \
+                    else client_etag for client_etag in client_etags]
 
-    data = get_dict_values_sorted(params, key_list)
-    csv_writer.writerow(data)
+    if etag not in client_etags and '*' not in client_etags:
+        return False
 
-    if old_content == OUTPUT_FORMATS_EMPTY_DATA[MIME_TYPE_CSV]:
-        return output.getvalue()
-    else:
-        return old_content+output.getvalue()
+    response.set_status(304)
+    return True
 
-def append_data_json(old_content, params):
-    """ Appends key-value data to an existing JSON document.
+def accepts_gzip(request):
+    """ Checks whether the client accepts responses compressed with gzip,
+        based on the Accept-Encoding header of a request.
 
     Args:
-        old_content: string with existing JSON data, represented as an array of
-                     sets of key-value pairs (e.g. [{...}, {...}, ...])
-        params: dictionary-like object with key-value data
+        request: the HTTP request
 
     Returns:
-        String representing JSON data that contains both old_content and params,
-        where params was appended as a new element in the top-level JSON array.
+        True if gzip is accepted.
     """
 
-    json_data = json.loads(old_content)
-    json_data.append(params)
-    return json.dumps(json_data, indent=JSON_INDENT)
-
-def append_data(old_content, output_format, params):
-    """ Appends a key-value data to an existing document based on the format
-        of the document.
+    for coding in request.headers.get('Accept-Encoding', '').split(','):
+        coding = [part.strip() for part in coding.split(';')]
+        if coding[0].lower() in ['gzip', 'x-gzip'] and \
+           'q=0' not in coding[1:] and 'q=0.0' not in coding[1:]:
+            return True
 
-    Args:
-        old_content: string representing existing data/document
-        output_format: mime type format of the document
-        params: dictionary-like object with key-value data
+    return False
 
-    Returns:
-        String document with existing and new data appended.
+def write_content(request, response, content):
+    """ Writes the content of a response, compressed with gzip if that is
+        enabled, the client accepts it and the content is large enough.
 
-    Raises:
-        HTTPServerError if output_format is unsupported by application.
+    Args:
+        request: the HTTP request
+        response: the HTTP response
+        content: string content of the response
     """
 
-    params['date_created'] = \
-        params['date_created'].strftime(DEFAULT_DATETIME_FORMAT)
+    if GZIP_RESPONSES:
+        response.headers.add_header('Vary', 'Accept-Encoding')
 
-    logging.debug('Appending data:\n%s' % json.dumps({
-      'old_data' : old_content,
-      'new_data' : params,
-      'output_format' : output_format
-    }, indent=JSON_INDENT))
+        if isinstance(content, unicode):
+            content = content.encode('utf-8')
 
-    if output_format == MIME_TYPE_CSV:
-        return append_data_csv(old_content, params)
+        if len(content) >= GZIP_MIN_BYTES and accepts_gzip(request):
+            compressed = cStringIO.StringIO()
+            gzip_file = gzip.GzipFile(fileobj=compressed, mode='wb')
+            gzip_file.write(content)
+            gzip_file.close()
 
-    elif output_format == MIME_TYPE_JSON:
-        return append_data_json(old_content, params)
+            content = compressed.getvalue()
+            response.headers['Content-Encoding'] = 'gzip'
 
-    else:
-        # will actually never happen since we catch this before
-        raise HTTPServerError('Invalid output format: %s' % (output_format),)
+    response.out.write(content)
 
-def setHTTPOptionsResponse(response,
-                           cors_origin='*',
-                           cors_methods=['GET'],
-                           cors_headers=['Content-Type']):
-    """ Constructs the response to HTTP OPTIONS request.
+def encode_base62(number, length):
+    """ Encodes a non-negative integer as a base 62 number of fixed length.
 
     Args:
-        response: the HTTP response object
-        cors_origin: domains for which cross-domains should be allowed via
-                     CORS
-        cors_methods: list of methods to be allowed via CORS and regular HTTP
-        cors_headers: list of HTTP headers to be exposed to cross-domain calls
+        number: the integer, less than 62 to the power of length
+        length: number of digits of the encoded number
+
+    Returns:
+        String of length base 62 digits, padded with zeros.
     """
 
-    headers = response.headers
-    headers.add_header('Access-Control-Allow-Origin', cors_origin)
-    headers.add_header('Access-Control-Allow-Methods', ', '.join(cors_methods))
-    headers.add_header('Access-Control-Allow-Headers', ', '.join(cors_headers))
-    headers.add_header('Access-Control-Max-Age', CORS_ACCESS_CONTROL_MAX_AGE)
-    headers.add_header('Allow', ', '.join(['OPTIONS'] + cors_methods))
-    response.set_status(200)
+    digits = []
+    for i in range(length):
+        number, digit = divmod(number, len(BASE62_DIGITS))
+        digits.append(BASE62_DIGITS[digit])
 
-def extractHTTPerrorInfo(request, response, exception):
-    """ Extracts request/response information for error handling.
+    return ''.join(reversed(digits))
+
+def get_rate_limit_cache_key(api_token):
+    """ Constructs the memcache key under which the rate limit of an OAuth
+        token is kept. The key contains a hash of the token, so that tokens
+        are not stored in memcache.
 
     Args:
-        request: HTTP request object
-        response: HTTP response object
-        exception: Exception that occurred during request processing.
+        api_token: OAuth API token for a backend storage service.
 
     Returns:
-        Dictionary with information for error handling: request url ("url"),
-        request HTTP method ("method"), request body ("body"), request headers
-        ("headers"), response code ("response_code"), response title
-        ("response_title"), details about the error ("details") and the
-        exception stack trace ("stack_trace").
+        String memcache key.
     """
-    info = dict()
-
-    info['url'] = request.url
-    info['method'] = request.method
-    info['body'] = request.body
-    info['headers'] = dict(request.headers)
-    info['response_code'] = exception.code
-    info['response_title'] = exception.title
-    info['details'] = str(exception)
-    info['stack_trace'] = traceback.format_exc()
 
-    return info
+    return RATE_LIMIT_CACHE_KEY_PREFIX + \
+           hashlib.sha256(api_token.encode('utf-8')).hexdigest()
 
-def serialize_error(mime_type, error_info):
-    """ Serialization of error handling information based on mime type.
+def get_rate_limit(api_token):
+    """ Gets the last known rate limit of an OAuth token.
 
     Args:
-        mime_type: mime type to serialize error info to
-        error_info: information about an exception that happened
+        api_token: OAuth API token for a backend storage service.
 
     Returns:
-        String representing the error_info in mime_type.
-
-    Raises:
-        HTTPNotAcceptable if mime_type is not supported by application.
+        Dictionary with the number of requests allowed per window ("limit"),
+        the number of requests remaining in the window ("remaining"), the time
+        when the window is reset ("reset") and the time after which rejected
+        requests may be retried ("retry"), as seconds since the epoch, or None
+        if the rate limit is not known. Any of the values may be None.
     """
 
-    if mime_type == MIME_TYPE_HTML:
-        template = JINJA_ENVIRONMENT.get_template(TEMPLATE_ERROR)
-        return template.render(error_info)
-
-    elif mime_type in [MIME_TYPE_JSON, MIME_TYPE_TEXT]:
-        return json.dumps(error_info, indent=JSON_INDENT)
-
-    else:
-        # should never happen because it is detected earlier
-        raise HTTPNotAcceptable(ERROR_MSG_NOT_ACCEPTABLE % \
-                  (accept_header, allowed_types))
+    return memcache.get(get_rate_limit_cache_key(api_token))
 
-def handle_error(request, response, exception):
-    """ Handler for all exception thrown by application. Extracts the error
-        info, logs it, serializes into into an acceptable mime type and returns
-        to the client.
+def get_rate_limit_wait(rate_limit):
+    """ Calculates how long to wait before making requests allowed by a rate
+        limit.
 
     Args:
-        request: HTTP request
-        response: HTTP response
-        exception: exception that occurred during request processing
+        rate_limit: dictionary returned by get_rate_limit
+
+    Returns:
+        Number of seconds to wait, 0 if requests can be made now.
     """
-    logging.exception('Error while processing request.\n%s' % json.dumps({
-                       'request_body' : request.body,
-                       'request_headers' : dict(request.headers)},
-                       indent=JSON_INDENT))
 
-    accept_header = None
-    try:
-        accept_header = get_best_mime_match_or_default(
-                request.headers.get('Accept'),
-                SUPPORTED_OUTPUT_APPENDR_MIME_TYPES,
-                DEFAULT_OUTPUT_APPENDR_MIME_TYPE)
-    except HTTPNotAcceptable as e:
-        accept_header = MIME_TYPE_HTML
+    if rate_limit is None:
+        return 0
 
-    if isinstance(exception, apiproxy_errors.OverQuotaError):
-        pass
+    date_allowed = 0
 
-    elif isinstance(exception, DeadlineExceededError):
-        pass
+    if rate_limit['retry'] is not None:
+        date_allowed = rate_limit['retry']
 
-    if not isinstance(exception, webapp2.HTTPException):
-        exception = HTTPInternalServerError(detail=str(exception))
+    if rate_limit['remaining'] == 0 and rate_limit['reset'] is not None:
+        date_allowed = max(date_allowed, rate_limit['reset'])
 
-    error_info = extractHTTPerrorInfo(request, response, exception)
-    content = serialize_error(accept_header, error_info)
+    return max(int(date_allowed - time.time()) + 1, 0)
 
-    response.set_status(exception.code)
-    response.headers['Content-Type'] = accept_header
-    response.headers['Access-Control-Allow-Origin'] = '*'
-    response.out.write(content)
+def get_rate_limit_info(api_token):
+    """ Constructs the information about the rate limit of an OAuth token that
+        is sent over the network to clients.
 
-################################################################################
-# Base Bin model
-################################################################################
+    Args:
+        api_token: OAuth API token for a backend storage service.
 
-class Bin(polymodel.PolyModel):
-    """ Represents the base (abstract) class for bins, where subclasses are
-        implemented for each supported backend service.
+    Returns:
+        Dictionary of rate limit properties, or None if the rate limit is not
+        known.
     """
 
-    date_created = db.DateTimeProperty(auto_now_add=True)
-    date_updated = db.DateTimeProperty(auto_now_add=True)
-    output_format = db.StringProperty()
-    storage_backend = db.StringProperty()
-    storage_user_id = db.StringProperty()
+    rate_limit = get_rate_limit(api_token)
 
-    def get_url(self):
-        """ Constructs the URL for this bin resource.
+    if rate_limit is None:
+        return None
 
-        Returns:
-            String representation of full URL of this bin.
-        """
+    def format_time(seconds):
+        if seconds is None:
+            return None
+        return datetime.utcfromtimestamp(seconds).strftime(
+            DEFAULT_DATETIME_FORMAT)
+
+    return {
+        'limit' : rate_limit['limit'],
+        'remaining' : rate_limit['remaining'],
+        'date_reset' : format_time(rate_limit['reset']),
+        'date_retry' : format_time(rate_limit['retry']),
+        'wait_seconds' : get_rate_limit_wait(rate_limit),
+        'datetime_format' : DEFAULT_DATETIME_FORMAT
+    }
+
+def update_rate_limit(api_token, response, rate_limit):
+    """ Updates the rate limit of an OAuth token from the X-RateLimit-* and
+        Retry-After headers of a storage service API response.
 
-        return webapp2.uri_for(ROUTE_NAME_BIN,
-                               bin_name=self.key().name(),
-                               _full=True)
+    Args:
+        api_token: OAuth API token for a backend storage service.
+        response: urlfetch response of a request on behalf of api_token
+        rate_limit: the rate limit of api_token before the request, as
+                    returned by get_rate_limit
 
-    def get_tasks_url(self):
-        """ Constructs the URL for the tasks resource of this bin.
+    Returns:
+        Dictionary with the updated rate limit, as returned by get_rate_limit,
+        or None if the response has no rate limit information.
+    """
 
-        Returns:
-            String representation of full URL for the task resource of this bin.
-        """
+    headers = response.headers
+    rate_limit = rate_limit or {
+        'limit' : None,
+        'remaining' : None,
+        'reset' : None,
+        'retry' : None
+    }
+
+    is_limited = response.status_code == 429 or \
+                 (response.status_code == 403 and \
+                  RATE_LIMIT_MESSAGE_REGEX.search(response.content or '') \
+                  is not None)
+
+    if 'X-RateLimit-Remaining' in headers:
+        rate_limit['remaining'] = int(headers['X-RateLimit-Remaining'])
+        rate_limit['limit'] = int(headers.get('X-RateLimit-Limit', 0)) or None
+        rate_limit['reset'] = int(headers.get('X-RateLimit-Reset', 0)) or None
+        is_limited = is_limited or (rate_limit['remaining'] == 0 and \
+                                    response.status_code in [403, 503])
+
+    if 'Retry-After' in headers:
+        # Retry-After may also be an HTTP date, which is not used by the
+        # supported storage services
+        try:
+            retry_seconds = int(headers['Retry-After'])
+        except ValueError:
+            retry_seconds = RATE_LIMIT_DEFAULT_RETRY_SECONDS
+        rate_limit['retry'] = int(time.time()) + retry_seconds
 
-        return webapp2.uri_for(ROUTE_NAME_TASKS,
-                               bin_name=self.key().name(),
-                               _full=True)
-
-    def get_raw_content_url(self):
-        """ (Abstract) Constructs the URL for the raw contents associated with
-            this bin. This URL will be on the domain of the external storage
-            service. Subclasses of Bin must/should implement this method.
-        """
+    elif is_limited and get_rate_limit_wait(rate_limit) == 0:
+        rate_limit['retry'] = int(time.time()) + \
+                              RATE_LIMIT_DEFAULT_RETRY_SECONDS
 
+    elif 'X-RateLimit-Remaining' not in headers:
         return None
 
-    def get_html_content_url(self):
-        """ (Abstract) Constructs the URL for the HTML contents associated with
-            this bin. This URL will be on the domain of the external storage
-            service. Subclasses of Bin must/should implement this method.
-        """
+    memcache.set(get_rate_limit_cache_key(api_token), rate_limit,
+                 RATE_LIMIT_CACHE_SECONDS)
+    return rate_limit
 
-        return None
+def get_circuit_breaker_wait(circuit):
+    """ Calculates how long requests are paused by a circuit breaker.
 
-    def get_info(self):
-        """ Constructs the information about this bin resource that is sent
-            over the network to clients.
+    Args:
+        circuit: dictionary with the number of consecutive failures
+                 ("failures") and the time until which requests are paused
+                 ("open_until"), as seconds since the epoch, or None if there
+                 were no recent failures
 
-        Returns:
-            Dictionary of bin properties and tasks.
-        """
+    Returns:
+        Number of seconds to wait, 0 if requests can be made now.
+    """
 
-        bin_tasks = Task.all().filter('bin =', self.key())
-        bin_tasks = bin_tasks.order('-date_created').fetch(None)
+    if circuit is None or circuit['open_until'] is None:
+        return 0
 
-        return {
-          'bin_id' : self.key().name(),
-          'bin_url' : self.get_url(),
-          'date_created' : self.date_created.strftime(DEFAULT_DATETIME_FORMAT),
-          'date_updated' : self.date_updated.strftime(DEFAULT_DATETIME_FORMAT),
-          'output_format' : self.output_format,
-          'datetime_format' : DEFAULT_DATETIME_FORMAT,
-          'storage_backend' : self.storage_backend,
-          'content_raw_url' : self.get_raw_content_url(),
-          'content_html_url' : self.get_html_content_url(),
-          'tasks_url' : self.get_tasks_url(),
-          'tasks' : [task.get_info() for task in bin_tasks]
-        }
+    return max(int(circuit['open_until'] - time.time()) + 1, 0)
 
-    @classmethod
-    def generate_name(cls):
-        """ Generates a unique name for a Bin.
+def update_circuit_breaker(key, circuit, failed):
+    """ Records the result of a request in a circuit breaker, and opens it if
+        there were too many consecutive failures.
 
-        Returns:
-            String representing a unique name for a bin, where unique means
-            with respect to all other Bin instances stored in the datastore.
-        """
+    Args:
+        key: memcache key of the circuit breaker
+        circuit: the circuit breaker before the request, as described in
+                 get_circuit_breaker_wait
+        failed: whether the request failed
+    """
 
-        bin_name = None
-        while True:
-            bin_name = \
-                webapp2_extras.security.generate_random_string(BIN_NAME_LENGTH)
+    if not failed:
+        if circuit is not None:
+            memcache.delete(key)
+        return
 
-            bin = Bin.get_by_key_name(bin_name)
-            if bin is None:
-                  break
+    circuit = circuit or {
+        'failures' : 0,
+        'open_until' : None
+    }
 
-        return bin_name
+    circuit['failures'] += 1
 
-    @classmethod
-    def serialize(cls, bins, content_type):
-        """ Serializes a Bin or list of Bins based on the desired output
-            mime type.
+    if circuit['failures'] >= CIRCUIT_BREAKER_FAILURE_THRESHOLD:
+        circuit['open_until'] = int(time.time()) + CIRCUIT_BREAKER_OPEN_SECONDS
+        logging.warning('Paused requests for circuit breaker %s after %s '
+                        'failures.' % (key, circuit['failures']))
 
-        Args:
-            bins: a Bin instance or list of Bins
-            content_type: mime type to which bins should be serialized
+    memcache.set(key, circuit, CIRCUIT_BREAKER_RESET_SECONDS)
 
-        Returns:
-            String representation of bins in content_type format.
+def fetch_storage_api(url, api_token, **kwargs):
+    """ Invokes a storage service API on behalf of an OAuth token, keeping
+        track of the rate limit of the token and of failures of the API host
+        and of the token. No request is made while the rate limit is known to
+        be exhausted, or while requests to the host or with the token are
+        paused after repeated failures.
 
-        Raises:
-            HTTPNotAcceptable is content_type is not supported by application.
-        """
+    Args:
+        url: URL of the API resource
+        api_token: OAuth API token for the storage service
+        kwargs: other arguments of urlfetch.fetch
 
-        bins_info = None
+    Returns:
+        The urlfetch response.
 
-        if isinstance(bins, Bin):
-            bins_info = bins.get_info()
-        else:
-            bins_info = []
-            for bin in bins:
-                bins_info.append(bin.get_info())
+    Raises:
+        HTTPServiceUnavailable with a Retry-After header if the rate limit of
+        api_token is exhausted or requests to the host are paused, and
+        HTTPUnauthorized if requests with api_token are paused, since the
+        token was rejected and retrying with it would fail again.
+    """
 
-        if content_type in [MIME_TYPE_JSON, MIME_TYPE_TEXT]:
-            return json.dumps(bins_info, indent=JSON_INDENT)
-        elif content_type in [MIME_TYPE_HTML]:
-            if isinstance(bins, Bin):
-                template = JINJA_ENVIRONMENT.get_template(TEMPLATE_BIN)
-            else:
-                template = JINJA_ENVIRONMENT.get_template(TEMPLATE_BINS)
-            return template.render({'bins' : bins_info})
-        else:
-            # should never happen because it is detected earlier
-            raise HTTPNotAcceptable(ERROR_MSG_NOT_ACCEPTABLE % \
-                      (content_type, SUPPORTED_OUTPUT_APPENDR_MIME_TYPES))
+    rate_limit_key = get_rate_limit_cache_key(api_token)
+    host_key = CIRCUIT_BREAKER_KEY_PREFIX + 'host/' + \
+               urlparse.urlparse(url).netloc
+    token_key = CIRCUIT_BREAKER_KEY_PREFIX + 'token/' + \
+                hashlib.sha256(api_token.encode('utf-8')).hexdigest()
 
+    cached = memcache.get_multi([rate_limit_key, host_key, token_key])
 
-    @classmethod
-    def get_user_id_for_token(cls, storage_backend, api_token):
-        """ Gets the user id for an OAuth token of a specific backend storage
-            service. The user id is specific for the storage backend so this
-            method delegated to a subclass that will fetch this id via an
-            API call to the backend service.
+    wait_seconds = get_circuit_breaker_wait(cached.get(token_key))
+    if wait_seconds > 0:
+        raise HTTPUnauthorized(ERROR_MSG_TOKEN_REJECTED % (wait_seconds,))
 
-        Args:
-            storage_backend: id of the backend storage service for which the
-                             API token is valid.
-            api_token: OAuth API token for a backend storage service.
+    wait_seconds = get_circuit_breaker_wait(cached.get(host_key))
+    if wait_seconds > 0:
+        raise HTTPServiceUnavailable(ERROR_MSG_CIRCUIT_OPEN % (wait_seconds,),
+                                     headers=[('Retry-After',
+                                               str(wait_seconds))])
 
-        Returns:
-            String representation of user id associated with api_token.
+    wait_seconds = get_rate_limit_wait(cached.get(rate_limit_key))
 
-        Raises:
-            HTTPClientError if storage_backend is not supported by application.
-        """
+    if wait_seconds == 0:
+        try:
+            response = urlfetch.fetch(url=url, **kwargs)
+        except urlfetch.Error:
+            update_circuit_breaker(host_key, cached.get(host_key), True)
+            raise
 
-        if storage_backend == STORAGE_BACKEND_GIST:
-            return GistBin.get_user_id_for_token(api_token)
-        elif storage_backend == STORAGE_BACKEND_GITHUB_REPO:
-            return GitHubRepoBin.get_user_id_for_token(api_token)
-        elif storage_backend == STORAGE_BACKEND_DROPBOX:
-            return DropboxBin.get_user_id_for_token(api_token)
-        else:
-            # should never happen since detected earlier
-            raise HTTPClientError('Unsupported storage service: ' + \
-                                  storage_backend)
+        rate_limit = update_rate_limit(api_token, response,
+                                       cached.get(rate_limit_key))
 
-    @classmethod
-    def create(cls, params):
-        """ Creates a Bin from input parameters. This method delegates to
-            subclasses to finish parameter validation, bin creation and
-            initialization.
+        if response.status_code in [403, 429, 503] and rate_limit is not None:
+            wait_seconds = get_rate_limit_wait(rate_limit)
 
-        Args:
-            params: a dictionary-like object with parameters for creating
-            a Bin. Parameters may vary based on backend storage service used
-            for this Bin.
+    if wait_seconds > 0:
+        raise HTTPServiceUnavailable(ERROR_MSG_RATE_LIMIT % (wait_seconds,),
+                                     headers=[('Retry-After',
+                                               str(wait_seconds))])
 
-        Returns:
-            Bin instance which has not been written to datastore.
+    # Rate limited responses are not failures of the host or of the token
+    update_circuit_breaker(host_key, cached.get(host_key),
+                           response.status_code >= 500)
+    update_circuit_breaker(token_key, cached.get(token_key),
+                           response.status_code in \
+                               CIRCUIT_BREAKER_TOKEN_STATUS_CODES)
 
-        Raises:
-            HTTPClientError if parameters define a storage backend that is
-            not supported by the application.
-        """
+    return response
 
-        validate_input_param(params, 'storage_backend', False,
-                             SUPPORTED_STORAGE_BACKENDS.keys(),
-                             DEFAULT_STORAGE_BACKEND)
+def classify_error(e):
+    """ Classifies an error of an append by whether retrying it can succeed.
 
-        validate_input_param(params, 'output_format', False,
-                             SUPPORTED_OUTPUT_EXTERNAL_DATA_MIME_TYPES,
-                             DEFAULT_OUTPUT_EXTERNAL_DATA_MIME_TYPE)
+    Args:
+        e: exception raised by the append
 
-        bin_name = Bin.generate_name()
-        bin = None
+    Returns:
+        ERROR_CLASS_PERMANENT if the append would fail again,
+        ERROR_CLASS_THROTTLED if it can be retried after the time in the
+        Retry-After header of the error, or after
+        RATE_LIMIT_DEFAULT_RETRY_SECONDS if it has no such header, and
+        ERROR_CLASS_TRANSIENT if it may succeed when retried.
+    """
 
-        logging.debug('Creating bin %s.' % (bin_name,))
+    if not isinstance(e, webapp2.HTTPException):
+        return ERROR_CLASS_TRANSIENT
 
-        if params['storage_backend'] == STORAGE_BACKEND_GIST:
-            bin = GistBin(key_name=bin_name)
-        elif params['storage_backend'] == STORAGE_BACKEND_GITHUB_REPO:
-            bin = GitHubRepoBin(key_name=bin_name)
-        elif params['storage_backend'] == STORAGE_BACKEND_DROPBOX:
-            bin = DropboxBin(key_name=bin_name)
-        else:
-            # should never happen since detected earlier
-            raise HTTPClientError('Unsupported storage service: ' + \
-                                  storage_backend)
+    if 'Retry-After' in e.headers or e.code == 429 or \
+       (e.code == 403 and RATE_LIMIT_MESSAGE_REGEX.search(str(e))):
+        return ERROR_CLASS_THROTTLED
 
-        bin.output_format = params['output_format']
-        bin.storage_backend = params['storage_backend']
-        bin.initialize(bin_name, params)
+    if e.code in PERMANENT_ERROR_STATUS_CODES:
+        return ERROR_CLASS_PERMANENT
 
-        return bin
+    return ERROR_CLASS_TRANSIENT
 
-################################################################################
-# GistBin model
-################################################################################
+def register_storage_backend(bin_class):
+    """ Class decorator which registers a Bin subclass as the implementation
+        of the storage backend named by its storage_backend_id, so that bins
+        can be created for that storage backend.
 
-class GistBin(Bin):
-    """ A Bin implementation that uses GitHub Gists for storing data. """
+    Args:
+        bin_class: subclass of Bin
 
-    is_public = db.BooleanProperty()
-    gist_id = db.StringProperty()
-    api_token = db.StringProperty()
-    filename = db.StringProperty()
+    Returns:
+        bin_class, unchanged.
+    """
 
-    def get_gist_api_url(self):
-        """ Constructs the URL for fetching the representation of the
-            gist that stores the data for this bin, via the GitHub API.
+    SUPPORTED_STORAGE_BACKENDS[bin_class.storage_backend_id] = bin_class
+    return bin_class
 
-        Returns:
-            String representation of GitHub API resource that stores the data
-            for this bin.
-        """
+def get_request_params(request):
+    """ Extracts a dictionary of params passed in the HTTP request, based on
+        the content type of the request. For example, for url-encoded params
+        these are just extracted from the request, but for JSON params in the
+        body - these are parsed via JSON into a dict and then returned.
 
-        return 'https://api.github.com/gists/' + self.gist_id
+    Args:
+        request: the HTTP request
 
-    def get_raw_content_url(self):
-        """ Implementation of the Bin abstract method.
+    Returns:
+        A dict of HTTP request parameters.
 
-        Returns:
-            String representation of URL of resource on GitHub domain that
-            contains the raw data for this Bin.
-        """
+    Raises:
+        HTTPUnsupportedMediaType if request content type is unsupported.
+    """
 
-        return 'https://gist.github.com/raw/' + self.gist_id + \
-                '/' + self.filename
+    params = None
+    if request.content_type == MIME_TYPE_FORM or request.method == 'GET':
+        params = dict(request.params.copy())
+    elif request.content_type == MIME_TYPE_JSON:
+        params = json.loads(request.body)
+    else:
+        raise HTTPUnsupportedMediaType('Unsupported body mime type: ' + \
+                                        request.content_type)
 
-    def get_html_content_url(self):
-        """ Implementation of the Bin abstract method.
+    logging.debug('Parsed request params: %s.' % \
+                  json.dumps(params, indent=JSON_INDENT))
+    return params
 
-        Returns:
-            String representation of URL of resource on GitHub domain that
-            contains the HTML page with data for this Bin.
-        """
+def get_request_records(request):
+    """ Extracts the list of key-value datasets to be appended from an HTTP
+        request, based on the content type of the request. A JSON body may
+        contain a single object or an array of objects, a CSV body must
+        start with a header row and an NDJSON body contains one object per
+        line. URL-encoded params are a single dataset.
 
-        return 'https://gist.github.com/' + self.gist_id
+    Args:
+        request: the HTTP request
 
-    def get_info(self):
-        """ Constructs the information about this GistBin resource that is sent
-            over the network to clients. First constructs the generic Bin
-            information and the adds GistBin specific information.
+    Returns:
+        A non-empty list of dicts of key-value data.
 
-        Returns:
-            Dictionary of bin properties and tasks.
-        """
+    Raises:
+        HTTPUnsupportedMediaType if request content type is unsupported.
+        HTTPRequestEntityTooLarge if the body or the number of datasets
+        exceeds the limits for a single request.
+        HTTPClientError if the body doesn't contain a list of datasets, or
+        isn't valid CSV.
+    """
 
-        bin_info = Bin.get_info(self)
+    if request.content_type not in SUPPORTED_APPEND_DATA_MIME_TYPES:
+        raise HTTPUnsupportedMediaType('Unsupported body mime type: ' + \
+                                        request.content_type)
 
-        bin_info['is_public'] = self.is_public
-        bin_info['gist_id'] = self.gist_id
-        bin_info['filename'] = self.filename
-        bin_info['gist_api_url'] = self.get_gist_api_url()
+    if len(request.body) > APPEND_MAX_BYTES:
+        raise HTTPRequestEntityTooLarge('Request body must not be larger '
+                                        'than %s bytes.' % (APPEND_MAX_BYTES,))
 
-        return bin_info
+    if request.content_type == MIME_TYPE_FORM:
+        records = [dict(request.params.copy())]
 
-    @classmethod
-    def get_user_id_for_token(cls, api_token):
-        """ Retrieves the user id for a GitHub OAuth token.
+    elif request.content_type == MIME_TYPE_JSON:
+        records = json.loads(request.body)
+        if not isinstance(records, list):
+            records = [records]
 
-        Args:
-            api_token: OAuth token for GitHub API.
+    elif request.content_type == MIME_TYPE_NDJSON:
+        records = [json.loads(line) for line in request.body.splitlines()
+                   if line.strip() != '']
 
-        Returns:
-            String representation of GitHub user id associated with api_token.
-        """
+    elif request.content_type == MIME_TYPE_CSV:
+        csv_reader = csv.DictReader(
+            cStringIO.StringIO(request.body),
+            delimiter=CSV_DELIMITER,
+            quotechar=CSV_QUOTECHAR)
 
-        auth_headers = {
-            'Authorization': 'token ' + api_token
-        }
+        try:
+            records = [dict((key, value) for key, value in row.items()
+                            if key is not None and value is not None)
+                       for row in csv_reader]
+        except csv.Error as e:
+            raise HTTPClientError('Invalid CSV request body: %s.' % (e,))
 
-        response = urlfetch.fetch(
-                            url='https://api.github.com/user',
-                            headers=auth_headers,
-                            deadline=URLFETCH_DEADLINE,
-                            validate_certificate=URLFETCH_VALIDATE_CERTS)
+    if len(records) == 0 or \
+       not all([isinstance(params, dict) for params in records]):
+        raise HTTPClientError('Request body must contain one or more sets '
+                              'of key-value pairs.')
 
-        if response.status_code != 200:
-            raise status_map[response.status_code](\
-                'Error while calling GitHub API - fetch user information\n' + \
-                response.content)
-        else:
-            return str(json.loads(response.content)['id'])
+    if len(records) > APPEND_MAX_RECORDS:
+        raise HTTPRequestEntityTooLarge('Request must not contain more than '
+                                        '%s sets of key-value pairs.' % \
+                                        (APPEND_MAX_RECORDS,))
 
-    def append_data(self, params):
-        """ Appends data to a Gist. Works by fetching existing data, then
-            appending new data locally and writing the results back to the Gist.
+    logging.debug('Parsed %s request records.' % (len(records),))
+    return records
 
-        Args:
-            params: dictionary-like object with key-value data to be appended
-                    to existing data
+def get_queue_hash(value):
+    """ Hashes a string to a point on the consistent hash ring of queues.
 
-        Raises:
-            HTTPError if GitHub API invocation failed.
-        """
+    Args:
+        value: the string
 
-        auth_headers = {
-            'Authorization': 'token ' + self.api_token
-        }
+    Returns:
+        Integer point on the ring.
+    """
 
-        gist_response = urlfetch.fetch(
-                            url=self.get_gist_api_url(),
-                            headers=auth_headers,
-                            deadline=URLFETCH_DEADLINE,
-                            validate_certificate=URLFETCH_VALIDATE_CERTS)
+    return int(hashlib.md5(value.encode('utf-8')).hexdigest()[:16], 16)
 
-        if gist_response.status_code != 200:
-            raise status_map[gist_response.status_code](\
-                'Error while calling GitHub API - fetch gist data\n' + \
-                gist_response.content)
+def build_queue_hash_ring(queue_names, points):
+    """ Builds a consistent hash ring of task queues. Each queue is placed on
+        the ring at a number of points, and a bin is assigned to the queue
+        with the first point after the hash of the bin name. Adding or
+        removing a queue only reassigns bins next to the points of that queue.
 
-        json_gist = json.loads(gist_response.content)
+    Args:
+        queue_names: list of names of task queues
+        points: number of points of each queue on the ring
 
-        new_content = append_data(json_gist['files'][self.filename]['content'],
-                                  self.output_format,
-                                  params)
+    Returns:
+        Tuple of the sorted list of points on the ring and the list of names
+        of the queues at those points.
+    """
 
-        new_payload = json.dumps({
-            'files' : {
-                self.filename : {
-                    'content' : new_content
-                }
-            }
-        })
+    ring = sorted((get_queue_hash('%s#%s' % (queue_name, point)), queue_name)
+                  for queue_name in queue_names
+                  for point in range(points))
 
-        gist_headers = {
-            'Content-Type': MIME_TYPE_JSON,
-            'Authorization': 'token ' + self.api_token
-        }
+    return [point for point, _ in ring], [queue_name for _, queue_name in ring]
 
-        result = urlfetch.fetch(url=self.get_gist_api_url(),
-                                payload=new_payload,
-                                method=urlfetch.POST,
-                                headers=gist_headers,
-                                deadline=URLFETCH_DEADLINE,
-                                validate_certificate=URLFETCH_VALIDATE_CERTS)
+# Consistent hash ring of append task queues global variable
+QUEUE_HASH_RING_POINTS, QUEUE_HASH_RING_QUEUE_NAMES = \
+    build_queue_hash_ring(APPEND_TASK_QUEUES,
+                          QUEUE_HASH_RING_POINTS_PER_QUEUE)
+
+def get_queue_name_for_bin(bin_name):
+    """ Gets the name of the task queue which stores append tasks for a
+        specific bin. This is done by "sharding" tasks to queues based on
+        the name of the bin, using the consistent hash ring of queues.
+
+    Args:
+        bin_name: name of a bin
+
+    Returns:
+        Name of task queue responsible for storing tasks for a bin_name bin.
+    """
+
+    index = bisect.bisect(QUEUE_HASH_RING_POINTS,
+                          get_queue_hash(bin_name))
+    return QUEUE_HASH_RING_QUEUE_NAMES[index % len(QUEUE_HASH_RING_QUEUE_NAMES)]
+
+def get_legacy_queue_name_for_bin(bin_name):
+    """ Gets the name of the task queue which stored append tasks for a
+        specific bin before queues were assigned by consistent hashing. This
+        is the queue of bins created before their queue was stored on them.
+
+    Args:
+        bin_name: name of a bin
+
+    Returns:
+        Name of task queue responsible for storing tasks for a bin_name bin.
+    """
+
+    queue_num = sum([ord(ch) for ch in bin_name]) % NUMBER_OF_APPEND_TASK_QUEUES
+    return APPEND_TASK_QUEUES_PREFIX + str(queue_num)
+
+def get_ingest_counter_key(bin_name, minute):
+    """ Constructs the memcache key of the counter of tasks created for a bin
+        in a specific minute.
+
+    Args:
+        bin_name: name of a bin
+        minute: number of minutes since the epoch
+
+    Returns:
+        String memcache key.
+    """
+
+    return INGEST_COUNTER_KEY_PREFIX + bin_name + '/' + str(minute)
+
+def count_ingest(bin_name):
+    """ Counts a task created for a bin in the current minute.
+
+    Args:
+        bin_name: name of a bin
+
+    Returns:
+        List of the number of tasks created for the bin in the previous and
+        in the current minute.
+    """
+
+    minute = int(time.time() / 60)
+    key = get_ingest_counter_key(bin_name, minute)
+
+    # Counters are created with an expiration time, which incr can't set
+    current_count = memcache.incr(key)
+    if current_count is None:
+        if memcache.add(key, 1, INGEST_COUNTER_SECONDS):
+            current_count = 1
+        else:
+            current_count = memcache.incr(key)
+
+    previous_count = memcache.get(get_ingest_counter_key(bin_name, minute - 1))
+
+    return [previous_count or 0, current_count or 0]
+
+def get_ingest_counts(bin_name, minutes):
+    """ Gets the number of tasks created for a bin in each of the last few
+        minutes, including the current one.
+
+    Args:
+        bin_name: name of a bin
+        minutes: number of minutes
+
+    Returns:
+        List of numbers of tasks, oldest minute first.
+    """
+
+    minute = int(time.time() / 60)
+    keys = [get_ingest_counter_key(bin_name, minute - i)
+            for i in reversed(range(minutes))]
+
+    counts = memcache.get_multi(keys)
+    return [counts.get(key, 0) for key in keys]
+
+def get_task_changes_key(bin_name):
+    """ Constructs the memcache key of the counter of status changes of the
+        tasks of a bin.
+
+    Args:
+        bin_name: name of a bin
+
+    Returns:
+        String memcache key.
+    """
+
+    return TASK_CHANGES_KEY_PREFIX + bin_name
+
+def get_task_changes(bin_name):
+    """ Gets the counter of status changes of the tasks of a bin.
+
+    Args:
+        bin_name: name of a bin
+
+    Returns:
+        Number of changes, which is only meaningful in comparison to another
+        number returned by this function.
+    """
+
+    return memcache.get(get_task_changes_key(bin_name)) or 0
+
+def notify_task_changes(bin_name):
+    """ Notifies requests waiting for status changes of the tasks of a bin
+        that the status of some tasks has changed.
+
+    Args:
+        bin_name: name of a bin
+    """
+
+    memcache.incr(get_task_changes_key(bin_name), initial_value=0)
+
+# Requests of this instance which wait for task status changes
+TASK_WAITERS = threading.BoundedSemaphore(TASK_WAIT_MAX_WAITERS)
+
+def wait_for_task_changes(bin_name, changes, date_limit):
+    """ Waits until the status of some tasks of a bin changes. Changes are
+        checked less often the longer the wait takes, and the function
+        returns without waiting if TASK_WAIT_MAX_WAITERS requests of this
+        instance are already waiting.
+
+    Args:
+        bin_name: name of a bin
+        changes: number of changes already seen, see get_task_changes
+        date_limit: time until which to wait, as seconds since the epoch
+
+    Returns:
+        Number of changes, which is equal to changes if nothing changed until
+        date_limit.
+    """
+
+    if not TASK_WAITERS.acquire(False):
+        return changes
+
+    try:
+        poll_seconds = TASK_WAIT_MIN_POLL_SECONDS
+
+        while time.time() + poll_seconds < date_limit:
+            time.sleep(poll_seconds)
+
+            new_changes = get_task_changes(bin_name)
+            if new_changes != changes:
+                return new_changes
+
+            poll_seconds = min(poll_seconds * 2, TASK_WAIT_MAX_POLL_SECONDS)
+
+        return changes
+
+    finally:
+        TASK_WAITERS.release()
+
+def get_data_csv_key_list(params):
+    """ Sorts keys of a dictionary, with the creation date key in first place.
+        This is used for CSV output in order to have the creation date in
+        first place always, and the other keys sorted (in the same order).
+
+    Args:
+        params: dictionary object
+
+    Returns:
+        List of keys in params with 'date_created' key in first place
+    """
+
+    keys = params.keys()
+    keys.remove('date_created')
+    keys.sort()
+    keys.insert(0, 'date_created')
+    return keys
+
+def get_dict_values_sorted(params, keys):
+    """ Gets a list of dict values sorted by the order of keys in another list.
+
+    Args:
+        params: dictionary-like object
+        keys: list of keys
+
+    Returns:
+        List of values in params, but sorted according to order of related keys
+        in keys.
+    """
+
+    return [params.get(key) for key in keys]
+
+def append_data_csv(old_content, records):
+    """ Appends key-value data to an existing CSV document.
+
+    Args:
+        old_content: string with existing CSV data
+        records: list of dictionary-like objects with key-value data
+
+    Returns:
+        String representing CSV data that contains both old_content and records,
+        where each record was appended as a new row of CSV data.
+    """
+
+    if old_content == OUTPUT_FORMATS_EMPTY_DATA[MIME_TYPE_CSV]:
+        return serialize_csv_rows(records, True)
+    else:
+        return old_content+serialize_csv_rows(records, False)
+
+def serialize_csv_rows(records, with_header):
+    """ Serializes key-value data into rows of CSV data.
+
+    Args:
+        records: list of dictionary-like objects with key-value data
+        with_header: whether a header row with the keys of the first record
+                     should be written before the data rows
+
+    Returns:
+        String representing CSV data with a row for each record.
+    """
+
+    output = cStringIO.StringIO()
+    csv_writer = csv.writer(
+        output,
+        delimiter=CSV_DELIMITER,
+        quotechar=CSV_QUOTECHAR,
+        quoting=csv.QUOTE_MINIMAL)
+
+    if with_header:
+        csv_writer.writerow(get_data_csv_key_list(records[0]))
+
+    for params in records:
+        key_list = get_data_csv_key_list(params)
+        data = get_dict_values_sorted(params, key_list)
+        csv_writer.writerow(data)
+
+    return output.getvalue()
+
+def append_data_json(old_content, records):
+    """ Appends key-value data to an existing JSON document. New elements are
+        spliced in before the closing of the top-level array, and the whole
+        document is only parsed and serialized again if it doesn't have the
+        formatting that appendr writes.
+
+    Args:
+        old_content: string with existing JSON data, represented as an array of
+                     sets of key-value pairs (e.g. [{...}, {...}, ...])
+        records: list of dictionary-like objects with key-value data
+
+    Returns:
+        String representing JSON data that contains both old_content and
+        records, where each record was appended as a new element in the
+        top-level JSON array.
+    """
+
+    new_elements = json.dumps(records, indent=JSON_INDENT)
+    new_elements = new_elements[len(JSON_ARRAY_OPEN):-len(JSON_ARRAY_CLOSE)]
+
+    # Documents written by appendr always end with an object element followed
+    # by the closing of the top-level array, so new elements can be spliced in
+    # front of the closing without parsing and serializing the whole document.
+    if old_content.startswith(JSON_ARRAY_OPEN + '{') and \
+       old_content.endswith('}' + JSON_ARRAY_CLOSE):
+        return old_content[:-len(JSON_ARRAY_CLOSE)] + JSON_ARRAY_SEPARATOR + \
+               new_elements + JSON_ARRAY_CLOSE
+
+    json_data = json.loads(old_content)
+    json_data.extend(records)
+    return json.dumps(json_data, indent=JSON_INDENT)
+
+def append_data_ndjson(old_content, records):
+    """ Appends key-value data to an existing JSON Lines (NDJSON) document.
+
+    Args:
+        old_content: string with existing NDJSON data, represented as one
+                     JSON object per line
+        records: list of dictionary-like objects with key-value data
+
+    Returns:
+        String representing NDJSON data that contains both old_content and
+        records, where each record was appended as a new line.
+    """
+
+    new_lines = serialize_ndjson_lines(records)
+
+    if old_content == OUTPUT_FORMATS_EMPTY_DATA[MIME_TYPE_NDJSON]:
+        return new_lines
+    elif old_content.endswith('\n'):
+        return old_content + new_lines
+    else:
+        return old_content + '\n' + new_lines
+
+def serialize_ndjson_lines(records):
+    """ Serializes key-value data into lines of JSON Lines (NDJSON) data.
+
+    Args:
+        records: list of dictionary-like objects with key-value data
+
+    Returns:
+        String representing NDJSON data with a line for each record.
+    """
+
+    return ''.join([json.dumps(params) + '\n' for params in records])
+
+def format_records(records):
+    """ Formats the creation dates of key-value data for serialization.
+
+    Args:
+        records: list of dictionary-like objects with key-value data, where
+                 'date_created' is a datetime object
+
+    Returns:
+        List of copies of records with 'date_created' formatted as a string.
+    """
+
+    return [dict(params, date_created=\
+                 params['date_created'].strftime(DEFAULT_DATETIME_FORMAT))
+            for params in records]
+
+def get_appended_data(output_format, records):
+    """ Serializes key-value data into the string that append_data adds to
+        the end of a non-empty document. Only defined for output formats in
+        which appending is a plain concatenation.
+
+    Args:
+        output_format: mime type format of the document, one of
+                       APPEND_ONLY_OUTPUT_FORMATS
+        records: list of dictionary-like objects with key-value data
+
+    Returns:
+        String to be appended to the end of an existing document.
+
+    Raises:
+        HTTPServerError if output_format is not an append-only format.
+    """
+
+    records = format_records(records)
+
+    if output_format == MIME_TYPE_CSV:
+        return serialize_csv_rows(records, False)
+
+    elif output_format == MIME_TYPE_NDJSON:
+        return serialize_ndjson_lines(records)
+
+    else:
+        raise HTTPServerError('Not an append-only format: %s' % \
+                              (output_format,))
+
+def append_data(old_content, output_format, records):
+    """ Appends key-value data to an existing document based on the format
+        of the document. All records are appended in a single pass so that
+        a batch of records costs the same as a single one.
+
+    Args:
+        old_content: string representing existing data/document
+        output_format: mime type format of the document
+        records: list of dictionary-like objects with key-value data
+
+    Returns:
+        String document with existing and new data appended.
+
+    Raises:
+        HTTPServerError if output_format is unsupported by application.
+    """
+
+    records = format_records(records)
+
+    logging.debug('Appending data:\n%s' % json.dumps({
+      'old_data_length' : len(old_content),
+      'new_data' : records,
+      'output_format' : output_format
+    }, indent=JSON_INDENT))
+
+    if output_format == MIME_TYPE_CSV:
+        return append_data_csv(old_content, records)
+
+    elif output_format == MIME_TYPE_JSON:
+        return append_data_json(old_content, records)
+
+    elif output_format == MIME_TYPE_NDJSON:
+        return append_data_ndjson(old_content, records)
+
+    else:
+        # will actually never happen since we catch this before
+        raise HTTPServerError('Invalid output format: %s' % (output_format),)
+
+def setHTTPOptionsResponse(response,
+                           cors_origin='*',
+                           cors_methods=['GET'],
+                           cors_headers=['Content-Type']):
+    """ Constructs the response to HTTP OPTIONS request.
+
+    Args:
+        response: the HTTP response object
+        cors_origin: domains for which cross-domains should be allowed via
+                     CORS
+        cors_methods: list of methods to be allowed via CORS and regular HTTP
+        cors_headers: list of HTTP headers to be exposed to cross-domain calls
+    """
+
+    headers = response.headers
+    headers.add_header('Access-Control-Allow-Origin', cors_origin)
+    headers.add_header('Access-Control-Allow-Methods', ', '.join(cors_methods))
+    headers.add_header('Access-Control-Allow-Headers', ', '.join(cors_headers))
+    headers.add_header('Access-Control-Max-Age', CORS_ACCESS_CONTROL_MAX_AGE)
+    headers.add_header('Allow', ', '.join(['OPTIONS'] + cors_methods))
+    response.set_status(200)
+
+def extractHTTPerrorInfo(request, response, exception):
+    """ Extracts request/response information for error handling.
+
+    Args:
+        request: HTTP request object
+        response: HTTP response object
+        exception: Exception that occurred during request processing.
+
+    Returns:
+        Dictionary with information for error handling: request url ("url"),
+        request HTTP method ("method"), request body ("body"), request headers
+        ("headers"), response code ("response_code"), response title
+        ("response_title"), details about the error ("details") and the
+        exception stack trace ("stack_trace").
+    """
+    info = dict()
+
+    info['url'] = request.url
+    info['method'] = request.method
+    info['body'] = request.body
+    info['headers'] = dict(request.headers)
+    info['response_code'] = exception.code
+    info['response_title'] = exception.title
+    info['details'] = str(exception)
+    info['stack_trace'] = traceback.format_exc()
+
+    return info
+
+def serialize_error(mime_type, error_info):
+    """ Serialization of error handling information based on mime type.
+
+    Args:
+        mime_type: mime type to serialize error info to
+        error_info: information about an exception that happened
+
+    Returns:
+        String representing the error_info in mime_type.
+
+    Raises:
+        HTTPNotAcceptable if mime_type is not supported by application.
+    """
+
+    if mime_type == MIME_TYPE_HTML:
+        template = JINJA_ENVIRONMENT.get_template(TEMPLATE_ERROR)
+        return template.render(error_info)
+
+    elif mime_type in [MIME_TYPE_JSON, MIME_TYPE_TEXT]:
+        return json.dumps(error_info, indent=JSON_INDENT)
+
+    else:
+        # should never happen because it is detected earlier
+        raise HTTPNotAcceptable(ERROR_MSG_NOT_ACCEPTABLE % \
+                  (accept_header, allowed_types))
+
+def handle_error(request, response, exception):
+    """ Handler for all exception thrown by application. Extracts the error
+        info, logs it, serializes into into an acceptable mime type and returns
+        to the client.
+
+    Args:
+        request: HTTP request
+        response: HTTP response
+        exception: exception that occurred during request processing
+    """
+    logging.exception('Error while processing request.\n%s' % json.dumps({
+                       'request_body' : request.body,
+                       'request_headers' : dict(request.headers)},
+                       indent=JSON_INDENT))
+
+    accept_header = None
+    try:
+        accept_header = get_best_mime_match_or_default(
+                request.headers.get('Accept'),
+                SUPPORTED_OUTPUT_APPENDR_MIME_TYPES,
+                DEFAULT_OUTPUT_APPENDR_MIME_TYPE)
+    except HTTPNotAcceptable as e:
+        accept_header = MIME_TYPE_HTML
+
+    if isinstance(exception, apiproxy_errors.OverQuotaError):
+        pass
+
+    elif isinstance(exception, DeadlineExceededError):
+        pass
+
+    if not isinstance(exception, webapp2.HTTPException):
+        exception = HTTPInternalServerError(detail=str(exception))
+
+    error_info = extractHTTPerrorInfo(request, response, exception)
+    content = serialize_error(accept_header, error_info)
+
+    response.set_status(exception.code)
+    response.headers['Content-Type'] = accept_header
+    if 'Retry-After' in exception.headers:
+        response.headers['Retry-After'] = exception.headers['Retry-After']
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.out.write(content)
+
+################################################################################
+# Base Bin model
+################################################################################
+
+class Bin(polymodel.PolyModel):
+    """ Represents the base (abstract) class for bins, where subclasses are
+        implemented for each supported backend service.
+    """
+
+    # Id of the storage backend implemented by a subclass, and capabilities
+    # of the storage backend that determine how data is appended:
+    # - supports_native_append: data can be appended to the end of a file
+    #   without reading and rewriting it (see append_content)
+    # - supports_conditional_writes: write_content fails with HTTPConflict if
+    #   the version it is based on is outdated, so cached content can be
+    #   written without checking its version first
+    # - max_object_size: largest file the backend can store and return, in
+    #   bytes, or None if unlimited
+    storage_backend_id = None
+    supports_native_append = False
+    supports_conditional_writes = False
+    max_object_size = None
+
+    date_created = db.DateTimeProperty(auto_now_add=True)
+    date_updated = db.DateTimeProperty(auto_now_add=True)
+    output_format = db.StringProperty()
+    storage_backend = db.StringProperty()
+    storage_user_id = db.StringProperty()
+    rotation_max_bytes = db.IntegerProperty()
+    rotation_max_records = db.IntegerProperty()
+    rotation_period = db.StringProperty()
+    segments = db.StringListProperty()
+    segment_bytes = db.IntegerProperty(default=0)
+    segment_records = db.IntegerProperty(default=0)
+    segment_date_created = db.DateTimeProperty(auto_now_add=True)
+    queue_name = db.StringProperty()
+
+    # Properties changed by appending data to a bin (see put_appended)
+    appended_properties = ['date_updated', 'segments', 'segment_bytes',
+                           'segment_records', 'segment_date_created',
+                           'filename']
+
+    def put(self, **kwargs):
+        """ Stores this bin in the datastore and updates the bin cache of
+            this instance. Bins stored in a transaction are not cached, so
+            that the cache never holds uncommitted bins, and must be cached
+            by the caller after the transaction is committed.
+
+        Returns:
+            The key of this bin.
+        """
+
+        key = polymodel.PolyModel.put(self, **kwargs)
+
+        if not db.is_in_transaction():
+            BIN_CACHE.set(self)
+
+        return key
+
+    def put_appended(self):
+        """ Stores the properties of this bin which were changed by appending
+            data to it. The other properties are kept as stored, since they
+            may have been changed while the data was appended (e.g. when the
+            bin was moved to another queue).
+
+        Returns:
+            The key of this bin, or None if the bin was deleted.
+        """
+
+        def put_appended_properties():
+            bin = Bin.get(self.key())
+
+            if bin is None:
+                return None
+
+            for property_name in self.appended_properties:
+                setattr(bin, property_name, getattr(self, property_name))
+
+            bin.put()
+            return bin
+
+        bin = db.run_in_transaction(put_appended_properties)
+
+        if bin is None:
+            return None
+
+        BIN_CACHE.set(bin)
+        return bin.key()
+
+    def delete(self, **kwargs):
+        """ Deletes this bin from the datastore and from the bin cache of
+            this instance.
+        """
+
+        polymodel.PolyModel.delete(self, **kwargs)
+        BIN_CACHE.invalidate(self.key().name())
+
+    def get_queue_name(self):
+        """ Gets the name of the task queue which stores append tasks for
+            this bin. Bins keep the queue they were assigned to, until they
+            are reassigned by the rebalancing job. Bins created before their
+            queue was stored on them keep the queue of the previous sharding
+            scheme.
+
+        Returns:
+            Name of task queue.
+        """
+
+        return self.queue_name or \
+            get_legacy_queue_name_for_bin(self.key().name())
+
+    @classmethod
+    def move_to_queue(cls, bin_name, queue_name, skip_queues=[]):
+        """ Moves a bin to another task queue for append tasks. Tasks already
+            queued in the previous queue are forwarded to the new one when
+            they are executed, and appends for the bin still run one at a
+            time under the lease on the bin.
+
+        Args:
+            bin_name: name of a bin
+            queue_name: name of the task queue
+            skip_queues: names of queues from which the bin is not moved
+
+        Returns:
+            True if the bin was moved.
+        """
+
+        def move():
+            bin = Bin.get_by_key_name(bin_name)
+
+            if bin is None:
+                return None, False
+
+            # Bins created before their queue was stored on them are
+            # backfilled with the queue they used so far
+            is_legacy = bin.queue_name is None
+            if is_legacy:
+                bin.queue_name = bin.get_queue_name()
+
+            if bin.queue_name == queue_name or bin.queue_name in skip_queues:
+                if is_legacy:
+                    bin.put()
+                    return bin, False
+                return None, False
+
+            bin.queue_name = queue_name
+            bin.put()
+            return bin, True
+
+        bin, moved = db.run_in_transaction(move)
+
+        if bin is not None:
+            BIN_CACHE.set(bin)
+
+        if moved:
+            logging.info('Moved bin %s to queue %s.' % (bin_name, queue_name))
+
+        return moved
+
+    @classmethod
+    def promote_if_hot(cls, bin, ingest_counts):
+        """ Moves a bin to a free dedicated queue for hot bins, if it got more
+            than HOT_BIN_PROMOTE_TASKS_PER_MINUTE tasks in each of the last
+            two minutes. This is checked only when the number of tasks in the
+            current minute reaches that threshold, so at most once a minute.
+
+        Args:
+            bin: the Bin
+            ingest_counts: numbers of tasks created for the bin in the
+                           previous and in the current minute
+        """
+
+        if bin.get_queue_name() in HOT_BIN_QUEUES or \
+           ingest_counts[1] != HOT_BIN_PROMOTE_TASKS_PER_MINUTE or \
+           ingest_counts[0] < HOT_BIN_PROMOTE_TASKS_PER_MINUTE:
+            return
+
+        for queue_name in HOT_BIN_QUEUES:
+            hot_bin = Bin.all(keys_only=True)
+            hot_bin = hot_bin.filter('queue_name =', queue_name).get()
+
+            # The bin may already be in a dedicated queue, if it was cached
+            # or the query for free queues was outdated
+            if hot_bin is None:
+                Bin.move_to_queue(bin.key().name(), queue_name,
+                                  HOT_BIN_QUEUES)
+                return
+
+        logging.warning('No free queue for hot bin %s.' % (bin.key().name(),))
+
+    def get_url(self):
+        """ Constructs the URL for this bin resource.
+
+        Returns:
+            String representation of full URL of this bin.
+        """
+
+        return webapp2.uri_for(ROUTE_NAME_BIN,
+                               bin_name=self.key().name(),
+                               _full=True)
+
+    def get_data_url(self):
+        """ Constructs the URL for the recently appended data of this bin.
+
+        Returns:
+            String representation of full URL for the recent data resource of
+            this bin.
+        """
+
+        return webapp2.uri_for(ROUTE_NAME_BIN_DATA,
+                               bin_name=self.key().name(),
+                               _full=True)
+
+    def get_tasks_url(self):
+        """ Constructs the URL for the tasks resource of this bin.
+
+        Returns:
+            String representation of full URL for the task resource of this bin.
+        """
+
+        return webapp2.uri_for(ROUTE_NAME_TASKS,
+                               bin_name=self.key().name(),
+                               _full=True)
+
+    def get_raw_content_url(self):
+        """ (Abstract) Constructs the URL for the raw contents associated with
+            this bin. This URL will be on the domain of the external storage
+            service. Subclasses of Bin must/should implement this method.
+        """
+
+        return None
+
+    def get_html_content_url(self):
+        """ (Abstract) Constructs the URL for the HTML contents associated with
+            this bin. This URL will be on the domain of the external storage
+            service. Subclasses of Bin must/should implement this method.
+        """
+
+        return None
+
+    def get_content_cache_key(self):
+        """ Constructs the memcache key under which the last content written
+            to the external storage service for this bin is cached.
+
+        Returns:
+            String memcache key.
+        """
+
+        return CONTENT_CACHE_KEY_PREFIX + self.key().name() + '/' + \
+               self.filename
+
+    def get_cached_content(self):
+        """ Gets the last content written to the external storage service for
+            this bin, if it is still in the content cache.
+
+        Returns:
+            Dictionary with the cached content ("content") and the version of
+            that content on the external storage service ("version"), or None.
+        """
+
+        return memcache.get(self.get_content_cache_key())
+
+    def set_cached_content(self, content, version):
+        """ Stores the content written to the external storage service for
+            this bin in the content cache, keyed by the bin and the version
+            of that content on the external storage service.
+
+        Args:
+            content: string representing the written document
+            version: version token of the written document, or None if the
+                     external storage service did not return one
+        """
+
+        if version is None or len(content) > CONTENT_CACHE_MAX_BYTES:
+            memcache.delete(self.get_content_cache_key())
+        else:
+            memcache.set(self.get_content_cache_key(),
+                         {'content' : content, 'version' : version},
+                         time=CONTENT_CACHE_SECONDS)
+
+    def is_content_version_current(self, version):
+        """ (Abstract) Checks whether a version of the content associated with
+            this bin is still the current version on the external storage
+            service. Subclasses of Bin must/should implement this method with
+            a request that is much cheaper than fetch_content.
+        """
+
+        return False
+
+    def fetch_content(self):
+        """ (Abstract) Fetches the content associated with this bin and its
+            version from the external storage service. Subclasses of Bin
+            must/should implement this method.
+        """
+
+        return None
+
+    def write_content(self, content, version):
+        """ (Abstract) Writes the content associated with this bin to the
+            external storage service, and returns its new version. Subclasses
+            of Bin must/should implement this method.
+        """
+
+        return None
+
+    def append_content(self, data):
+        """ (Abstract) Appends data to the end of the file associated with
+            this bin on the external storage service, without reading it.
+            Subclasses of Bin which support native append must implement this
+            method.
+        """
+
+        return None
+
+    def get_rate_limit_info(self):
+        """ Constructs the information about the rate limit of the storage
+            service API for the OAuth token of this bin, which is sent over
+            the network to clients. Subclasses which call an API on behalf of
+            a token should override this method.
+
+        Returns:
+            Dictionary of rate limit properties, or None if not known.
+        """
+
+        return None
+
+    def delete_content(self):
+        """ (Abstract) Deletes the files of all segments of this bin from the
+            external storage service, and returns whether they were deleted.
+            Subclasses of Bin must/should implement this method.
+        """
+
+        return False
+
+    def delete_tasks(self):
+        """ Deletes all tasks of this bin, in batches.
+
+        Returns:
+            Number of deleted tasks.
+        """
+
+        query = Task.all(keys_only=True).filter('bin =', self.key())
+        deleted_count = 0
+
+        while True:
+            task_keys = query.fetch(CLEANUP_BATCH_SIZE)
+
+            if len(task_keys) == 0:
+                return deleted_count
+
+            db.delete(task_keys)
+            deleted_count += len(task_keys)
+            query.with_cursor(query.cursor())
+
+    def delete_cached_data(self):
+        """ Deletes the cached content of all segments and the tail of this
+            bin.
+        """
+
+        bin_name = self.key().name()
+
+        memcache.delete_multi(
+            [CONTENT_CACHE_KEY_PREFIX + bin_name + '/' + filename
+             for filename in self.segments or [self.filename]] +
+            [BinTail.get_memcache_key(bin_name)])
+
+        db.delete(db.Key.from_path(BinTail.kind(), bin_name))
+
+    def append_data(self, records):
+        """ Appends data to the external storage service, picking the cheapest
+            strategy that the capabilities of the storage backend allow:
+            1) if the backend supports native append and the output format is
+               append-only, only the new data is sent
+            2) otherwise existing data is taken from the content cache if
+               the cached version is still current (or if the backend will
+               reject writes based on an outdated version), and only fetched
+               from the external storage service otherwise. New data is then
+               appended locally and the results are written back.
+
+        Args:
+            records: list of dictionary-like objects with key-value data to
+                     be appended to existing data
+
+        Raises:
+            HTTPError if an external storage service API invocation failed.
+        """
+
+        if self.is_segment_full():
+            self.rotate_segment()
+            logging.debug('Rotated bin %s to segment %s.' % \
+                          (self.key().name(), self.filename))
+
+            # If this fails after the file of the new segment was written,
+            # the bin is not stored, so the retry rotates to the same file
+            # again and backends overwrite it (see write_content)
+            self.write_appended_content(
+                OUTPUT_FORMATS_EMPTY_DATA[self.output_format], None, records)
+            self.initialize_segment()
+            return
+
+        if self.supports_native_append and self.segment_records and \
+           self.output_format in APPEND_ONLY_OUTPUT_FORMATS:
+            appended_data = get_appended_data(self.output_format, records)
+            self.check_object_size(
+                (self.segment_bytes or 0) + len(appended_data))
+            self.append_content(appended_data)
+
+            self.segment_bytes = (self.segment_bytes or 0) + len(appended_data)
+            self.segment_records += len(records)
+            return
+
+        cached_content = self.get_cached_content()
+
+        if cached_content is not None and \
+           (self.supports_conditional_writes or \
+            self.is_content_version_current(cached_content['version'])):
+            logging.debug('Using cached content for bin %s, version %s.' % \
+                          (self.key().name(), cached_content['version']))
+            try:
+                self.write_appended_content(cached_content['content'],
+                                            cached_content['version'],
+                                            records)
+                return
+            except HTTPConflict:
+                logging.debug('Cached content for bin %s is outdated.' % \
+                              (self.key().name(),))
+
+        content, version = self.fetch_content()
+        self.write_appended_content(content, version, records)
+
+    def write_appended_content(self, content, version, records):
+        """ Appends data to existing content, writes the result to the external
+            storage service and caches the written content.
+
+        Args:
+            content: string representing existing data/document
+            version: version of content on the external storage service
+            records: list of dictionary-like objects with key-value data to
+                     be appended to content
+
+        Raises:
+            HTTPError if an external storage service API invocation failed.
+        """
+
+        new_content = append_data(content, self.output_format, records)
+        self.check_object_size(len(new_content))
+        new_version = self.write_content(new_content, version)
+        self.set_cached_content(new_content, new_version)
+
+        self.segment_bytes = len(new_content)
+        self.segment_records = (self.segment_records or 0) + len(records)
+
+    def check_object_size(self, size):
+        """ Checks that the storage backend can store the active segment of
+            bin data with a new size.
+
+        Args:
+            size: size of the segment after appending data, in bytes
+
+        Raises:
+            HTTPRequestEntityTooLarge if the segment would be larger than the
+            max_object_size of the storage backend.
+        """
+
+        if self.max_object_size and size > self.max_object_size:
+            raise HTTPRequestEntityTooLarge(ERROR_MSG_OBJECT_TOO_LARGE % \
+                                            (self.filename,
+                                             self.max_object_size))
+
+    def is_segment_full(self):
+        """ Checks whether the active segment of bin data has reached a limit
+            of the rotation policy of this bin.
+
+        Returns:
+            True if new data should be appended to a new segment.
+        """
+
+        if self.rotation_max_bytes and \
+           (self.segment_bytes or 0) >= self.rotation_max_bytes:
+            return True
+
+        if self.rotation_max_records and \
+           (self.segment_records or 0) >= self.rotation_max_records:
+            return True
+
+        if self.rotation_period and self.segment_date_created is not None:
+            period_format = ROTATION_PERIOD_FORMATS[self.rotation_period]
+            return self.segment_date_created.strftime(period_format) != \
+                   datetime.utcnow().strftime(period_format)
+
+        return False
+
+    def rotate_segment(self):
+        """ Makes a new segment of bin data the active segment, i.e. the one
+            that new data is appended to. The segment is created on the
+            external storage service by the first append to it.
+        """
+
+        segments = self.segments or [self.filename]
+        root, extension = os.path.splitext(segments[0])
+
+        self.filename = SEGMENT_FILENAME % (root, len(segments), extension)
+        self.segments = segments + [self.filename]
+        self.segment_bytes = 0
+        self.segment_records = 0
+        self.segment_date_created = datetime.utcnow()
+
+    def initialize_segment(self):
+        """ Initializes bin information which depends on the file of the active
+            segment, after that file was created on the external storage
+            service. Subclasses of Bin may implement this method.
+        """
+
+        pass
+
+    def get_info(self, tasks_page=None, include_tasks=True):
+        """ Constructs the information about this bin resource that is sent
+            over the network to clients.
+
+        Args:
+            tasks_page: tuple of the list of most recent Tasks of this bin,
+                        newest first, and the cursor of the next page of
+                        tasks, if they were already fetched. If None, tasks
+                        are fetched by this method.
+            include_tasks: whether or not tasks are included in the
+                           information.
+
+        Returns:
+            Dictionary of bin properties and tasks.
+        """
+
+        bin_info = {
+          'bin_id' : self.key().name(),
+          'bin_url' : self.get_url(),
+          'date_created' : self.date_created.strftime(DEFAULT_DATETIME_FORMAT),
+          'date_updated' : self.date_updated.strftime(DEFAULT_DATETIME_FORMAT),
+          'output_format' : self.output_format,
+          'datetime_format' : DEFAULT_DATETIME_FORMAT,
+          'storage_backend' : self.storage_backend,
+          'content_raw_url' : self.get_raw_content_url(),
+          'content_html_url' : self.get_html_content_url(),
+          'data_url' : self.get_data_url(),
+          'tasks_url' : self.get_tasks_url(),
+          'rotation_max_bytes' : self.rotation_max_bytes,
+          'rotation_max_records' : self.rotation_max_records,
+          'rotation_period' : self.rotation_period,
+          'segments' : self.segments or [self.filename]
+        }
+
+        if include_tasks:
+            if tasks_page is None:
+                tasks_page = fetch_page(self.get_tasks_query(),
+                                        BIN_INFO_TASKS_LIMIT, None)
+
+            tasks, tasks_cursor = tasks_page
+            bin_info['tasks'] = [task.get_info(self) for task in tasks]
+            bin_info['tasks_next_url'] = None
+
+            if tasks_cursor is not None:
+                bin_info['tasks_next_url'] = \
+                    get_page_url(self.get_tasks_url(), {}, tasks_cursor)
+
+        return bin_info
+
+    @classmethod
+    def generate_name(cls):
+        """ Generates a name for a Bin. Since the bin URL is the secret that
+            grants appending to the bin, the name is entirely random and
+            reveals nothing about the bin. Collisions are practically
+            impossible, and are detected when the bin is stored (see insert).
+
+        Returns:
+            String representing a random name for a bin.
+        """
+
+        return webapp2_extras.security.generate_random_string(BIN_NAME_LENGTH)
+
+    def insert(self):
+        """ Stores this new bin in the datastore, unless a bin with the same
+            name already exists.
+
+        Returns:
+            The key of this bin.
+
+        Raises:
+            HTTPConflict if a bin with the same name already exists.
+        """
+
+        def insert_if_absent():
+            if Bin.get(self.key()) is not None:
+                raise HTTPConflict('Bin %s already exists.' % \
+                                   (self.key().name(),))
+            return polymodel.PolyModel.put(self)
+
+        key = db.run_in_transaction(insert_if_absent)
+        BIN_CACHE.set(self)
+        return key
+
+    def get_tasks_query(self):
+        """ Constructs the query for tasks of this bin, newest first.
+
+        Returns:
+            Query for Tasks.
+        """
+
+        return Task.all().filter('bin =', self.key()).order('-date_created')
+
+    def get_etag_values(self):
+        """ Gets the values that identify the state of this bin for the
+            entity tags of responses which represent it. Everything but the
+            tasks that is sent to clients changes only together with the
+            date of the last update.
+
+        Returns:
+            Tuple of values.
+        """
+
+        return (self.key().name(), self.date_updated)
+
+    @classmethod
+    def get_tasks_for_bins(cls, bins):
+        """ Fetches the most recent tasks of many bins. The queries for tasks
+            of all bins are started before any of the results are read, so
+            that they run in parallel instead of one after another.
+
+        Args:
+            bins: list of Bins
+
+        Returns:
+            Dictionary of bin keys to tuples of the list of most recent Tasks
+            of that bin, newest first, and the cursor of the next page of
+            tasks (see fetch_page).
+        """
+
+        queries = []
+        for bin in bins:
+            query = bin.get_tasks_query()
+            queries.append((bin.key(), query,
+                            query.run(limit=BIN_INFO_TASKS_LIMIT,
+                                      batch_size=BIN_INFO_TASKS_LIMIT)))
+
+        bins_tasks = {}
+        for bin_key, query, tasks in queries:
+            tasks = list(tasks)
+
+            next_cursor = None
+            if len(tasks) == BIN_INFO_TASKS_LIMIT:
+                next_cursor = query.cursor()
+
+            bins_tasks[bin_key] = (tasks, next_cursor)
+
+        return bins_tasks
+
+    @classmethod
+    def serialize(cls, bins, content_type, include_tasks=True, next_url=None,
+                  bins_tasks=None):
+        """ Serializes a Bin or list of Bins based on the desired output
+            mime type.
+
+        Args:
+            bins: a Bin instance or list of Bins
+            content_type: mime type to which bins should be serialized
+            include_tasks: whether or not the tasks of bins are included
+            next_url: URL of the next page of the list of bins, if any
+            bins_tasks: most recent Tasks of bins, if they were already
+                        fetched. For a Bin, a tuple as described in
+                        Bin.get_info, and for a list of Bins, a dictionary as
+                        returned by get_tasks_for_bins.
+
+        Returns:
+            String representation of bins in content_type format.
+
+        Raises:
+            HTTPNotAcceptable is content_type is not supported by application.
+        """
+
+        bins_info = None
+
+        if isinstance(bins, Bin):
+            bins_info = bins.get_info(bins_tasks, include_tasks)
+        else:
+            if bins_tasks is None:
+                bins_tasks = {}
+                if include_tasks:
+                    bins_tasks = Bin.get_tasks_for_bins(bins)
+
+            bins_info = []
+            for bin in bins:
+                bins_info.append(bin.get_info(bins_tasks.get(bin.key()),
+                                              include_tasks))
+
+        if content_type in [MIME_TYPE_JSON, MIME_TYPE_TEXT]:
+            return json.dumps(bins_info, indent=JSON_INDENT)
+        elif content_type in [MIME_TYPE_HTML]:
+            if isinstance(bins, Bin):
+                template = JINJA_ENVIRONMENT.get_template(TEMPLATE_BIN)
+            else:
+                template = JINJA_ENVIRONMENT.get_template(TEMPLATE_BINS)
+            return template.render({'bins' : bins_info, 'next_url' : next_url})
+        else:
+            # should never happen because it is detected earlier
+            raise HTTPNotAcceptable(ERROR_MSG_NOT_ACCEPTABLE % \
+                      (content_type, SUPPORTED_OUTPUT_APPENDR_MIME_TYPES))
+
+
+    @classmethod
+    def get_user_id_for_token(cls, storage_backend, api_token):
+        """ Gets the user id for an OAuth token of a specific backend storage
+            service. The user id is specific for the storage backend so this
+            method delegated to a subclass that will fetch this id via an
+            API call to the backend service.
+
+        Args:
+            storage_backend: id of the backend storage service for which the
+                             API token is valid.
+            api_token: OAuth API token for a backend storage service.
+
+        Returns:
+            String representation of user id associated with api_token.
+
+        Raises:
+            HTTPClientError if storage_backend is not supported by application.
+        """
+
+        if storage_backend not in SUPPORTED_STORAGE_BACKENDS:
+            raise HTTPClientError('Unsupported storage service: ' + \
+                                  storage_backend)
+
+        cache_key = Bin.get_user_id_cache_key(storage_backend, api_token)
+        cached_user_id = memcache.get(cache_key)
+
+        if cached_user_id is not None:
+            if 'user_id' in cached_user_id:
+                return cached_user_id['user_id']
+
+            raise status_map[cached_user_id['status_code']](\
+                cached_user_id['message'])
+
+        bin_class = SUPPORTED_STORAGE_BACKENDS[storage_backend]
+
+        try:
+            user_id = bin_class.get_user_id_for_token(api_token)
+        except HTTPError as e:
+            if e.code in USER_ID_CACHE_REJECTED_STATUS_CODES:
+                memcache.set(cache_key,
+                             {'status_code' : e.code, 'message' : e.detail},
+                             time=USER_ID_CACHE_REJECTED_SECONDS)
+            raise
+
+        Bin.cache_user_id(storage_backend, api_token, user_id)
+        return user_id
+
+    @classmethod
+    def get_user_id_cache_key(cls, storage_backend, api_token):
+        """ Constructs the memcache key under which the user id for an OAuth
+            token is cached. The key contains a hash of the token, so that
+            tokens are not stored in memcache.
+
+        Args:
+            storage_backend: id of the backend storage service for which the
+                             API token is valid.
+            api_token: OAuth API token for a backend storage service.
+
+        Returns:
+            String memcache key.
+        """
+
+        return USER_ID_CACHE_KEY_PREFIX + storage_backend + '/' + \
+               hashlib.sha256(api_token.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def cache_user_id(cls, storage_backend, api_token, user_id):
+        """ Caches the user id for an OAuth token of a specific backend
+            storage service, so that finding bins with that token doesn't
+            require an API call to the backend service.
+
+        Args:
+            storage_backend: id of the backend storage service for which the
+                             API token is valid.
+            api_token: OAuth API token for a backend storage service.
+            user_id: string representation of user id associated with
+                     api_token.
+        """
+
+        memcache.set(Bin.get_user_id_cache_key(storage_backend, api_token),
+                     {'user_id' : user_id},
+                     time=USER_ID_CACHE_SECONDS)
+
+    @classmethod
+    def create(cls, params):
+        """ Creates a Bin from input parameters. This method delegates to
+            subclasses to finish parameter validation, bin creation and
+            initialization.
+
+        Args:
+            params: a dictionary-like object with parameters for creating
+            a Bin. Parameters may vary based on backend storage service used
+            for this Bin.
+
+        Returns:
+            Bin instance which has not been written to datastore.
+
+        Raises:
+            HTTPClientError if parameters define a storage backend that is
+            not supported by the application.
+        """
+
+        validate_input_param(params, 'storage_backend', False,
+                             SUPPORTED_STORAGE_BACKENDS.keys(),
+                             DEFAULT_STORAGE_BACKEND)
+
+        validate_input_param(params, 'output_format', False,
+                             SUPPORTED_OUTPUT_EXTERNAL_DATA_MIME_TYPES,
+                             DEFAULT_OUTPUT_EXTERNAL_DATA_MIME_TYPE)
+
+        for param_name in ['rotation_max_bytes', 'rotation_max_records']:
+            validate_input_param(params, param_name, False,
+                                 validate_positive_integer,
+                                 None)
+
+            if params[param_name] is not None:
+                params[param_name] = int(params[param_name])
+
+        validate_input_param(params, 'rotation_period', False,
+                             SUPPORTED_ROTATION_PERIODS,
+                             None)
+
+        bin_name = Bin.generate_name()
+        bin = None
+
+        logging.debug('Creating bin %s.' % (bin_name,))
+
+        bin_class = SUPPORTED_STORAGE_BACKENDS[params['storage_backend']]
+        bin = bin_class(key_name=bin_name)
+
+        bin.output_format = params['output_format']
+        bin.storage_backend = params['storage_backend']
+        bin.rotation_max_bytes = params['rotation_max_bytes']
+        bin.rotation_max_records = params['rotation_max_records']
+        bin.rotation_period = params['rotation_period']
+        bin.queue_name = get_queue_name_for_bin(bin_name)
+        bin.initialize(bin_name, params)
+
+        bin.segments = [bin.filename]
+        bin.segment_bytes = len(OUTPUT_FORMATS_EMPTY_DATA[bin.output_format])
+
+        Bin.cache_user_id(bin.storage_backend, params['api_token'],
+                          bin.storage_user_id)
+
+        return bin
+
+################################################################################
+# GistBin model
+################################################################################
+
+@register_storage_backend
+class GistBin(Bin):
+    """ A Bin implementation that uses GitHub Gists for storing data. """
+
+    # The GitHub API truncates gist file contents larger than 1MB. Segments
+    # are files of the same gist, and gist API responses contain all files,
+    # so rotation doesn't reduce the cost of appends to gist bins
+    storage_backend_id = STORAGE_BACKEND_GIST
+    max_object_size = 1024*1024
+
+    is_public = db.BooleanProperty()
+    gist_id = db.StringProperty()
+    api_token = db.StringProperty()
+    filename = db.StringProperty()
+
+    def get_gist_api_url(self):
+        """ Constructs the URL for fetching the representation of the
+            gist that stores the data for this bin, via the GitHub API.
+
+        Returns:
+            String representation of GitHub API resource that stores the data
+            for this bin.
+        """
+
+        return 'https://api.github.com/gists/' + self.gist_id
+
+    def get_gist_commits_api_url(self):
+        """ Constructs the URL for fetching the latest version in the history
+            of the gist that stores the data for this bin, via the GitHub API.
+
+        Returns:
+            String representation of GitHub API resource that lists the
+            versions of the gist.
+        """
+
+        return self.get_gist_api_url() + '/commits?per_page=1'
+
+    def get_raw_content_url(self):
+        """ Implementation of the Bin abstract method.
+
+        Returns:
+            String representation of URL of resource on GitHub domain that
+            contains the raw data for this Bin.
+        """
+
+        return 'https://gist.github.com/raw/' + self.gist_id + \
+                '/' + self.filename
+
+    def get_html_content_url(self):
+        """ Implementation of the Bin abstract method.
+
+        Returns:
+            String representation of URL of resource on GitHub domain that
+            contains the HTML page with data for this Bin.
+        """
+
+        return 'https://gist.github.com/' + self.gist_id
+
+    def get_info(self, tasks_page=None, include_tasks=True):
+        """ Constructs the information about this GistBin resource that is sent
+            over the network to clients. First constructs the generic Bin
+            information and the adds GistBin specific information.
+
+        Args:
+            tasks_page: most recent Tasks of this bin, see Bin.get_info
+            include_tasks: whether or not tasks are included in the
+                           information
+
+        Returns:
+            Dictionary of bin properties and tasks.
+        """
+
+        bin_info = Bin.get_info(self, tasks_page, include_tasks)
+
+        bin_info['is_public'] = self.is_public
+        bin_info['gist_id'] = self.gist_id
+        bin_info['filename'] = self.filename
+        bin_info['gist_api_url'] = self.get_gist_api_url()
+
+        return bin_info
+
+    @classmethod
+    def get_user_id_for_token(cls, api_token):
+        """ Retrieves the user id for a GitHub OAuth token.
+
+        Args:
+            api_token: OAuth token for GitHub API.
+
+        Returns:
+            String representation of GitHub user id associated with api_token.
+        """
+
+        auth_headers = {
+            'Authorization': 'token ' + api_token
+        }
+
+        response = fetch_storage_api(
+                            url='https://api.github.com/user',
+                            headers=auth_headers,
+                            deadline=URLFETCH_DEADLINE,
+                            api_token=api_token,
+                            validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if response.status_code != 200:
+            raise status_map[response.status_code](\
+                'Error while calling GitHub API - fetch user information\n' + \
+                response.content)
+        else:
+            return str(json.loads(response.content)['id'])
+
+    def is_content_version_current(self, version):
+        """ Implementation of the Bin abstract method. Checks the latest
+            version in the gist history, which is much cheaper than fetching
+            the gist with its content.
+
+        Args:
+            version: gist history version of cached content
+
+        Returns:
+            True if version is the latest version of the gist.
+        """
+
+        auth_headers = {
+            'Authorization': 'token ' + self.api_token
+        }
+
+        commits_response = fetch_storage_api(
+                            url=self.get_gist_commits_api_url(),
+                            headers=auth_headers,
+                            deadline=URLFETCH_DEADLINE,
+                            api_token=self.api_token,
+                            validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if commits_response.status_code != 200:
+            return False
+
+        json_commits = json.loads(commits_response.content)
+        return len(json_commits) > 0 and json_commits[0]['version'] == version
+
+    def fetch_content(self):
+        """ Implementation of the Bin abstract method.
+
+        Returns:
+            Tuple of the content of the gist file that stores the data for this
+            bin and the gist history version of that content.
+
+        Raises:
+            HTTPError if GitHub API invocation failed.
+        """
+
+        auth_headers = {
+            'Authorization': 'token ' + self.api_token
+        }
+
+        gist_response = fetch_storage_api(
+                            url=self.get_gist_api_url(),
+                            headers=auth_headers,
+                            deadline=URLFETCH_DEADLINE,
+                            api_token=self.api_token,
+                            validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if gist_response.status_code != 200:
+            raise status_map[gist_response.status_code](\
+                'Error while calling GitHub API - fetch gist data\n' + \
+                gist_response.content)
+
+        json_gist = json.loads(gist_response.content)
+
+        return (json_gist['files'][self.filename]['content'],
+                json_gist['history'][0]['version'])
+
+    def write_content(self, content, version):
+        """ Implementation of the Bin abstract method. Gists have no
+            conditional updates, so version is not used.
+
+        Args:
+            content: new content of the gist file
+            version: gist history version that content is based on
+
+        Returns:
+            The gist history version of the written content.
+
+        Raises:
+            HTTPError if GitHub API invocation failed.
+        """
+
+        new_payload = json.dumps({
+            'files' : {
+                self.filename : {
+                    'content' : content
+                }
+            }
+        })
+
+        gist_headers = {
+            'Content-Type': MIME_TYPE_JSON,
+            'Authorization': 'token ' + self.api_token
+        }
+
+        result = fetch_storage_api(url=self.get_gist_api_url(),
+                                   payload=new_payload,
+                                   method=urlfetch.POST,
+                                   headers=gist_headers,
+                                   deadline=URLFETCH_DEADLINE,
+                                   api_token=self.api_token,
+                                   validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if result.status_code != 200:
+            raise status_map[result.status_code](\
+                'Error while calling GitHub API - update gist data\n' + \
+                result.content)
+
+        return json.loads(result.content)['history'][0]['version']
+
+    def get_rate_limit_info(self):
+        """ Overrides the Bin method.
+
+        Returns:
+            Dictionary of rate limit properties of the GitHub token of this
+            bin, or None if not known.
+        """
+
+        return get_rate_limit_info(self.api_token)
+
+    def delete_content(self):
+        """ Implementation of the Bin abstract method. Deletes the gist, which
+            contains the files of all segments.
+
+        Returns:
+            True.
+
+        Raises:
+            HTTPError if GitHub API invocation failed.
+        """
+
+        auth_headers = {
+            'Authorization': 'token ' + self.api_token
+        }
+
+        result = fetch_storage_api(url=self.get_gist_api_url(),
+                                   method=urlfetch.DELETE,
+                                   headers=auth_headers,
+                                   deadline=URLFETCH_DEADLINE,
+                                   api_token=self.api_token,
+                                   validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if result.status_code not in [204, 404]:
+            raise status_map[result.status_code](\
+                'Error while calling GitHub API - delete gist\n' + \
+                result.content)
+
+        return True
+
+    def initialize(self, bin_name, params):
+        """ Initializes a GistBin by creating a GitHub gist and writing
+            initial data since files in a gist can't be empty.
+
+        Args:
+            bin_name: name of the Bin to be initialized (not used here)
+            params: dictionary-like object with parameters relevant for
+                    GistBin creation
+
+        Raises:
+            HTTPError if GitHub API invocations failed.
+        """
+
+        if 'is_public' in params:
+            if params['is_public'] == 'true':
+                params['is_public'] = True
+            elif params['is_public'] == 'false':
+                params['is_public'] = False
+
+        validate_input_param(params, 'is_public', False,
+                             [True, False],
+                             False)
+
+        validate_input_param(params, 'api_token', True,
+                             validate_non_empty_string,
+                             False)
+
+        validate_input_param(params, 'filename', False,
+                             validate_non_empty_string,
+                             DEFAULT_FILENAME % \
+                                 (OUTPUT_FORMATS_FILE_EXTENSIONS[
+                                      params['output_format']],))
+
+        gist_url = 'https://api.github.com/gists'
+
+        gist_headers = {
+            'Content-Type': MIME_TYPE_JSON,
+            'Authorization': 'token ' + params['api_token']
+        }
+
+        empty_data_string = OUTPUT_FORMATS_EMPTY_DATA[params['output_format']]
+
+        gist_payload = json.dumps({
+            'description' : DEFAULT_GIST_MESSAGE % (params['filename'],),
+            'public' : params['is_public'],
+            'files' : {
+                params['filename'] : {
+                    'content' : empty_data_string
+                }
+            }
+        })
+
+        result = fetch_storage_api(url=gist_url,
+                                   payload=gist_payload,
+                                   method=urlfetch.POST,
+                                   headers=gist_headers,
+                                   deadline=URLFETCH_DEADLINE,
+                                   api_token=params['api_token'],
+                                   validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if result.status_code != 201:
+            raise status_map[result.status_code](\
+                'Error while calling GitHub API - create gist\n' + \
+                result.content)
+
+        json_content = json.loads(result.content)
+
+        self.is_public = params['is_public']
+        self.gist_id = json_content['id']
+        self.api_token = params['api_token']
+        self.filename = params['filename']
+        self.storage_user_id = str(json_content['user']['id'])
+
+################################################################################
+# GitHubRepoBin model
+################################################################################
+
+@register_storage_backend
+class GitHubRepoBin(Bin):
+    """ A Bin implementation that uses GitHub repositories for storing data. """
+
+    # The GitHub contents API only serves files up to 1MB
+    storage_backend_id = STORAGE_BACKEND_GITHUB_REPO
+    supports_conditional_writes = True
+    max_object_size = 1024*1024
+
+    repo = db.StringProperty()
+    api_token = db.StringProperty()
+    filename = db.StringProperty()
+
+    def get_repo_api_url(self):
+        """ Constructs the URL for fetching the representation of the
+            repo that stores the data for this bin, via the GitHub API.
+
+        Returns:
+            String representation of GitHub API resource that stores the data
+            for this bin.
+        """
+
+        return 'https://api.github.com/repos/' + self.repo + '/contents/' + \
+               self.filename
+
+    def get_raw_content_url(self):
+        """ Implementation of the Bin abstract method.
+
+        Returns:
+            String representation of URL of resource on GitHub domain that
+            contains the raw data for this Bin.
+        """
+
+        return 'https://raw.github.com/' + self.repo + '/master/' + \
+               self.filename
+
+    def get_html_content_url(self):
+        """ Implementation of the Bin abstract method.
+
+        Returns:
+            String representation of URL of resource on GitHub domain that
+            contains the HTML page with data for this Bin.
+        """
+
+        return 'https://github.com/' + self.repo + '/blob/master/' + \
+               self.filename
+
+    def get_info(self, tasks_page=None, include_tasks=True):
+        """ Constructs the information about this GitHubRepoBin resource that
+            is sent over the network to clients. First constructs the generic
+            Bin information and the adds GitHubRepoBin specific information.
+
+        Args:
+            tasks_page: most recent Tasks of this bin, see Bin.get_info
+            include_tasks: whether or not tasks are included in the
+                           information
+
+        Returns:
+            Dictionary of bin properties and tasks.
+        """
+
+        bin_info = Bin.get_info(self, tasks_page, include_tasks)
+
+        bin_info['repo'] = self.repo
+        bin_info['filename'] = self.filename
+        bin_info['repo_api_url'] = self.get_repo_api_url()
+
+        return bin_info
+
+    @classmethod
+    def get_user_id_for_token(cls, api_token):
+        """ Retrieves the user id for a GitHub OAuth token.
+
+        Args:
+            api_token: OAuth token for GitHub API.
+
+        Returns:
+            String representation of GitHub user id associated with api_token.
+        """
+
+        auth_headers = {
+            'Authorization': 'token ' + api_token
+        }
+
+        response = fetch_storage_api(
+                            url='https://api.github.com/user',
+                            headers=auth_headers,
+                            deadline=URLFETCH_DEADLINE,
+                            api_token=api_token,
+                            validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if response.status_code != 200:
+            raise status_map[response.status_code](\
+                'Error while calling GitHub API - fetch user information\n' + \
+                response.content)
+        else:
+            return str(json.loads(response.content)['id'])
+
+    def fetch_content(self):
+        """ Implementation of the Bin abstract method.
+
+        Returns:
+            Tuple of the content of the repo file that stores the data for this
+            bin and the blob sha of that content.
+
+        Raises:
+            HTTPError if GitHub API invocation failed.
+        """
+
+        auth_headers = {
+            'Authorization': 'token ' + self.api_token
+        }
+
+        repo_response = fetch_storage_api(
+                            url=self.get_repo_api_url(),
+                            headers=auth_headers,
+                            deadline=URLFETCH_DEADLINE,
+                            api_token=self.api_token,
+                            validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if repo_response.status_code != 200:
+            raise status_map[repo_response.status_code](\
+                'Error while calling GitHub API - fetch repo data\n' + \
+                repo_response.content)
+
+        json_file = json.loads(repo_response.content)
+        return (base64.b64decode(json_file['content']), json_file['sha'])
+
+    def write_content(self, content, version):
+        """ Implementation of the Bin abstract method.
+
+        Args:
+            content: new content of the repo file
+            version: blob sha of the repo file that content is based on, or
+                     None if the file is being created. If the file already
+                     exists, it is overwritten.
+
+        Returns:
+            The blob sha of the written content.
+
+        Raises:
+            HTTPConflict if version is not the current blob sha of the file.
+            HTTPError if GitHub API invocation failed.
+        """
+
+        new_payload = {
+            'message' : 'appendr update',
+            'content' : base64.b64encode(content)
+        }
+
+        if version is not None:
+            new_payload['sha'] = version
+
+        new_payload = json.dumps(new_payload)
+
+        repo_headers = {
+            'Content-Type': MIME_TYPE_JSON,
+            'Authorization': 'token ' + self.api_token
+        }
+
+        result = fetch_storage_api(url=self.get_repo_api_url(),
+                                   payload=new_payload,
+                                   method=urlfetch.PUT,
+                                   headers=repo_headers,
+                                   deadline=URLFETCH_DEADLINE,
+                                   api_token=self.api_token,
+                                   validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        # The file of a new segment may already exist if an earlier attempt
+        # to append to it failed after creating it, in which case it is
+        # overwritten, since that attempt is retried
+        if result.status_code == 422 and version is None:
+            return self.write_content(content, self.fetch_content()[1])
+
+        # The file of a new segment is created by writing to it
+        if result.status_code not in [200, 201]:
+            raise status_map[result.status_code](\
+                'Error while calling GitHub API - update repo data\n' + \
+                result.content)
+
+        return json.loads(result.content)['content']['sha']
+
+    def get_rate_limit_info(self):
+        """ Overrides the Bin method.
+
+        Returns:
+            Dictionary of rate limit properties of the GitHub token of this
+            bin, or None if not known.
+        """
+
+        return get_rate_limit_info(self.api_token)
+
+    def delete_content(self):
+        """ Implementation of the Bin abstract method. Files in a repository
+            are not deleted, since the repository belongs to the user and
+            may hold other data, and deleting a file only adds a commit that
+            keeps the data in the repository history.
+
+        Returns:
+            False.
+        """
+
+        return False
+
+    def initialize(self, bin_name, params):
+        """ Initializes a GitHubRepoBin by creating a GitHub file and writing
+            initial data since files in a repos can't be empty.
+
+        Args:
+            bin_name: name of the Bin to be initialized (not used here)
+            params: dictionary-like object with parameters relevant for
+                    GitHubRepoBin creation
+
+        Raises:
+            HTTPError if GitHub API invocations failed.
+        """
+
+        validate_input_param(params, 'api_token', True,
+                             validate_non_empty_string,
+                             False)
+
+        validate_input_param(params, 'repo', True,
+                             validate_github_repo_string,
+                             False)
+
+        validate_input_param(params, 'filename', False,
+                             validate_non_empty_string,
+                             DEFAULT_FILENAME % \
+                                 (OUTPUT_FORMATS_FILE_EXTENSIONS[
+                                      params['output_format']],))
+
+        self.api_token = params['api_token']
+        self.filename = params['filename']
+        self.repo = params['repo']
+        self.storage_user_id = \
+            str(GitHubRepoBin.get_user_id_for_token(self.api_token))
+
+        repo_headers = {
+            'Content-Type': MIME_TYPE_JSON,
+            'Authorization': 'token ' + params['api_token']
+        }
+
+        empty_data_string = OUTPUT_FORMATS_EMPTY_DATA[params['output_format']]
+
+        repo_payload = json.dumps({
+            'message' : 'appendr create',
+            'content' : base64.b64encode(empty_data_string)
+        })
+
+        result = fetch_storage_api(url=self.get_repo_api_url(),
+                                   payload=repo_payload,
+                                   method=urlfetch.PUT,
+                                   headers=repo_headers,
+                                   deadline=URLFETCH_DEADLINE,
+                                   api_token=params['api_token'],
+                                   validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if result.status_code != 201:
+            raise status_map[result.status_code](\
+                'Error while calling GitHub API - create repo file\n' + \
+                result.content)
+
+        json_content = json.loads(result.content)
+
+################################################################################
+# DropboxBin model
+################################################################################
+
+@register_storage_backend
+class DropboxBin(Bin):
+    """ A Bin implementation that uses Dropbox for storing data. """
+
+    # The Dropbox files_put API accepts files up to 150MB
+    storage_backend_id = STORAGE_BACKEND_DROPBOX
+    max_object_size = 150*1024*1024
+
+    api_token = db.StringProperty()
+    filename = db.StringProperty()
+    dropbox_id = db.StringProperty()
+
+    def get_dropbox_api_url(self):
+        """ Constructs the URL for fetching the representation of the
+            gist that stores the data for this bin, via the Dropbox API.
+
+        Returns:
+            String representation of Dropbox API resource that stores the data
+            for this bin.
+        """
+
+        return 'https://api-content.dropbox.com/1/files/sandbox/' + \
+                self.key().name() + '/' + self.filename
+
+    def get_dropbox_metadata_api_url(self):
+        """ Constructs the URL for fetching the metadata of the file that
+            stores the data for this bin, via the Dropbox API.
+
+        Returns:
+            String representation of Dropbox API resource that describes the
+            file storing the data for this bin.
+        """
+
+        return 'https://api.dropbox.com/1/metadata/sandbox/' + \
+                self.key().name() + '/' + self.filename
+
+    def get_raw_content_url(self):
+        """ Implementation of the Bin abstract method.
+
+        Returns:
+            String representation of URL of resource on Dropbox domain that
+            contains the raw data for this Bin.
+        """
+
+        return 'https://dl.dropboxusercontent.com/s/' + \
+                self.dropbox_id + '/' + self.filename
+
+    def get_html_content_url(self):
+        """ Implementation of the Bin abstract method.
+
+        Returns:
+            String representation of URL of resource on Dropbox domain that
+            contains the HTML page with data for this Bin.
+        """
+
+        return 'https://www.dropbox.com/s/' + \
+                self.dropbox_id + '/' + self.filename
+
+    def get_info(self, tasks_page=None, include_tasks=True):
+        """ Constructs the information about this DropboxBin resource that is
+            sent over the network to clients. First constructs the generic Bin
+            information and the adds DropboxBin specific information.
+
+        Args:
+            tasks_page: most recent Tasks of this bin, see Bin.get_info
+            include_tasks: whether or not tasks are included in the
+                           information
+
+        Returns:
+            Dictionary of bin properties and tasks.
+        """
+
+        bin_info = Bin.get_info(self, tasks_page, include_tasks)
+        bin_info['filename'] = self.filename
+
+        return bin_info
+
+    @classmethod
+    def get_user_id_for_token(cls, api_token):
+        """ Retrieves the user id for a Dropbox OAuth token.
+
+        Args:
+            api_token: OAuth token for Dropbox API.
+
+        Returns:
+            String representation of Dropbox user id associated with api_token.
+        """
+
+        auth_headers = {
+            'Authorization': 'Bearer ' + api_token
+        }
+
+        response = fetch_storage_api(
+                            url='https://api.dropbox.com/1/account/info',
+                            headers=auth_headers,
+                            deadline=URLFETCH_DEADLINE,
+                            api_token=api_token,
+                            validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if response.status_code != 200:
+            raise status_map[response.status_code](\
+                'Error while calling Dropbox API - fetch account info\n' + \
+                response.content)
+        else:
+            return str(json.loads(response.content)['uid'])
+
+    def is_content_version_current(self, version):
+        """ Implementation of the Bin abstract method. Checks the revision in
+            the file metadata, which is much cheaper than fetching the file.
+
+        Args:
+            version: Dropbox revision of cached content
+
+        Returns:
+            True if version is the current revision of the file.
+        """
+
+        auth_headers = {
+            'Authorization': 'Bearer ' + self.api_token
+        }
+
+        metadata_response = fetch_storage_api(
+                                url=self.get_dropbox_metadata_api_url(),
+                                headers=auth_headers,
+                                deadline=URLFETCH_DEADLINE,
+                                api_token=self.api_token,
+                                validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if metadata_response.status_code != 200:
+            return False
+
+        return json.loads(metadata_response.content).get('rev') == version
+
+    def fetch_content(self):
+        """ Implementation of the Bin abstract method.
+
+        Returns:
+            Tuple of the content of the Dropbox file that stores the data for
+            this bin and the Dropbox revision of that content.
+
+        Raises:
+            HTTPError if a Dropbox API invocation fails.
+        """
+
+        auth_headers = {
+            'Authorization': 'Bearer ' + self.api_token
+        }
+
+        dropbox_response = fetch_storage_api(
+                                url=self.get_dropbox_api_url(),
+                                headers=auth_headers,
+                                deadline=URLFETCH_DEADLINE,
+                                api_token=self.api_token,
+                                validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if dropbox_response.status_code != 200:
+            raise status_map[dropbox_response.status_code](\
+                'Error while calling Dropbox API - fetch file data\n' + \
+                dropbox_response.content)
+
+        metadata = dropbox_response.headers.get('x-dropbox-metadata')
+        version = json.loads(metadata).get('rev') if metadata else None
+
+        return (dropbox_response.content, version)
+
+    def write_content(self, content, version):
+        """ Implementation of the Bin abstract method.
+
+        Args:
+            content: new content of the Dropbox file
+            version: Dropbox revision of the file that content is based on
+
+        Returns:
+            The Dropbox revision of the written content.
+
+        Raises:
+            HTTPError if a Dropbox API invocation fails.
+        """
+
+        headers = {
+            'Content-Type': self.output_format,
+            'Authorization': 'Bearer ' + self.api_token
+        }
+
+        url = 'https://api-content.dropbox.com/1/files_put/sandbox/' + \
+              self.key().name() + '/' + self.filename
+
+        result = fetch_storage_api(url=url,
+                                   payload=content,
+                                   method=urlfetch.PUT,
+                                   headers=headers,
+                                   deadline=URLFETCH_DEADLINE,
+                                   api_token=self.api_token,
+                                   validate_certificate=URLFETCH_VALIDATE_CERTS)
 
         if result.status_code != 200:
             raise status_map[result.status_code](\
-                'Error while calling GitHub API - update gist data\n' + \
+                'Error while calling Dropbox API - update file data\n' + \
+                result.content)
+
+        return json.loads(result.content).get('rev')
+
+    def get_rate_limit_info(self):
+        """ Overrides the Bin method.
+
+        Returns:
+            Dictionary of rate limit properties of the Dropbox token of this
+            bin, or None if not known.
+        """
+
+        return get_rate_limit_info(self.api_token)
+
+    def delete_content(self):
+        """ Implementation of the Bin abstract method. Deletes the Dropbox
+            folder of this bin, which contains the files of all segments.
+
+        Returns:
+            True.
+
+        Raises:
+            HTTPError if Dropbox API invocation failed.
+        """
+
+        headers = {
+            'Authorization': 'Bearer ' + self.api_token,
+            'Content-Type': MIME_TYPE_FORM
+        }
+
+        payload = urllib.urlencode({
+            'root' : 'sandbox',
+            'path' : self.key().name()
+        })
+
+        result = fetch_storage_api(
+                            url='https://api.dropbox.com/1/fileops/delete',
+                            payload=payload,
+                            method=urlfetch.POST,
+                            headers=headers,
+                            deadline=URLFETCH_DEADLINE,
+                            api_token=self.api_token,
+                            validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if result.status_code not in [200, 404]:
+            raise status_map[result.status_code](\
+                'Error while calling Dropbox API - delete folder\n' + \
+                result.content)
+
+        return True
+
+    def initialize(self, bin_name, params):
+        """ Initializes a DropboxBin by:
+            1) creating a folder on Dropbox named by the bin name
+            2) creating a file in the folder with the initial data
+            3) resolving the Dropbox id of the file (see initialize_segment)
+
+        Args:
+            bin_name: name of the Bin to be initialized (not used here)
+            params: dictionary-like object with parameters relevant for
+                    DropboxBin creation
+
+        Raises:
+            HTTPError if a Dropbox API invocation fails.
+        """
+        validate_input_param(params, 'api_token', True,
+                             validate_non_empty_string,
+                             False)
+
+        validate_input_param(params, 'filename', False,
+                             validate_non_empty_string,
+                             DEFAULT_FILENAME % \
+                                 (OUTPUT_FORMATS_FILE_EXTENSIONS[
+                                      params['output_format']],))
+
+        url = 'https://api-content.dropbox.com/1/files_put/sandbox/' + \
+              self.key().name() + '/' + params['filename']
+
+        headers = {
+            'Content-Type': params['output_format'],
+            'Authorization': 'Bearer ' + params['api_token']
+        }
+
+        payload = OUTPUT_FORMATS_EMPTY_DATA[params['output_format']]
+
+        result = fetch_storage_api(url=url,
+                                   payload=payload,
+                                   method=urlfetch.PUT,
+                                   headers=headers,
+                                   deadline=URLFETCH_DEADLINE,
+                                   api_token=params['api_token'],
+                                   validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if result.status_code != 200:
+            raise status_map[result.status_code](\
+                'Error while calling Dropbox API - create file\n' + \
+                result.content)
+
+        self.api_token = params['api_token']
+        self.filename = params['filename']
+
+        url = 'https://api.dropbox.com/1/account/info'
+
+        headers = {
+            'Authorization': 'Bearer ' + params['api_token']
+        }
+
+        result = fetch_storage_api(url=url,
+                                   method=urlfetch.GET,
+                                   headers=headers,
+                                   deadline=URLFETCH_DEADLINE,
+                                   api_token=params['api_token'],
+                                   validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if result.status_code != 200:
+            raise status_map[result.status_code](\
+                'Error while calling Dropbox API - fetch account info\n' + \
+                result.content)
+
+        json_content = json.loads(result.content)
+        self.storage_user_id = str(json_content['uid'])
+
+        self.initialize_segment()
+
+    def initialize_segment(self):
+        """ Implementation of the Bin method. Resolves the Dropbox id of the
+            file that stores the data for this bin by:
+            1) fetching the publicly shareable URL for this file
+            2) resolving the publicly shareable URL to get to the Dropbox id
+               for this file. The publicly shareable URL is shortened, so it
+               has to be resolved in order to get the final URL which contains
+               the id.
+
+        Raises:
+            HTTPError if a Dropbox API invocation fails.
+        """
+
+        url = 'https://api.dropbox.com/1/shares/sandbox/' + \
+              self.key().name() + '/' + self.filename
+
+        headers = {
+            'Authorization': 'Bearer ' + self.api_token
+        }
+
+        result = fetch_storage_api(url=url,
+                                   headers=headers,
+                                   deadline=URLFETCH_DEADLINE,
+                                   api_token=self.api_token,
+                                   validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if result.status_code != 200:
+            raise status_map[result.status_code](\
+                'Error while calling Dropbox API - get file public URL\n' + \
+                result.content)
+
+        json_content = json.loads(result.content)
+        self.share_url = json_content['url']
+
+        url = json_content['url']
+
+        result = urlfetch.fetch(url=url,
+                                deadline=URLFETCH_DEADLINE,
+                                validate_certificate=URLFETCH_VALIDATE_CERTS)
+
+        if result.status_code != 200:
+            raise status_map[result.status_code](\
+                'Error while calling Dropbox API - retrieve shared file\n' + \
                 result.content)
 
-    def initialize(self, bin_name, params):
-        """ Initializes a GistBin by creating a GitHub gist and writing
-            initial data since files in a gist can't be empty.
+        # The line below extracts the ID of the file on dropbox so that
+        # it can be used to construct raw content and html content URLs
+        # as described here: https://www.dropbox.com/help/201/en
+        self.dropbox_id = DROPBOX_ID_REGEX.match(result.final_url).group(1)
+
+################################################################################
+# LocalFileBin model
+################################################################################
+
+class LocalFileBin(Bin):
+    """ A Bin implementation that stores data in files on the local filesystem
+        of the instance, under LOCAL_FS_ROOT. Only usable for deployments
+        where that filesystem is writable and shared by all instances.
+    """
+
+    storage_backend_id = STORAGE_BACKEND_LOCAL_FS
+    supports_native_append = True
+
+    filename = db.StringProperty()
+
+    def get_file_path(self):
+        """ Constructs the path of the file that stores the data for this bin.
+
+        Returns:
+            String representation of the local filesystem path.
+        """
+
+        return os.path.join(LOCAL_FS_ROOT, self.key().name(), self.filename)
+
+    def get_raw_content_url(self):
+        """ Implementation of the Bin abstract method.
+
+        Returns:
+            String representation of URL of the appendr resource that serves
+            the raw data for this Bin.
+        """
+
+        return webapp2.uri_for(ROUTE_NAME_BIN_CONTENT,
+                               bin_name=self.key().name(),
+                               _full=True)
+
+    def get_html_content_url(self):
+        """ Implementation of the Bin abstract method. There is no HTML
+            version of local files, so this is the raw data URL.
+
+        Returns:
+            String representation of URL of the appendr resource that serves
+            the raw data for this Bin.
+        """
+
+        return self.get_raw_content_url()
+
+    def get_info(self, tasks_page=None, include_tasks=True):
+        """ Constructs the information about this LocalFileBin resource that
+            is sent over the network to clients. First constructs the generic
+            Bin information and the adds LocalFileBin specific information.
 
         Args:
-            bin_name: name of the Bin to be initialized (not used here)
-            params: dictionary-like object with parameters relevant for
-                    GistBin creation
+            tasks_page: most recent Tasks of this bin, see Bin.get_info
+            include_tasks: whether or not tasks are included in the
+                           information
+
+        Returns:
+            Dictionary of bin properties and tasks.
+        """
+
+        bin_info = Bin.get_info(self, tasks_page, include_tasks)
+        bin_info['filename'] = self.filename
+
+        return bin_info
+
+    @classmethod
+    def get_user_id_for_token(cls, api_token):
+        """ Derives the user id for a token. There are no accounts on the
+            local filesystem, so the token is a secret chosen by the user
+            when creating bins, and bins created with the same token belong
+            to the same user.
+
+        Args:
+            api_token: secret token chosen by the user
+
+        Returns:
+            String representation of user id associated with api_token.
+        """
+
+        return hashlib.sha256(api_token.encode('utf-8')).hexdigest()
+
+    def read_mapped_content(self):
+        """ Memory-maps the file that stores the data for this bin, so that
+            it can be read without copying the whole file into memory.
+
+        Returns:
+            A read-only mmap object of the file, or an empty string if the
+            file is empty (empty files can't be mapped).
 
         Raises:
-            HTTPError if GitHub API invocations failed.
+            HTTPNotFound if the file doesn't exist.
         """
 
-        if 'is_public' in params:
-            if params['is_public'] == 'true':
-                params['is_public'] = True
-            elif params['is_public'] == 'false':
-                params['is_public'] = False
+        try:
+            data_file = open(self.get_file_path(), 'rb')
+        except IOError:
+            raise HTTPNotFound('Bin data file does not exist: ' + \
+                               self.filename)
 
-        validate_input_param(params, 'is_public', False,
-                             [True, False],
-                             False)
+        try:
+            if os.fstat(data_file.fileno()).st_size == 0:
+                return ''
+
+            return mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            data_file.close()
+
+    def fetch_content(self):
+        """ Implementation of the Bin abstract method. Local files have no
+            version, so content is never taken from the content cache.
+
+        Returns:
+            Tuple of the content of the local file that stores the data for
+            this bin and None.
+        """
+
+        mapped_content = self.read_mapped_content()
+
+        try:
+            return (mapped_content[:], None)
+        finally:
+            if mapped_content:
+                mapped_content.close()
+
+    def write_content(self, content, version):
+        """ Implementation of the Bin abstract method. The content is written
+            to a temporary file which then replaces the data file, so readers
+            never see a partially written file.
+
+        Args:
+            content: new content of the local file
+            version: not used
+
+        Returns:
+            None, since local files have no version.
+        """
+
+        if isinstance(content, unicode):
+            content = content.encode('utf-8')
+
+        file_path = self.get_file_path()
+        temp_file_path = file_path + LOCAL_FS_TEMP_SUFFIX
+
+        with open(temp_file_path, 'wb') as temp_file:
+            temp_file.write(content)
+
+        os.rename(temp_file_path, file_path)
+        return None
+
+    def append_content(self, data):
+        """ Implementation of the Bin abstract method. Appends data with a
+            single O_APPEND write, so concurrent appends never overwrite
+            each other.
+
+        Args:
+            data: string to be appended to the end of the local file
+        """
+
+        if isinstance(data, unicode):
+            data = data.encode('utf-8')
+
+        data_fd = os.open(self.get_file_path(),
+                          os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                          LOCAL_FS_FILE_MODE)
+        try:
+            os.write(data_fd, data)
+        finally:
+            os.close(data_fd)
+
+    def delete_content(self):
+        """ Implementation of the Bin abstract method. Deletes the directory
+            of this bin, which contains the files of all segments.
+
+        Returns:
+            True.
+        """
+
+        bin_path = os.path.join(LOCAL_FS_ROOT, self.key().name())
+        if os.path.isdir(bin_path):
+            shutil.rmtree(bin_path)
+
+        return True
+
+    def initialize(self, bin_name, params):
+        """ Initializes a LocalFileBin by creating a directory named by the
+            bin name under LOCAL_FS_ROOT and a file in the directory with the
+            initial data.
+
+        Args:
+            bin_name: name of the Bin to be initialized
+            params: dictionary-like object with parameters relevant for
+                    LocalFileBin creation
+        """
 
         validate_input_param(params, 'api_token', True,
                              validate_non_empty_string,
                              False)
 
         validate_input_param(params, 'filename', False,
-                             validate_non_empty_string,
+                             validate_local_filename,
                              DEFAULT_FILENAME % \
-                                 (params['output_format'].split('/')[-1],))
+                                 (OUTPUT_FORMATS_FILE_EXTENSIONS[
+                                      params['output_format']],))
 
-        gist_url = 'https://api.github.com/gists'
+        self.filename = params['filename']
+        self.storage_user_id = \
+            LocalFileBin.get_user_id_for_token(params['api_token'])
 
-        gist_headers = {
-            'Content-Type': MIME_TYPE_JSON,
-            'Authorization': 'token ' + params['api_token']
+        bin_path = os.path.join(LOCAL_FS_ROOT, bin_name)
+        if not os.path.isdir(bin_path):
+            os.makedirs(bin_path)
+
+        self.write_content(OUTPUT_FORMATS_EMPTY_DATA[params['output_format']],
+                           None)
+
+if LOCAL_FS_ROOT is not None:
+    register_storage_backend(LocalFileBin)
+
+################################################################################
+# Task model
+################################################################################
+
+class Task(db.Model):
+    """ A task for appending data to a Bin. Tasks are root entities, so that
+        creating and completing tasks is not limited by the write rate of the
+        entity group of their Bin, and the tasks of a bin are found by their
+        bin reference.
+    """
+
+    bin = db.ReferenceProperty(Bin)
+    status = db.StringProperty()
+    status_msg = db.StringProperty(multiline=True)
+    payload = db.TextProperty()
+    record_count = db.IntegerProperty(default=1)
+    date_created = db.DateTimeProperty(auto_now_add=True)
+    date_updated = db.DateTimeProperty(auto_now_add=True)
+
+    def get_records(self):
+        """ Parses the key-value data stored in the payload of this Task. The
+            payload is a single set of key-value data for tasks created
+            before bulk appends were supported.
+
+        Returns:
+            List of dictionaries with key-value data to be appended, with the
+            creation date parsed into a datetime object.
+        """
+
+        records = json.loads(self.payload)
+        if not isinstance(records, list):
+            records = [records]
+
+        for params in records:
+            params['date_created'] = \
+                dateutil.parser.parse(params['date_created'])
+
+        return records
+
+    @classmethod
+    def get_coalescable(cls, bin, task):
+        """ Gets queued tasks for a bin which can be appended together with
+            a task in a single read-modify-write of the bin data. Since the
+            query is eventually consistent, the tasks are fetched again by key
+            and only those which are still queued are returned.
+
+        Args:
+            bin: the Bin that tasks belong to
+            task: the Task being executed, excluded from the results
+
+        Returns:
+            List of queued Tasks for bin, oldest first, limited in number by
+            APPEND_COALESCE_MAX_TASKS and in payload size by
+            APPEND_COALESCE_MAX_BYTES.
+        """
+
+        task_keys = Task.all(keys_only=True).filter('bin =', bin.key())
+        task_keys = task_keys.filter('status =', TASK_STATUS_QUEUED)
+        task_keys = task_keys.order('date_created').fetch(
+            APPEND_COALESCE_MAX_TASKS)
+
+        coalesced_tasks = []
+        payload_bytes = len(task.payload or '')
+
+        for queued_task in db.get(task_keys):
+            if queued_task is None or \
+               queued_task.key() == task.key() or \
+               queued_task.status != TASK_STATUS_QUEUED or \
+               queued_task.payload is None:
+                continue
+
+            payload_bytes += len(queued_task.payload)
+            if payload_bytes > APPEND_COALESCE_MAX_BYTES:
+                break
+
+            coalesced_tasks.append(queued_task)
+
+        return coalesced_tasks
+
+    @classmethod
+    def get_for_bin(cls, bin_name, task_name):
+        """ Gets a task of a bin by its name.
+
+        Args:
+            bin_name: name of the bin of the task
+            task_name: name of the task
+
+        Returns:
+            The Task, or None if it doesn't exist or belongs to another bin.
+        """
+
+        task = Task.get_by_key_name(task_name)
+
+        if task is None or task.get_bin_name() != bin_name:
+            return None
+
+        return task
+
+    @classmethod
+    def generate_name(cls):
+        """ Generates a unique name for a Task, without reading the
+            datastore. The name starts with the creation time in milliseconds,
+            so names sort in creation order, followed by random characters
+            that make collisions between tasks created in the same millisecond
+            practically impossible. A collision would also be rejected when
+            adding the task to the task queue, since the Task name is used as
+            the name of the queued task.
+
+        Returns:
+            String representing a unique name for a Task.
+        """
+
+        task_time = encode_base62(int(time.time() * 1000),
+                                  TASK_NAME_TIME_LENGTH)
+
+        return task_time + webapp2_extras.security.generate_random_string(
+            TASK_NAME_LENGTH - TASK_NAME_TIME_LENGTH)
+
+    @classmethod
+    def serialize(cls, tasks, bin, content_type, next_url=None):
+        """ Serializes a Task or list of Tasks based on the desired output
+            mime type.
+
+        Args:
+            tasks: a Task instance or list of Tasks
+            bin: the Bin that tasks belong to
+            content_type: mime type to which tasks should be serialized
+            next_url: URL of the next page of the list of tasks, if any
+
+        Returns:
+            String representation of tasks in content_type format.
+
+        Raises:
+            HTTPNotAcceptable is content_type is not supported by application.
+        """
+
+        tasks_info = None
+
+        if isinstance(tasks, Task):
+            if bin is None:
+                bin = tasks.bin
+            tasks_info = tasks.get_info(bin)
+            tasks_info['rate_limit'] = bin.get_rate_limit_info()
+        else:
+            tasks_info = []
+            for task in tasks:
+                tasks_info.append(task.get_info(bin))
+
+        if content_type in [MIME_TYPE_JSON, MIME_TYPE_TEXT]:
+            return json.dumps(tasks_info, indent=JSON_INDENT)
+        elif content_type in [MIME_TYPE_HTML]:
+            bin_info = None
+            if isinstance(tasks, Task):
+                template = JINJA_ENVIRONMENT.get_template(TEMPLATE_TASK)
+            else:
+                template = JINJA_ENVIRONMENT.get_template(TEMPLATE_TASKS)
+                bin_info = bin.get_info(include_tasks=False)
+            return template.render({'tasks' : tasks_info,
+                                    'bin' : bin_info,
+                                    'rate_limit' : bin.get_rate_limit_info(),
+                                    'next_url' : next_url})
+
+    def get_url(self):
+        """ Constructs the URL for this Task resource.
+
+        Returns:
+            String representation of full URL of this Task.
+        """
+
+        return webapp2.uri_for(ROUTE_NAME_TASK_STATUS,
+                               bin_name=self.get_bin_name(),
+                               task_name=self.key().name(),
+                               _full=True)
+
+    def get_etag_values(self):
+        """ Gets the values that identify the state of this task for the
+            entity tags of responses which represent it.
+
+        Returns:
+            Tuple of values.
+        """
+
+        return (self.key().name(), self.status, self.date_updated)
+
+    def get_bin_name(self):
+        """ Gets the name of the bin of this Task from the stored reference,
+            without fetching the bin from the datastore.
+
+        Returns:
+            String name of the bin of this Task.
+        """
+
+        return Task.bin.get_value_for_datastore(self).name()
+
+    def get_info(self, bin=None):
+        """ Constructs the information about this Task resource that is sent
+            over the network to clients.
+
+        Args:
+            bin: the Bin of this Task, if it was already fetched. If None, the
+                 bin is fetched via the reference of this Task.
+
+        Returns:
+            Dictionary of Task properties.
+        """
+
+        if bin is None:
+            bin = self.bin
+
+        return {
+          'task_id' : self.key().name(),
+          'task_url' : self.get_url(),
+          'tasks_url' : bin.get_tasks_url(),
+          'bin_id' : bin.key().name(),
+          'bin_url' : bin.get_url(),
+          'date_created' : self.date_created.strftime(DEFAULT_DATETIME_FORMAT),
+          'date_updated' : self.date_updated.strftime(DEFAULT_DATETIME_FORMAT),
+          'datetime_format' : DEFAULT_DATETIME_FORMAT,
+          'status' : self.status,
+          'status_msg' : self.status_msg,
+          'record_count' : self.record_count
         }
 
-        empty_data_string = OUTPUT_FORMATS_EMPTY_DATA[params['output_format']]
+################################################################################
+# BinLease model
+################################################################################
 
-        gist_payload = json.dumps({
-            'description' : DEFAULT_GIST_MESSAGE % (params['filename'],),
-            'public' : params['is_public'],
-            'files' : {
-                params['filename'] : {
-                    'content' : empty_data_string
-                }
-            }
-        })
+class BinLease(db.Model):
+    """ A lease on the data of a Bin, keyed by bin name. Append tasks for the
+        same bin may run in parallel, from the same or from different task
+        queues, so each append holds the lease of the bin while it reads,
+        modifies and writes the bin data. A lease expires after a fixed time
+        in case its holder never releases it.
+    """
 
-        result = urlfetch.fetch(url=gist_url,
-                                payload=gist_payload,
-                                method=urlfetch.POST,
-                                headers=gist_headers,
-                                deadline=URLFETCH_DEADLINE,
-                                validate_certificate=URLFETCH_VALIDATE_CERTS)
+    holder = db.StringProperty()
+    date_expires = db.DateTimeProperty()
 
-        if result.status_code != 201:
-            raise status_map[result.status_code](\
-                'Error while calling GitHub API - create gist\n' + \
-                result.content)
+    @classmethod
+    def acquire(cls, bin_name):
+        """ Acquires the lease on a bin, if no one else holds it.
+
+        Args:
+            bin_name: name of a bin
+
+        Returns:
+            String identifying the holder of the lease, which is needed for
+            releasing it, or None if the lease is held by someone else.
+        """
+
+        holder = webapp2_extras.security.generate_random_string(
+            BIN_LEASE_HOLDER_LENGTH)
+
+        def acquire_lease():
+            lease = BinLease.get_by_key_name(bin_name)
+            date_now = datetime.utcnow()
+
+            if lease is not None and lease.date_expires > date_now:
+                return None
+
+            relativedelta = dateutil.relativedelta.relativedelta
+            lease = BinLease(key_name=bin_name, holder=holder,
+                             date_expires=date_now + \
+                                 relativedelta(seconds = BIN_LEASE_SECONDS))
+            lease.put()
+            return holder
+
+        try:
+            return db.run_in_transaction(acquire_lease)
+        except db.TransactionFailedError:
+            # Someone else is acquiring or releasing the lease at the moment
+            return None
+
+    @classmethod
+    def release(cls, bin_name, holder):
+        """ Releases the lease on a bin, if it is still held by a holder.
+
+        Args:
+            bin_name: name of a bin
+            holder: string identifying the holder, returned by acquire
+        """
 
-        json_content = json.loads(result.content)
+        def release_lease():
+            lease = BinLease.get_by_key_name(bin_name)
 
-        self.is_public = params['is_public']
-        self.gist_id = json_content['id']
-        self.api_token = params['api_token']
-        self.filename = params['filename']
-        self.storage_user_id = str(json_content['user']['id'])
+            if lease is not None and lease.holder == holder:
+                lease.delete()
+
+        db.run_in_transaction(release_lease)
 
 ################################################################################
-# GitHubRepoBin model
+# BinTail model
 ################################################################################
 
-class GitHubRepoBin(Bin):
-    """ A Bin implementation that uses GitHub repositories for storing data. """
+class BinTail(db.Model):
+    """ The most recently appended key-value data of a Bin, keyed by bin name,
+        so that recent data can be served without reading it from the
+        external storage service.
+    """
 
-    repo = db.StringProperty()
-    api_token = db.StringProperty()
-    filename = db.StringProperty()
+    records = db.TextProperty()
+    date_updated = db.DateTimeProperty(auto_now=True)
 
-    def get_repo_api_url(self):
-        """ Constructs the URL for fetching the representation of the
-            repo that stores the data for this bin, via the GitHub API.
+    @classmethod
+    def get_memcache_key(cls, bin_name):
+        """ Constructs the memcache key under which the tail of a bin is
+            cached.
+
+        Args:
+            bin_name: name of a bin
 
         Returns:
-            String representation of GitHub API resource that stores the data
-            for this bin.
+            String memcache key.
         """
 
-        return 'https://api.github.com/repos/' + self.repo + '/contents/' + \
-               self.filename
+        return TAIL_CACHE_KEY_PREFIX + bin_name
 
-    def get_raw_content_url(self):
-        """ Implementation of the Bin abstract method.
+    @classmethod
+    def get_records(cls, bin_name):
+        """ Gets the most recently appended key-value data of a bin, from
+            memcache if possible and from the datastore otherwise.
+
+        Args:
+            bin_name: name of a bin
 
         Returns:
-            String representation of URL of resource on GitHub domain that
-            contains the raw data for this Bin.
+            List of dictionaries with key-value data, oldest first, or None
+            if nothing was appended to the bin yet.
         """
 
-        return 'https://raw.github.com/' + self.repo + '/master/' + \
-               self.filename
+        records = memcache.get(BinTail.get_memcache_key(bin_name))
 
-    def get_html_content_url(self):
-        """ Implementation of the Bin abstract method.
+        if records is None:
+            tail = BinTail.get_by_key_name(bin_name)
+            if tail is None:
+                return None
 
-        Returns:
-            String representation of URL of resource on GitHub domain that
-            contains the HTML page with data for this Bin.
-        """
+            records = json.loads(tail.records)
+            memcache.set(BinTail.get_memcache_key(bin_name), records)
 
-        return 'https://github.com/' + self.repo + '/blob/master/' + \
-               self.filename
+        return records
 
-    def get_info(self):
-        """ Constructs the information about this GitHubRepoBin resource that
-            is sent over the network to clients. First constructs the generic
-            Bin information and the adds GitHubRepoBin specific information.
+    @classmethod
+    def add_records(cls, bin_name, records):
+        """ Adds appended key-value data to the tail of a bin, dropping the
+            oldest data beyond TAIL_CACHE_SIZE records or TAIL_CACHE_MAX_BYTES.
 
-        Returns:
-            Dictionary of bin properties and tasks.
+        Args:
+            bin_name: name of a bin
+            records: list of dictionary-like objects with key-value data
+                     that were appended to the bin
         """
 
-        bin_info = Bin.get_info(self)
+        tail = BinTail.get_by_key_name(bin_name)
+        if tail is None:
+            tail = BinTail(key_name=bin_name)
+            tail_records = []
+        else:
+            tail_records = json.loads(tail.records)
 
-        bin_info['repo'] = self.repo
-        bin_info['filename'] = self.filename
-        bin_info['repo_api_url'] = self.get_repo_api_url()
+        # Records which are too large to be cached on their own are skipped,
+        # and the oldest records are dropped until the JSON of the others
+        # fits (each record is counted with its separator in the JSON list,
+        # or with the brackets of the list for the last one)
+        record_limit = TAIL_CACHE_MAX_BYTES - len('[]')
+        new_records = [record for record in format_records(records)
+                       if len(json.dumps(record)) <= record_limit]
 
-        return bin_info
+        tail_records = tail_records + new_records
+        tail_records = tail_records[-TAIL_CACHE_SIZE:]
 
-    @classmethod
-    def get_user_id_for_token(cls, api_token):
-        """ Retrieves the user id for a GitHub OAuth token.
+        record_sizes = [len(json.dumps(record)) + len(', ')
+                        for record in tail_records]
+        size = sum(record_sizes)
+        first = 0
+
+        while first < len(tail_records) and size > TAIL_CACHE_MAX_BYTES:
+            size -= record_sizes[first]
+            first += 1
+
+        tail_records = tail_records[first:]
+        tail.records = json.dumps(tail_records)
+
+        tail.put()
+        memcache.set(BinTail.get_memcache_key(bin_name), tail_records)
+
+################################################################################
+# CleanupProgress model
+################################################################################
+
+class CleanupProgress(db.Model):
+    """ The progress of a cleanup job, keyed by job name. A cleanup job may
+        run in a chain of tasks, so this is where its state is recorded.
+    """
+
+    date_started = db.DateTimeProperty()
+    date_updated = db.DateTimeProperty(auto_now=True)
+    date_limit = db.DateTimeProperty()
+    cursor = db.TextProperty()
+    status = db.StringProperty()
+    deleted_count = db.IntegerProperty(default=0)
+    request_count = db.IntegerProperty(default=0)
+    # JSON object with counts of data deleted together with the entities
+    related_counts = db.TextProperty(default='{}')
+
+################################################################################
+# Bin cache
+################################################################################
+
+class BinCache(object):
+    """ A size-bounded cache of Bin entities in the memory of an instance,
+        which evicts the least recently used bins. Cached bins expire after
+        a fixed time, so that changes made by other instances are eventually
+        seen. Bins are cached in serialized form, so each lookup returns a
+        new Bin instance which the caller may modify.
+    """
+
+    def __init__(self, max_size, max_age):
+        """ Constructs an empty cache.
 
         Args:
-            api_token: OAuth token for GitHub API.
+            max_size: maximum number of cached bins
+            max_age: number of seconds after which a cached bin expires
+        """
+
+        self.max_size = max_size
+        self.max_age = max_age
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, bin_name):
+        """ Gets a bin from the cache, or from the datastore if it is not
+            cached or has expired.
+
+        Args:
+            bin_name: name of bin
 
         Returns:
-            String representation of GitHub user id associated with api_token.
+            The Bin, or None if it doesn't exist.
         """
 
-        auth_headers = {
-            'Authorization': 'token ' + api_token
-        }
+        with self.lock:
+            entry = self.entries.pop(bin_name, None)
 
-        response = urlfetch.fetch(
-                            url='https://api.github.com/user',
-                            headers=auth_headers,
-                            deadline=URLFETCH_DEADLINE,
-                            validate_certificate=URLFETCH_VALIDATE_CERTS)
+            if entry is not None and entry[0] > time.time():
+                self.entries[bin_name] = entry
+                return db.model_from_protobuf(entry[1])
 
-        if response.status_code != 200:
-            raise status_map[response.status_code](\
-                'Error while calling GitHub API - fetch user information\n' + \
-                response.content)
-        else:
-            return str(json.loads(response.content)['id'])
+        bin = Bin.get_by_key_name(bin_name)
 
-    def append_data(self, params):
-        """ Appends data to a GitHub repo. Works by fetching existing data, then
-            appending new data locally and writing the results back to the
-            GitHub repo.
+        if bin is not None:
+            self.set(bin)
 
-        Args:
-            params: dictionary-like object with key-value data to be appended
-                    to existing data
+        return bin
 
-        Raises:
-            HTTPError if GitHub API invocation failed.
+    def set(self, bin):
+        """ Adds a bin to the cache, replacing the cached version of it.
+
+        Args:
+            bin: the Bin
         """
 
-        auth_headers = {
-            'Authorization': 'token ' + self.api_token
-        }
+        entry = (time.time() + self.max_age, db.model_to_protobuf(bin).Encode())
 
-        repo_response = urlfetch.fetch(
-                            url=self.get_repo_api_url(),
-                            headers=auth_headers,
-                            deadline=URLFETCH_DEADLINE,
-                            validate_certificate=URLFETCH_VALIDATE_CERTS)
+        with self.lock:
+            self.entries.pop(bin.key().name(), None)
+            self.entries[bin.key().name()] = entry
 
-        if repo_response.status_code != 200:
-            raise status_map[repo_response.status_code](\
-                'Error while calling GitHub API - fetch repo data\n' + \
-                repo_response.content)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
 
-        json_file = json.loads(repo_response.content)
-        old_content = base64.b64decode(json_file['content'])
-        new_content = append_data(old_content, self.output_format, params)
+    def invalidate(self, bin_name):
+        """ Removes a bin from the cache.
 
-        new_payload = json.dumps({
-            'message' : 'appendr update',
-            'content' : base64.b64encode(new_content),
-            'sha' : json_file['sha']
-        })
+        Args:
+            bin_name: name of bin
+        """
 
-        repo_headers = {
-            'Content-Type': MIME_TYPE_JSON,
-            'Authorization': 'token ' + self.api_token
-        }
+        with self.lock:
+            self.entries.pop(bin_name, None)
 
-        result = urlfetch.fetch(url=self.get_repo_api_url(),
-                                payload=new_payload,
-                                method=urlfetch.PUT,
-                                headers=repo_headers,
-                                deadline=URLFETCH_DEADLINE,
-                                validate_certificate=URLFETCH_VALIDATE_CERTS)
+# Bin cache global variable
+BIN_CACHE = BinCache(BIN_CACHE_SIZE, BIN_CACHE_SECONDS)
 
-        if result.status_code != 200:
-            raise status_map[result.status_code](\
-                'Error while calling GitHub API - update repo data\n' + \
-                result.content)
+################################################################################
+# Handlers
+################################################################################
 
-    def initialize(self, bin_name, params):
-        """ Initializes a GitHubRepoBin by creating a GitHub file and writing
-            initial data since files in a repos can't be empty.
+class BinHandler(webapp2.RequestHandler):
+    """ Handler for bin creation and bin search requests. """
 
-        Args:
-            bin_name: name of the Bin to be initialized (not used here)
-            params: dictionary-like object with parameters relevant for
-                    GitHubRepoBin creation
+    def options(self):
+        setHTTPOptionsResponse(response=self.response,
+                               oauth_methods=['GET', 'POST'])
 
-        Raises:
-            HTTPError if GitHub API invocations failed.
+    def get(self):
+        """ Returns bins associated with a specific storage backend and user
+            (based on OAuth API token for that backend).
         """
 
-        validate_input_param(params, 'api_token', True,
+        self.response.headers.add_header('Access-Control-Allow-Origin', '*')
+
+        accept_header = get_best_mime_match_or_default(
+            self.request.headers.get('Accept'),
+            SUPPORTED_OUTPUT_APPENDR_MIME_TYPES,
+            DEFAULT_OUTPUT_APPENDR_MIME_TYPE)
+
+        validate_input_param(self.request.params, 'api_token', True,
                              validate_non_empty_string,
                              False)
 
-        validate_input_param(params, 'repo', True,
-                             validate_github_repo_string,
+        validate_input_param(self.request.params, 'storage_backend', True,
+                             validate_non_empty_string,
                              False)
 
-        validate_input_param(params, 'filename', False,
-                             validate_non_empty_string,
-                             DEFAULT_FILENAME % \
-                                 (params['output_format'].split('/')[-1],))
+        params = get_request_params(self.request)
 
-        self.api_token = params['api_token']
-        self.filename = params['filename']
-        self.repo = params['repo']
-        self.storage_user_id = \
-            str(GitHubRepoBin.get_user_id_for_token(self.api_token))
+        validate_input_param(params, 'include_tasks', False,
+                             ['true', 'false'],
+                             'true')
 
-        repo_headers = {
-            'Content-Type': MIME_TYPE_JSON,
-            'Authorization': 'token ' + params['api_token']
-        }
+        limit, cursor = get_page_params(params)
 
-        empty_data_string = OUTPUT_FORMATS_EMPTY_DATA[params['output_format']]
+        api_token = params['api_token']
+        storage_backend = params['storage_backend']
+        include_tasks = params['include_tasks'] == 'true'
 
-        repo_payload = json.dumps({
-            'message' : 'appendr create',
-            'content' : base64.b64encode(empty_data_string)
-        })
+        user_id = Bin.get_user_id_for_token(storage_backend, api_token)
+        bins = Bin.all().filter('storage_backend =', storage_backend)
+        bins = bins.filter('storage_user_id =', user_id)
+        bins = bins.order('-date_created')
+        bins, next_cursor = fetch_page(bins, limit, cursor)
 
-        result = urlfetch.fetch(url=self.get_repo_api_url(),
-                                payload=repo_payload,
-                                method=urlfetch.PUT,
-                                headers=repo_headers,
-                                deadline=URLFETCH_DEADLINE,
-                                validate_certificate=URLFETCH_VALIDATE_CERTS)
+        next_url = None
+        if next_cursor is not None:
+            next_url = get_page_url(self.request.path_url,
+                                    self.request.GET, next_cursor)
 
-        if result.status_code != 201:
-            raise status_map[result.status_code](\
-                'Error while calling GitHub API - create repo file\n' + \
-                result.content)
+        set_next_page_link(self.response, next_url)
 
-        json_content = json.loads(result.content)
+        bins_tasks = {}
+        if include_tasks:
+            bins_tasks = Bin.get_tasks_for_bins(bins)
 
-################################################################################
-# DropboxBin model
-################################################################################
+        etag_values = []
+        for bin in bins:
+            etag_values.append(bin.get_etag_values())
 
-class DropboxBin(Bin):
-    """ A Bin implementation that uses Dropbox for storing data. """
+            if include_tasks:
+                tasks, tasks_cursor = bins_tasks[bin.key()]
+                etag_values.append([task.get_etag_values() for task in tasks])
+                etag_values.append(tasks_cursor)
 
-    api_token = db.StringProperty()
-    filename = db.StringProperty()
-    dropbox_id = db.StringProperty()
+        etag = get_etag(accept_header, include_tasks, next_url, etag_values)
 
-    def get_dropbox_api_url(self):
-        """ Constructs the URL for fetching the representation of the
-            gist that stores the data for this bin, via the Dropbox API.
+        if is_not_modified(self.request, self.response, etag):
+            return
 
-        Returns:
-            String representation of Dropbox API resource that stores the data
-            for this bin.
+        self.response.headers['Content-Type'] = accept_header
+        write_content(self.request, self.response,
+                      Bin.serialize(bins, accept_header, include_tasks,
+                                    next_url, bins_tasks))
+
+    def post(self):
+        """ Creates a bin based on passed paramters and returns a
+            representation of the created bin.
         """
 
-        return 'https://api-content.dropbox.com/1/files/sandbox/' + \
-                self.key().name() + '/' + self.filename
+        self.response.headers.add_header('Access-Control-Allow-Origin', '*')
+        self.response.headers.add_header('Access-Control-Expose-Headers',
+                                         'Location')
 
-    def get_raw_content_url(self):
-        """ Implementation of the Bin abstract method.
+        accept_header = get_best_mime_match_or_default(
+            self.request.headers.get('Accept'),
+            SUPPORTED_OUTPUT_APPENDR_MIME_TYPES,
+            DEFAULT_OUTPUT_APPENDR_MIME_TYPE)
 
-        Returns:
-            String representation of URL of resource on Dropbox domain that
-            contains the raw data for this Bin.
-        """
+        params = get_request_params(self.request)
+        bin = Bin.create(params)
+        bin.insert()
 
-        return 'https://dl.dropboxusercontent.com/s/' + \
-                self.dropbox_id + '/' + self.filename
+        self.response.headers['Location'] = bin.get_url()
 
-    def get_html_content_url(self):
-        """ Implementation of the Bin abstract method.
+        if accept_header == MIME_TYPE_HTML:
+            self.response.set_status(303)
+        else:
+            self.response.set_status(201)
+            self.response.out.write(Bin.serialize(bin, accept_header))
 
-        Returns:
-            String representation of URL of resource on Dropbox domain that
-            contains the HTML page with data for this Bin.
-        """
+class DataHandler(webapp2.RequestHandler):
+    """ Handler for requests to a specific bin. """
 
-        return 'https://www.dropbox.com/s/' + \
-                self.dropbox_id + '/' + self.filename
+    def options(self, bin_name):
+        setHTTPOptionsResponse(response=self.response,
+                               oauth_methods=['GET', 'POST'])
 
-    def get_info(self):
-        """ Constructs the information about this DropboxBin resource that is
-            sent over the network to clients. First constructs the generic Bin
-            information and the adds DropboxBin specific information.
+    def get(self, bin_name):
+        """ Returns a representation of a specific bin.
 
-        Returns:
-            Dictionary of bin properties and tasks.
+        Args:
+            bin_name: name of bin that is being fetched
         """
 
-        bin_info = Bin.get_info(self)
-        bin_info['filename'] = self.filename
+        self.response.headers.add_header('Access-Control-Allow-Origin', '*')
 
-        return bin_info
+        accept_header = get_best_mime_match_or_default(
+            self.request.headers.get('Accept'),
+            SUPPORTED_OUTPUT_APPENDR_MIME_TYPES,
+            DEFAULT_OUTPUT_APPENDR_MIME_TYPE)
 
-    @classmethod
-    def get_user_id_for_token(cls, api_token):
-        """ Retrieves the user id for a Dropbox OAuth token.
+        bin = BIN_CACHE.get(bin_name)
 
-        Args:
-            api_token: OAuth token for Dropbox API.
+        if (bin is None):
+            raise HTTPNotFound()
 
-        Returns:
-            String representation of Dropbox user id associated with api_token.
-        """
+        tasks, tasks_cursor = fetch_page(bin.get_tasks_query(),
+                                         BIN_INFO_TASKS_LIMIT, None)
 
-        auth_headers = {
-            'Authorization': 'Bearer ' + api_token
-        }
+        etag = get_etag(accept_header, bin.get_etag_values(),
+                        [task.get_etag_values() for task in tasks],
+                        tasks_cursor)
 
-        response = urlfetch.fetch(
-                            url='https://api.dropbox.com/1/account/info',
-                            headers=auth_headers,
-                            deadline=URLFETCH_DEADLINE,
-                            validate_certificate=URLFETCH_VALIDATE_CERTS)
+        if is_not_modified(self.request, self.response, etag):
+            return
 
-        if response.status_code != 200:
-            raise status_map[response.status_code](\
-                'Error while calling Dropbox API - fetch account info\n' + \
-                response.content)
-        else:
-            return str(json.loads(response.content)['uid'])
+        self.response.headers['Content-Type'] = accept_header
+        self.response.set_status(200)
+        write_content(self.request, self.response,
+                      Bin.serialize(bin, accept_header,
+                                    bins_tasks=(tasks, tasks_cursor)))
 
-    def append_data(self, params):
-        """ Appends data to a Dropbox file. Works by fetching existing data,
-            then appending new data locally and writing the results back to the
-            file on Dropbox.
+    def post(self, bin_name):
+        """ Creates an append data task for specific bin. A single task is
+            created for all key-value datasets in the request. Tasks are
+            enqueued to task queues via a sharding "algorithm".
 
         Args:
-            params: dictionary-like object with key-value data to be appended
-                    to existing data
-
-        Raises:
-            HTTPError if a Dropbox API invocation fails.
+            bin_name: name of bin to which data should be appended to
         """
 
-        auth_headers = {
-            'Authorization': 'Bearer ' + self.api_token
-        }
+        self.response.headers.add_header('Access-Control-Allow-Origin', '*')
 
-        dropbox_response = urlfetch.fetch(
-                                url=self.get_dropbox_api_url(),
-                                headers=auth_headers,
-                                deadline=URLFETCH_DEADLINE,
-                                validate_certificate=URLFETCH_VALIDATE_CERTS)
+        accept_header = get_best_mime_match_or_default(
+            self.request.headers.get('Accept'),
+            SUPPORTED_OUTPUT_APPENDR_MIME_TYPES,
+            DEFAULT_OUTPUT_APPENDR_MIME_TYPE)
 
-        if dropbox_response.status_code != 200:
-            raise status_map[dropbox_response.status_code](\
-                'Error while calling Dropbox API - fetch file data\n' + \
-                dropbox_response.content)
+        bin = BIN_CACHE.get(bin_name)
 
-        old_content = dropbox_response.content
-        new_content = append_data(old_content, self.output_format, params)
+        if (bin is None):
+            raise HTTPNotFound()
 
-        headers = {
-            'Content-Type': MIME_TYPE_JSON,
-            'Authorization': 'Bearer ' + self.api_token
-        }
+        records = get_request_records(self.request)
+        date_created = str(datetime.utcnow())
+        for params in records:
+            params['date_created'] = date_created
+        task_body = json.dumps(records)
 
-        url = 'https://api-content.dropbox.com/1/files_put/sandbox/' + \
-              self.key().name() + '/' + self.filename
+        if len(task_body) > TASK_PAYLOAD_MAX_BYTES:
+            raise HTTPRequestEntityTooLarge('Request data must not be larger '
+                                            'than %s bytes when encoded as '
+                                            'JSON.' % (TASK_PAYLOAD_MAX_BYTES,))
 
-        result = urlfetch.fetch(url=url,
-                                payload=new_content,
-                                method=urlfetch.PUT,
-                                headers=headers,
-                                deadline=URLFETCH_DEADLINE,
-                                validate_certificate=URLFETCH_VALIDATE_CERTS)
+        queue_name = bin.get_queue_name()
+        task_name = Task.generate_name()
 
-        if result.status_code != 200:
-            raise status_map[result.status_code](\
-                'Error while calling Dropbox API - update file data\n' + \
-                result.content)
+        task = Task(key_name=task_name)
+        task.bin = bin
+        task.status = TASK_STATUS_QUEUED
+        task.status_msg = ''
+        task.payload = task_body
+        task.record_count = len(records)
+        task.put()
 
-    def initialize(self, bin_name, params):
-        """ Initializes a DropboxBin by:
-            1) creating a folder on Dropbox named by the bin name
-            2) creating a file in the folder with the initial data
-            3) fetching the publicly shareable URL for this file
-            4) resolving the publicly shareable URL to get to the Dropbox id
-               for this file. The publicly shareable URL is shortened, so it
-               has to be resolved in order to get the final URL which contains
-               the id.
+        taskqueue.add(url=webapp2.uri_for(ROUTE_NAME_TASK_APPEND,
+                      bin_name=bin_name),
+                      queue_name=queue_name,
+                      name=task_name)
+        notify_task_changes(bin_name)
 
-        Args:
-            bin_name: name of the Bin to be initialized (not used here)
-            params: dictionary-like object with parameters relevant for
-                    DropboxBin creation
+        logging.debug('Added task %s for bin %s to queue %s.' % \
+                      (task_name, bin_name, queue_name))
 
-        Raises:
-            HTTPError if a Dropbox API invocation fails.
-        """
-        validate_input_param(params, 'api_token', True,
-                             validate_non_empty_string,
-                             False)
+        if HOT_BIN_QUEUES:
+            Bin.promote_if_hot(bin, count_ingest(bin_name))
 
-        validate_input_param(params, 'filename', False,
-                             validate_non_empty_string,
-                             DEFAULT_FILENAME % \
-                                 (params['output_format'].split('/')[-1],))
+        self.response.headers['Location'] = task.get_url()
 
-        url = 'https://api-content.dropbox.com/1/files_put/sandbox/' + \
-              self.key().name() + '/' + params['filename']
+        if accept_header == MIME_TYPE_HTML:
+            self.response.set_status(303)
+        else:
+            self.response.set_status(202)
+            self.response.out.write(Task.serialize(task, bin, accept_header))
 
-        headers = {
-            'Content-Type': MIME_TYPE_JSON,
-            'Authorization': 'Bearer ' + params['api_token']
-        }
+class ContentHandler(webapp2.RequestHandler):
+    """ Handler for requests for the raw data of a specific bin. """
 
-        payload = OUTPUT_FORMATS_EMPTY_DATA[params['output_format']]
+    def options(self, bin_name):
+        setHTTPOptionsResponse(response=self.response)
 
-        result = urlfetch.fetch(url=url,
-                                payload=payload,
-                                method=urlfetch.PUT,
-                                headers=headers,
-                                deadline=URLFETCH_DEADLINE,
-                                validate_certificate=URLFETCH_VALIDATE_CERTS)
+    def get(self, bin_name):
+        """ Returns the raw data of a bin stored on the local filesystem,
+            streamed from a memory-mapped file. For other storage backends,
+            redirects to the raw data on the external storage service.
 
-        if result.status_code != 200:
-            raise status_map[result.status_code](\
-                'Error while calling Dropbox API - create file\n' + \
-                result.content)
+        Args:
+            bin_name: name of bin whose data is being fetched
+        """
 
-        self.api_token = params['api_token']
-        self.filename = params['filename']
+        self.response.headers.add_header('Access-Control-Allow-Origin', '*')
 
-        url = 'https://api.dropbox.com/1/account/info'
+        bin = BIN_CACHE.get(bin_name)
 
-        headers = {
-            'Authorization': 'Bearer ' + params['api_token']
-        }
+        if (bin is None):
+            raise HTTPNotFound()
 
-        result = urlfetch.fetch(url=url,
-                                method=urlfetch.GET,
-                                headers=headers,
-                                deadline=URLFETCH_DEADLINE,
-                                validate_certificate=URLFETCH_VALIDATE_CERTS)
+        if not isinstance(bin, LocalFileBin):
+            self.redirect(bin.get_raw_content_url())
+            return
 
-        if result.status_code != 200:
-            raise status_map[result.status_code](\
-                'Error while calling Dropbox API - fetch account info\n' + \
-                result.content)
+        mapped_content = bin.read_mapped_content()
 
-        json_content = json.loads(result.content)
-        self.storage_user_id = str(json_content['uid'])
+        def iter_chunks():
+            try:
+                for start in xrange(0, len(mapped_content),
+                                    LOCAL_FS_CHUNK_SIZE):
+                    yield mapped_content[start:start+LOCAL_FS_CHUNK_SIZE]
+            finally:
+                if mapped_content:
+                    mapped_content.close()
 
-        url = 'https://api.dropbox.com/1/shares/sandbox/' + \
-              bin_name + '/' + params['filename']
+        self.response.headers['Content-Type'] = bin.output_format
+        self.response.set_status(200)
+        self.response.app_iter = iter_chunks()
+        self.response.content_length = len(mapped_content)
 
-        headers = {
-            'Authorization': 'Bearer ' + params['api_token']
-        }
+class TailHandler(webapp2.RequestHandler):
+    """ Handler for requests for the recently appended data of a bin. """
 
-        result = urlfetch.fetch(url=url,
-                                headers=headers,
-                                deadline=URLFETCH_DEADLINE,
-                                validate_certificate=URLFETCH_VALIDATE_CERTS)
+    def options(self, bin_name):
+        setHTTPOptionsResponse(response=self.response)
 
-        if result.status_code != 200:
-            raise status_map[result.status_code](\
-                'Error while calling Dropbox API - get file public URL\n' + \
-                result.content)
+    def get(self, bin_name):
+        """ Returns the most recently appended key-value data of a bin,
+            without reading it from the external storage service.
 
-        json_content = json.loads(result.content)
-        self.share_url = json_content['url']
+        Args:
+            bin_name: name of bin whose data is being fetched
+        """
 
-        url = json_content['url']
+        self.response.headers.add_header('Access-Control-Allow-Origin', '*')
 
-        result = urlfetch.fetch(url=url,
-                                deadline=URLFETCH_DEADLINE,
-                                validate_certificate=URLFETCH_VALIDATE_CERTS)
+        accept_header = get_best_mime_match_or_default(
+            self.request.headers.get('Accept'),
+            SUPPORTED_OUTPUT_TAIL_MIME_TYPES,
+            MIME_TYPE_JSON)
 
-        if result.status_code != 200:
-            raise status_map[result.status_code](\
-                'Error while calling Dropbox API - retrieve shared file\n' + \
-                result.content)
+        params = get_request_params(self.request)
 
-        # The line below extracts the ID of the file on dropbox so that
-        # it can be used to construct raw content and html content URLs
-        # as described here: https://www.dropbox.com/help/201/en
-        self.dropbox_id = DROPBOX_ID_REGEX.match(result.final_url).group(1)
+        validate_input_param(params, 'last', False,
+                             validate_positive_integer,
+                             DEFAULT_TAIL_RECORDS)
 
-################################################################################
-# Task model
-################################################################################
+        last = min(int(params['last']), TAIL_CACHE_SIZE)
 
-class Task(db.Model):
-    """ A task for appending data to a Bin. """
+        records = BinTail.get_records(bin_name)
 
-    bin = db.ReferenceProperty(Bin)
-    status = db.StringProperty()
-    status_msg = db.StringProperty(multiline=True)
-    date_created = db.DateTimeProperty(auto_now_add=True)
-    date_updated = db.DateTimeProperty(auto_now_add=True)
+        if records is None:
+            if BIN_CACHE.get(bin_name) is None:
+                raise HTTPNotFound()
+            records = []
 
-    @classmethod
-    def generate_name(cls):
-        """ Generates a unique name for a Task.
+        records = records[-last:]
 
-        Returns:
-            String representing a unique name for a Task, where unique means
-            with respect to all other Task instances stored in the datastore.
-        """
+        if accept_header == MIME_TYPE_CSV:
+            resp_content = serialize_csv_rows(records, len(records) > 0)
+        elif accept_header == MIME_TYPE_NDJSON:
+            resp_content = serialize_ndjson_lines(records)
+        else:
+            resp_content = json.dumps(records, indent=JSON_INDENT)
 
-        task_name = None
-        while True:
-            task_name = \
-                webapp2_extras.security.generate_random_string(TASK_NAME_LENGTH)
+        self.response.headers['Content-Type'] = accept_header
+        self.response.set_status(200)
+        self.response.out.write(resp_content)
 
-            task = Task.get_by_key_name(task_name)
-            if task is None:
-                break
+class AppendHandler(webapp2.RequestHandler):
+    """ Task handler for appending data to a bin. """
 
-        return task_name
+    def post(self, bin_name):
+        """ Appends data to a specific bin. Appending is retried if it fails
+            until a predefined timeout occurs. If coalescing is enabled, all
+            other queued tasks for the bin are appended together with this
+            task, and their own executions later become no-ops.
 
-    @classmethod
-    def serialize(cls, tasks, bin, content_type):
-        """ Serializes a Task or list of Tasks based on the desired output
-            mime type.
+            Appends for different bins run in parallel, while appends for the
+            same bin run one at a time under the lease of the bin. If the
+            lease is held by another append, the task is executed again after
+            BIN_LEASE_RETRY_SECONDS.
 
         Args:
-            tasks: a Task instance or list of Tasks
-            bin: the Bin that tasks belong to
-            content_type: mime type to which tasks should be serialized
-
-        Returns:
-            String representation of tasks in content_type format.
-
-        Raises:
-            HTTPNotAcceptable is content_type is not supported by application.
+            bin_name: name of bin to which data should be appended to
         """
 
-        tasks_info = None
+        task_name = self.request.headers.get(
+            TASK_NAME_HEADER, self.request.headers['X-AppEngine-TaskName'])
 
-        if isinstance(tasks, Task):
-            tasks_info = tasks.get_info()
-        else:
-            tasks_info = []
-            for task in tasks:
-                tasks_info.append(task.get_info())
+        # The task is queued again instead of failing the request, so that
+        # waiting for the lease doesn't increase the retry backoff of the
+        # task. If coalescing is enabled, the append holding the lease will
+        # usually append the data of this task as well
+        lease_holder = BinLease.acquire(bin_name)
+        if lease_holder is None:
+            self.requeue(self.request.headers['X-AppEngine-QueueName'],
+                         task_name, BIN_LEASE_RETRY_SECONDS)
 
-        if content_type in [MIME_TYPE_JSON, MIME_TYPE_TEXT]:
-            return json.dumps(tasks_info, indent=JSON_INDENT)
-        elif content_type in [MIME_TYPE_HTML]:
-            bin_info = None
-            if isinstance(tasks, Task):
-                template = JINJA_ENVIRONMENT.get_template(TEMPLATE_TASK)
-            else:
-                template = JINJA_ENVIRONMENT.get_template(TEMPLATE_TASKS)
-                bin_info = bin.get_info()
-            return template.render({'tasks' : tasks_info, 'bin' : bin_info})
+            logging.debug('Postponed task %s, bin %s is leased by another '
+                          'append.' % (task_name, bin_name))
+            return
 
-    def get_url(self):
-        """ Constructs the URL for this Task resource.
+        try:
+            self.append(bin_name, task_name)
+        finally:
+            BinLease.release(bin_name, lease_holder)
 
-        Returns:
-            String representation of full URL of this Task.
+    def append(self, bin_name, task_name):
+        """ Appends the data of a task to a bin, while holding the lease on
+            the bin.
+
+        Args:
+            bin_name: name of bin to which data should be appended to
+            task_name: name of the Task
         """
 
-        return webapp2.uri_for(ROUTE_NAME_TASK_STATUS,
-                               bin_name=self.bin.key().name(),
-                               task_name=self.key().name(),
-                               _full=True)
+        # The task is read while holding the lease, so that it is not
+        # appended again if a coalesced append has just completed it
+        task = Task.get_for_bin(bin_name, task_name)
 
-    def get_info(self):
-        """ Constructs the information about this Task resource that is sent
-            over the network to clients.
+        if (task is None):
+            return
+
+        if task.status == TASK_STATUS_COMPLETED:
+            logging.debug('Task %s was already completed by a coalesced '
+                          'append.' % (task_name,))
+            return
+
+        try:
+            # The segment state of the bin is changed by every append, so
+            # it is read from the datastore instead of the bin cache, which
+            # may hold a version cached before an append on another instance
+            bin = Bin.get_by_key_name(bin_name)
 
-        Returns:
-            Dictionary of Task properties.
-        """
+            if (bin is None):
+                return
 
-        return {
-          'task_id' : self.key().name(),
-          'task_url' : self.get_url(),
-          'tasks_url' : self.bin.get_tasks_url(),
-          'bin_id' : self.bin.key().name(),
-          'bin_url' : self.bin.get_url(),
-          'date_created' : self.date_created.strftime(DEFAULT_DATETIME_FORMAT),
-          'date_updated' : self.date_updated.strftime(DEFAULT_DATETIME_FORMAT),
-          'datetime_format' : DEFAULT_DATETIME_FORMAT,
-          'status' : self.status,
-          'status_msg' : self.status_msg
-        }
+            # Tasks which were queued before the bin was moved to another
+            # queue are forwarded to that queue, so that they don't delay the
+            # other bins of the previous queue
+            queue_name = self.request.headers.get('X-AppEngine-QueueName')
+            if queue_name is not None and queue_name != bin.get_queue_name():
+                self.requeue(bin.get_queue_name(), task_name)
 
-################################################################################
-# Handlers
-################################################################################
+                logging.debug('Forwarded task %s from queue %s to queue %s.' % \
+                              (task_name, queue_name, bin.get_queue_name()))
+                return
 
-class BinHandler(webapp2.RequestHandler):
-    """ Handler for bin creation and bin search requests. """
+            # Tasks created before task data was stored in the Task entity
+            # carry it in the request body
+            if task.payload is not None:
+                records = task.get_records()
+            else:
+                params = get_request_params(self.request)
+                params['date_created'] = \
+                    dateutil.parser.parse(params['date_created'])
+                records = [params]
 
-    def options(self):
-        setHTTPOptionsResponse(response=self.response,
-                               oauth_methods=['GET', 'POST'])
+            task_records = list(records)
+            tasks = [task]
 
-    def get(self):
-        """ Returns bins associated with a specific storage backend and user
-            (based on OAuth API token for that backend).
-        """
+            if APPEND_COALESCE_ENABLED:
+                for queued_task in Task.get_coalescable(bin, task):
+                    tasks.append(queued_task)
+                    records.extend(queued_task.get_records())
 
-        self.response.headers.add_header('Access-Control-Allow-Origin', '*')
+                records.sort(key=lambda record: record['date_created'])
 
-        accept_header = get_best_mime_match_or_default(
-            self.request.headers.get('Accept'),
-            SUPPORTED_OUTPUT_APPENDR_MIME_TYPES,
-            DEFAULT_OUTPUT_APPENDR_MIME_TYPE)
+                logging.debug('Coalesced %s tasks for bin %s.' % \
+                              (len(tasks), bin_name))
 
-        validate_input_param(self.request.params, 'api_token', True,
-                             validate_non_empty_string,
-                             False)
+            # Only the properties changed by the append are stored, so that
+            # moving the bin to another queue meanwhile is not undone
+            bin.date_updated = records[-1]['date_created']
 
-        validate_input_param(self.request.params, 'storage_backend', True,
-                             validate_non_empty_string,
-                             False)
+            try:
+                bin.append_data(records)
+            except webapp2.HTTPException as e:
+                if e.code != 413 or len(tasks) == 1:
+                    raise
 
-        api_token = self.request.params.get('api_token')
-        storage_backend = self.request.params.get('storage_backend')
+                # The coalesced data may be too large only as a whole, so
+                # the data of this task is appended alone to the bin as
+                # stored, and the other tasks are left to their own appends
+                logging.debug('Coalesced data of %s tasks for bin %s is too '
+                              'large, appending task %s alone.' % \
+                              (len(tasks), bin_name, task_name))
 
-        user_id = Bin.get_user_id_for_token(storage_backend, api_token)
-        bins = Bin.all().filter('storage_backend =', storage_backend)
-        bins = bins.filter('storage_user_id =', user_id)
-        bins = bins.order('-date_created').fetch(None)
+                tasks = [task]
+                records = task_records
+                bin = Bin.get_by_key_name(bin_name)
 
-        self.response.headers['Content-Type'] = accept_header
-        self.response.out.write(Bin.serialize(bins, accept_header))
+                if (bin is None):
+                    return
 
-    def post(self):
-        """ Creates a bin based on passed paramters and returns a
-            representation of the created bin.
-        """
+                bin.date_updated = records[-1]['date_created']
+                bin.append_data(records)
 
-        self.response.headers.add_header('Access-Control-Allow-Origin', '*')
-        self.response.headers.add_header('Access-Control-Expose-Headers',
-                                         'Location')
+            bin.put_appended()
 
-        accept_header = get_best_mime_match_or_default(
-            self.request.headers.get('Accept'),
-            SUPPORTED_OUTPUT_APPENDR_MIME_TYPES,
-            DEFAULT_OUTPUT_APPENDR_MIME_TYPE)
+            date_updated = datetime.utcnow()
+            for completed_task in tasks:
+                completed_task.date_updated = date_updated
+                completed_task.status = TASK_STATUS_COMPLETED
+                completed_task.status_msg = ''
+            db.put(tasks)
+            notify_task_changes(bin_name)
 
-        params = get_request_params(self.request)
-        bin = Bin.create(params)
-        bin.put()
+        except Exception as e:
+            error_class = classify_error(e)
 
-        self.response.headers['Location'] = bin.get_url()
+            if error_class == ERROR_CLASS_THROTTLED:
+                retry_seconds = e.headers.get(
+                    'Retry-After', RATE_LIMIT_DEFAULT_RETRY_SECONDS)
+                self.postpone(bin, task, int(retry_seconds), e)
+            else:
+                self.handle_failure(task, e,
+                                    error_class == ERROR_CLASS_PERMANENT)
 
-        if accept_header == MIME_TYPE_HTML:
-            self.response.set_status(303)
         else:
-            self.response.set_status(201)
-            self.response.out.write(Bin.serialize(bin, accept_header))
-
-class DataHandler(webapp2.RequestHandler):
-    """ Handler for requests to a specific bin. """
+            # The data was appended, so a failure to update the tail of the
+            # bin must not cause the append to be retried
+            try:
+                BinTail.add_records(bin_name, records)
+            except Exception:
+                logging.exception('Error while updating tail of bin %s.' % \
+                                  (bin_name,))
+
+    def requeue(self, queue_name, task_name, countdown=0):
+        """ Adds the request of this append task to a task queue again, as a
+            new task with the same Task.
 
-    def options(self, bin_name):
-        setHTTPOptionsResponse(response=self.response,
-                               oauth_methods=['GET', 'POST'])
+        Args:
+            queue_name: name of the task queue
+            task_name: name of the Task
+            countdown: time to wait before executing the task, in seconds
+        """
 
-    def get(self, bin_name):
-        """ Returns a representation of a specific bin.
+        taskqueue.add(url=self.request.path,
+                      queue_name=queue_name,
+                      payload=self.request.body,
+                      countdown=countdown,
+                      headers={
+                          'Content-Type' : self.request.content_type,
+                          TASK_NAME_HEADER : task_name
+                      })
+
+    def postpone(self, bin, task, retry_seconds, e):
+        """ Executes a task again when the storage service API can be used
+            for its bin, because the rate limit of the token of the bin is
+            exhausted or requests are paused after repeated failures. This
+            does not count as a failure of the task, as long as the task is
+            executed before TASK_RETRY_HOURS after it was created.
 
         Args:
-            bin_name: name of bin that is being fetched
+            bin: the Bin of the task
+            task: the Task
+            retry_seconds: time after which the API can be used, in seconds
+            e: exception raised because the API can't be used now
         """
 
-        self.response.headers.add_header('Access-Control-Allow-Origin', '*')
+        relativedelta = dateutil.relativedelta.relativedelta
+        date_limit = task.date_created + \
+            relativedelta(hours = TASK_RETRY_HOURS)
 
-        accept_header = get_best_mime_match_or_default(
-            self.request.headers.get('Accept'),
-            SUPPORTED_OUTPUT_APPENDR_MIME_TYPES,
-            DEFAULT_OUTPUT_APPENDR_MIME_TYPE)
+        if datetime.utcnow() + relativedelta(seconds = retry_seconds) >= \
+           date_limit:
+            self.handle_failure(task, e)
+            return
 
-        bin = Bin.get_by_key_name(bin_name)
+        self.requeue(bin.get_queue_name(), task.key().name(), retry_seconds)
 
-        if (bin is None):
-            raise HTTPNotFound()
+        task.date_updated = datetime.utcnow()
+        task.status = TASK_STATUS_QUEUED
+        task.status_msg = str(e)[0:500]
+        task.put()
+        notify_task_changes(bin.key().name())
 
-        self.response.headers['Content-Type'] = accept_header
-        self.response.set_status(200)
-        self.response.out.write(Bin.serialize(bin, accept_header))
+        logging.info('Rescheduled task %s in %s seconds for bin %s.' % \
+                     (task.key().name(), retry_seconds, bin.key().name()))
 
-    def post(self, bin_name):
-        """ Creates an append data task for specific bin. Tasks are enqueued
-            to task queues via a sharding "algorithm".
+    def handle_failure(self, task, e, is_permanent=False):
+        """ Records a failed append of a task, which is retried until
+            TASK_RETRY_HOURS after the task was created, unless the error is
+            permanent.
 
         Args:
-            bin_name: name of bin to which data should be appended to
+            task: the Task
+            e: exception that caused the failure
+            is_permanent: whether retrying the append would fail again
         """
 
-        self.response.headers.add_header('Access-Control-Allow-Origin', '*')
+        relativedelta = dateutil.relativedelta.relativedelta
+        task.date_updated = datetime.utcnow()
+        fail_count = self.request.headers['X-AppEngine-TaskExecutionCount']
+        task.status_msg = ('Fail count: %s. Last error: %s' % \
+                            (int(fail_count)+1, str(e)))[0:500]
 
-        accept_header = get_best_mime_match_or_default(
-            self.request.headers.get('Accept'),
-            SUPPORTED_OUTPUT_APPENDR_MIME_TYPES,
-            DEFAULT_OUTPUT_APPENDR_MIME_TYPE)
+        logging.exception('Error while appending data. ' +\
+                          'Task name: %s.' % (task.key().name(),) +\
+                          'Task fail count: %s' % (fail_count,))
 
-        bin = Bin.get_by_key_name(bin_name)
+        date_limit = task.date_created + \
+            relativedelta(hours = TASK_RETRY_HOURS)
 
-        if (bin is None):
-            raise HTTPNotFound()
+        if task.date_updated < date_limit and not is_permanent:
+            task.status = TASK_STATUS_RETRYING
+            self.response.set_status(500)
+        else:
+            task.status = TASK_STATUS_FAILED
+            self.response.set_status(200)
 
-        params = get_request_params(self.request)
-        params['date_created'] = str(datetime.utcnow())
-        task_body = json.dumps(params)
-        task_headers = {'Content-Type' : MIME_TYPE_JSON}
+        task.put()
+        notify_task_changes(task.get_bin_name())
 
-        queue_name = get_queue_name_for_bin(bin_name)
-        task_name = Task.generate_name()
+class CleanupHandler(webapp2.RequestHandler):
+    """ Base (abstract) task handler for cleaning up entities that have not
+        been updated for a specific time. Subclasses define which entities
+        are cleaned up.
 
-        task = Task(key_name=task_name)
-        task.bin = bin
-        task.status = TASK_STATUS_QUEUED
-        task.status_msg = ''
-        task.put()
+        Entities are found with a keys-only query and deleted in batches. If
+        the request deadline approaches before all entities are deleted,
+        the job is continued from the query cursor in a new task. Progress of
+        the job is recorded in a CleanupProgress entity.
+    """
 
-        taskqueue.add(url=webapp2.uri_for(ROUTE_NAME_TASK_APPEND,
-                      bin_name=bin_name),
-                      queue_name=queue_name,
-                      name=task_name,
-                      payload=task_body,
-                      headers=task_headers)
+    # Name of the cleanup job, name of the route of the handler, how long
+    # must entities be unused before they are cleaned up, in hours, and how
+    # many entities are deleted per batch
+    job_name = None
+    route_name = None
+    max_age = None
+    batch_size = CLEANUP_BATCH_SIZE
 
-        logging.debug('Added task %s for bin %s to queue %s.' % \
-                      (task_name, bin_name, queue_name))
+    def get_query(self, date_limit):
+        """ (Abstract) Constructs the keys-only query for entities to clean
+            up.
 
-        self.response.headers['Location'] = task.get_url()
+        Args:
+            date_limit: entities last updated before this datetime are
+                        cleaned up
 
-        if accept_header == MIME_TYPE_HTML:
-            self.response.set_status(303)
-        else:
-            self.response.set_status(202)
-            self.response.out.write(Task.serialize(task, bin, accept_header))
+        Returns:
+            Keys-only query for entities.
+        """
 
-class AppendHandler(webapp2.RequestHandler):
-    """ Task handler for appending data to a bin. """
+        return None
 
-    def post(self, bin_name):
-        """ Appends data to a specific bin. Appending is retried if it fails
-            until a predefined timeout occurs.
+    def delete_batch(self, keys):
+        """ Deletes a batch of entities. Subclasses may extend this method
+            to delete data associated with the entities.
 
         Args:
-            bin_name: name of bin to which data should be appended to
+            keys: list of keys of entities to delete
+
+        Returns:
+            Dictionary of counts of data deleted together with the entities,
+            by kind of data.
         """
 
-        task_name = self.request.headers['X-AppEngine-TaskName']
-        task = Task.get_by_key_name(task_name)
+        db.delete(keys)
+        return {}
 
-        if (task is None):
+    def get(self):
+        """ Deletes entities that have not been updated for a specific time,
+            starting from the cursor passed by the previous task of the job,
+            or starts a new job if no cursor is passed. If the job is started
+            by a request that is neither a task nor a cron job, e.g. when an
+            admin opens the URL in a browser, it is only queued, since such
+            requests have a much shorter deadline.
+        """
+
+        if 'X-AppEngine-QueueName' not in self.request.headers and \
+           'X-AppEngine-Cron' not in self.request.headers:
+            taskqueue.add(url=webapp2.uri_for(self.route_name),
+                          method='GET')
+
+            self.response.headers['Content-Type'] = MIME_TYPE_TEXT
+            self.response.out.write('Cleanup job %s was queued.' % \
+                                    (self.job_name,))
             return
 
-        try:
-            bin = Bin.get_by_key_name(bin_name)
+        date_started = datetime.utcnow()
+        cursor = self.request.get('cursor') or None
 
-            if (bin is None):
+        progress = CleanupProgress.get_by_key_name(self.job_name)
+
+        if cursor is None:
+            relativedelta = dateutil.relativedelta.relativedelta
+
+            if progress is not None and \
+               progress.status == CLEANUP_STATUS_RUNNING and \
+               progress.date_updated > date_started + \
+                   relativedelta(hours = -1 * CLEANUP_STALLED_HOURS):
+                logging.info('Cleanup job %s is already running.' % \
+                             (self.job_name,))
                 return
 
-            params = get_request_params(self.request)
-            params['date_created'] = \
-                dateutil.parser.parse(params['date_created'])
+            progress = CleanupProgress(key_name=self.job_name)
+            progress.date_started = date_started
+            progress.date_limit = date_started + \
+                relativedelta(hours = -1 * self.max_age)
+            progress.status = CLEANUP_STATUS_RUNNING
 
-            bin.date_updated = params['date_created']
-            bin.append_data(params)
-            bin.put()
+        elif progress is None or progress.cursor != cursor:
+            logging.warning('Cleanup job %s was superseded.' % \
+                            (self.job_name,))
+            return
 
-            task.date_updated = datetime.utcnow()
-            task.status = TASK_STATUS_COMPLETED
-            task.status_msg = ''
-            task.put()
+        query = self.get_query(progress.date_limit)
+        deleted_count = 0
+        related_counts = json.loads(progress.related_counts)
 
-        except Exception as e:
-            relativedelta = dateutil.relativedelta.relativedelta
-            task.date_updated = datetime.utcnow()
-            fail_count = self.request.headers['X-AppEngine-TaskExecutionCount']
-            task.status_msg = ('Fail count: %s. Last error: %s' % \
-                                (int(fail_count)+1, str(e)))[0:500]
+        while True:
+            if cursor is not None:
+                query.with_cursor(cursor)
+
+            keys = query.fetch(self.batch_size)
 
-            logging.exception('Error while appending data. ' +\
-                              'Task name: %s.' % (task_name,) +\
-                              'Task fail count: %s' % (fail_count,))
+            if len(keys) == 0:
+                progress.status = CLEANUP_STATUS_COMPLETED
+                cursor = None
+                break
 
-            date_limit = task.date_created + \
-                relativedelta(hours = TASK_RETRY_HOURS)
+            batch_counts = self.delete_batch(keys)
+            deleted_count += len(keys)
+            cursor = query.cursor()
 
-            if task.date_updated < date_limit:
-                task.status = TASK_STATUS_RETRYING
-                self.response.set_status(500)
-            else:
-                task.status = TASK_STATUS_FAILED
-                self.response.set_status(200)
+            for kind, count in batch_counts.items():
+                related_counts[kind] = related_counts.get(kind, 0) + count
 
-            task.put()
+            elapsed = datetime.utcnow() - date_started
+            if elapsed.total_seconds() > CLEANUP_REQUEST_SECONDS:
+                break
 
-class BinCleanupHandler(webapp2.RequestHandler):
+        progress.cursor = cursor
+        progress.deleted_count += deleted_count
+        progress.request_count += 1
+        progress.related_counts = json.dumps(related_counts)
+        progress.put()
+
+        # The progress is stored first, since the next task checks that it
+        # continues from the stored cursor
+        if cursor is not None:
+            taskqueue.add(url=webapp2.uri_for(self.route_name),
+                          method='GET',
+                          params={'cursor' : cursor})
+
+        logging.info('Cleanup job %s deleted %s entities, %s in total. '
+                     'Related data deleted in total: %s.' % \
+                     (self.job_name, deleted_count, progress.deleted_count,
+                      progress.related_counts))
+
+class BinCleanupHandler(CleanupHandler):
     """ Task handler for cleaning up unused bins. """
 
-    def get(self):
-        """ Retrieves bins that have not been updated for a specific time
-            and deletes them from the datastore.
+    job_name = CLEANUP_JOB_BINS
+    route_name = ROUTE_NAME_TASK_BIN_CLEANUP
+    max_age = BIN_CLEANUP_MAX_AGE
+    batch_size = BIN_CLEANUP_BATCH_SIZE
+
+    def get_query(self, date_limit):
+        """ Implementation of the CleanupHandler abstract method. Constructs
+            the query for bins that have not been updated for a specific time.
         """
 
-        relativedelta = dateutil.relativedelta.relativedelta
-        date_last_update = datetime.utcnow()
-        date_last_update += relativedelta(hours = -1 * BIN_CLEANUP_MAX_AGE)
-        unused_bins = Bin.all().order('-date_updated').filter(
-            'date_updated <', date_last_update).fetch(None)
+        return Bin.all(keys_only=True).filter('date_updated <', date_limit)
+
+    def delete_batch(self, keys):
+        """ Deletes a batch of bins together with their tasks, tails and
+            cached content, and the remote content of the bins if
+            BIN_CLEANUP_DELETE_REMOTE_CONTENT is enabled. A failure to delete
+            remote content is logged and counted, and doesn't prevent the
+            deletion of the bin.
+
+        Args:
+            keys: list of keys of bins to delete
+
+        Returns:
+            Dictionary of counts of deleted tasks, bins whose remote content
+            was deleted and bins whose remote content couldn't be deleted.
+        """
+
+        counts = {
+            'tasks' : 0,
+            'remote_content' : 0,
+            'remote_content_failed' : 0
+        }
+
+        for bin in db.get(keys):
+            if bin is None:
+                continue
 
-        logging.debug("Cleanup job is deleting %s bins." % len(unused_bins))
+            if BIN_CLEANUP_DELETE_REMOTE_CONTENT:
+                try:
+                    if bin.delete_content():
+                        counts['remote_content'] += 1
+                except Exception:
+                    logging.exception('Error while deleting remote content '
+                                      'of bin %s.' % (bin.key().name(),))
+                    counts['remote_content_failed'] += 1
 
-        for bin in unused_bins:
-            bin.delete()
+            counts['tasks'] += bin.delete_tasks()
+            bin.delete_cached_data()
 
-class TaskStatusCleanupHandler(webapp2.RequestHandler):
+        CleanupHandler.delete_batch(self, keys)
+
+        for key in keys:
+            BIN_CACHE.invalidate(key.name())
+
+        return counts
+
+class TaskStatusCleanupHandler(CleanupHandler):
     """ Task handler for cleaning up finished data append tasks. """
 
+    job_name = CLEANUP_JOB_TASKS
+    route_name = ROUTE_NAME_TASK_STATUS_CLEANUP
+    max_age = TASK_CLEANUP_MAX_AGE
+
+    def get_query(self, date_limit):
+        """ Implementation of the CleanupHandler abstract method. Constructs
+            the query for tasks that have not been updated for a specific
+            time.
+        """
+
+        return Task.all(keys_only=True).filter('date_updated <', date_limit)
+
+class QueueRebalanceHandler(webapp2.RequestHandler):
+    """ Task handler for reassigning bins to the task queues which the
+        consistent hash ring assigns them to, after the set of append task
+        queues was changed. Bins are processed in batches, each request
+        continuing from the cursor passed by the previous one.
+    """
+
+    def get(self):
+        """ Reassigns a batch of bins and queues a task for the next batch. """
+
+        cursor = self.request.get('cursor') or None
+
+        query = Bin.all(keys_only=True)
+        if cursor is not None:
+            query.with_cursor(cursor)
+
+        bin_keys = query.fetch(QUEUE_REBALANCE_BATCH_SIZE)
+        moved_count = 0
+
+        # Hot bins are moved back by HotBinDemotionHandler when they cool
+        # down
+        for bin_key in bin_keys:
+            if Bin.move_to_queue(bin_key.name(),
+                                 get_queue_name_for_bin(bin_key.name()),
+                                 HOT_BIN_QUEUES):
+                moved_count += 1
+
+        logging.info('Moved %s of %s bins to other queues.' % \
+                     (moved_count, len(bin_keys)))
+
+        if len(bin_keys) == QUEUE_REBALANCE_BATCH_SIZE:
+            taskqueue.add(url=webapp2.uri_for(ROUTE_NAME_TASK_QUEUE_REBALANCE),
+                          method='GET',
+                          params={'cursor' : query.cursor()})
+
+class HotBinDemotionHandler(webapp2.RequestHandler):
+    """ Task handler for moving bins which are no longer hot from dedicated
+        queues back to the queues which the consistent hash ring assigns them
+        to.
+    """
+
     def get(self):
-        """ Retrieves tasks that have not been updated for a specific time
-            and deletes them from the datastore.
+        """ Demotes hot bins which got less than HOT_BIN_DEMOTE_TASKS_PER_MINUTE
+            tasks in each of the last HOT_BIN_DEMOTE_MINUTES minutes.
         """
 
-        relativedelta = dateutil.relativedelta.relativedelta
-        date_last_update = datetime.utcnow()
-        date_last_update += relativedelta(hours = -1 * TASK_CLEANUP_MAX_AGE)
-        unchecked_tasks = Task.all().order('-date_updated').filter(
-            'date_updated <', date_last_update).fetch(None)
+        for queue_name in HOT_BIN_QUEUES:
+            bin_keys = Bin.all(keys_only=True)
+            bin_keys = bin_keys.filter('queue_name =', queue_name).fetch(None)
 
-        logging.debug("Cleanup job is deleting %s tasks." % len(unchecked_tasks))
+            for bin_key in bin_keys:
+                ingest_counts = get_ingest_counts(bin_key.name(),
+                                                  HOT_BIN_DEMOTE_MINUTES)
+
+                if max(ingest_counts) < HOT_BIN_DEMOTE_TASKS_PER_MINUTE:
+                    Bin.move_to_queue(bin_key.name(),
+                                      get_queue_name_for_bin(bin_key.name()))
+
+class QueueReportHandler(webapp2.RequestHandler):
+    """ Handler for reports of the load of append task queues. """
+
+    def get(self):
+        """ Returns the statistics of each append task queue and the number
+            of bins assigned to it. Bins which were not backfilled with their
+            queue yet are counted in the queue of the previous sharding
+            scheme, and also reported as legacy bins.
+        """
 
-        for task in unchecked_tasks:
-            task.delete()
+        # Bins without a stored queue can't be queried by queue, so they are
+        # found by excluding the bins of each queue from all bins
+        bin_keys = {}
+        for queue_name in APPEND_TASK_QUEUES + HOT_BIN_QUEUES:
+            query = Bin.all(keys_only=True)
+            query = query.filter('queue_name =', queue_name)
+            bin_keys[queue_name] = query.fetch(QUEUE_REPORT_MAX_BINS)
+
+        assigned_bin_keys = set()
+        for queue_bin_keys in bin_keys.values():
+            assigned_bin_keys.update(queue_bin_keys)
+
+        legacy_bin_keys = {}
+        for bin_key in Bin.all(keys_only=True).fetch(QUEUE_REPORT_MAX_BINS):
+            if bin_key not in assigned_bin_keys:
+                queue_name = get_legacy_queue_name_for_bin(bin_key.name())
+                legacy_bin_keys.setdefault(queue_name, []).append(bin_key)
+
+        queue_names = APPEND_TASK_QUEUES + HOT_BIN_QUEUES + \
+            [queue_name for queue_name in sorted(legacy_bin_keys.keys())
+             if queue_name not in bin_keys]
+
+        statistics = taskqueue.QueueStatistics.fetch(
+            [taskqueue.Queue(queue_name) for queue_name in queue_names])
+
+        report = []
+        for queue_statistics in statistics:
+            queue_name = queue_statistics.queue.name
+
+            legacy_bin_count = len(legacy_bin_keys.get(queue_name, []))
+            bin_count = len(bin_keys.get(queue_name, [])) + legacy_bin_count
+
+            oldest_eta = None
+            if queue_statistics.oldest_eta_usec is not None:
+                oldest_eta = datetime.utcfromtimestamp(
+                    queue_statistics.oldest_eta_usec / 1e6).strftime(
+                        DEFAULT_DATETIME_FORMAT)
+
+            report.append({
+                'queue_name' : queue_name,
+                'bins' : bin_count,
+                'legacy_bins' : legacy_bin_count,
+                'tasks' : queue_statistics.tasks,
+                'in_flight' : queue_statistics.in_flight,
+                'executed_last_minute' : queue_statistics.executed_last_minute,
+                'oldest_eta' : oldest_eta
+            })
+
+        self.response.headers['Content-Type'] = MIME_TYPE_JSON
+        self.response.set_status(200)
+        self.response.out.write(json.dumps(report, indent=JSON_INDENT))
 
 class TaskStatusHandler(webapp2.RequestHandler):
     """ Handler for status requests of a specific task. """
@@ -1815,25 +5157,153 @@ class TaskStatusHandler(webapp2.RequestHandler):
                 DEFAULT_OUTPUT_APPENDR_MIME_TYPE)
 
         bin = None
+        next_url = None
 
         if not task_name:
-            bin = Bin.get_by_key_name(bin_name)
+            bin = BIN_CACHE.get(bin_name)
 
             if (bin is None):
                 raise HTTPNotFound()
 
-            task = Task.all().filter('bin =', bin_db_key)
-            task = task.order('-date_created').fetch(None)
+            params = get_request_params(self.request)
+            limit, cursor = get_page_params(params)
+
+            task, next_cursor = fetch_page(bin.get_tasks_query(),
+                                           limit, cursor)
+
+            if next_cursor is not None:
+                next_url = get_page_url(self.request.path_url,
+                                        self.request.GET, next_cursor)
+
+            set_next_page_link(self.response, next_url)
 
         else:
-            task = Task.get_by_key_name(task_name)
+            params = get_request_params(self.request)
 
-            if (task is None):
+            validate_input_param(params, 'wait', False,
+                                 validate_positive_integer,
+                                 0)
+
+            date_limit = time.time() + \
+                         min(int(params['wait']), TASK_WAIT_MAX_SECONDS)
+
+            # The number of changes is read before the task, so that no
+            # change after reading the task is missed
+            changes = get_task_changes(bin_name)
+            task = Task.get_for_bin(bin_name, task_name)
+            bin = BIN_CACHE.get(bin_name)
+
+            if (task is None or bin is None):
                 raise HTTPNotFound()
 
+            # Long-poll: wait until the task is executed, or until the
+            # requested time has passed
+            while task.status in [TASK_STATUS_QUEUED, TASK_STATUS_RETRYING]:
+                new_changes = wait_for_task_changes(bin_name, changes,
+                                                    date_limit)
+                if new_changes == changes:
+                    break
+
+                changes = new_changes
+                task = Task.get_for_bin(bin_name, task_name)
+
+                if (task is None):
+                    raise HTTPNotFound()
+
+        if isinstance(task, Task):
+            tasks_etag_values = task.get_etag_values()
+        else:
+            tasks_etag_values = [listed_task.get_etag_values()
+                                 for listed_task in task]
+
+        etag = get_etag(accept_header, next_url, bin.get_etag_values(),
+                        tasks_etag_values, bin.get_rate_limit_info())
+
+        if is_not_modified(self.request, self.response, etag):
+            return
+
         self.response.headers['Content-Type'] = accept_header
         self.response.set_status(200)
-        self.response.out.write(Task.serialize(task, bin, accept_header))
+        write_content(self.request, self.response,
+                      Task.serialize(task, bin, accept_header, next_url))
+
+class TaskEventsHandler(webapp2.RequestHandler):
+    """ Handler for streams of server-sent events about the tasks of a bin.
+    """
+
+    def options(self, bin_name):
+        setHTTPOptionsResponse(response=self.response)
+
+    def get(self, bin_name):
+        """ Returns a stream of server-sent events with the most recent tasks
+            of a bin, a "task" event with the task object for each task. The
+            stream starts with the current tasks, unless the client has
+            already received them according to the Last-Event-ID header, and
+            continues with the tasks whose status changes.
+
+            Responses are buffered by App Engine and sent to the client only
+            when they are complete, so the stream ends as soon as there are
+            changes, or after TASK_WAIT_MAX_SECONDS. Clients reconnect to
+            the stream to receive further events.
+
+        Args:
+            bin_name: name of bin whose tasks are streamed
+        """
+
+        self.response.headers.add_header('Access-Control-Allow-Origin', '*')
+
+        bin = BIN_CACHE.get(bin_name)
+
+        if (bin is None):
+            raise HTTPNotFound()
+
+        date_limit = time.time() + TASK_WAIT_MAX_SECONDS
+
+        # The number of changes is read before the tasks, so that no change
+        # after reading the tasks is missed
+        changes = get_task_changes(bin_name)
+        tasks = bin.get_tasks_query().fetch(BIN_INFO_TASKS_LIMIT)
+
+        events = ['retry: %s\n\n' % (TASK_EVENTS_RETRY_MILLISECONDS,)]
+
+        if self.request.headers.get('Last-Event-ID') != str(changes):
+            events.extend(self.get_task_events(bin, tasks, changes))
+
+        tasks_etag_values = dict((task.key(), task.get_etag_values())
+                                 for task in tasks)
+
+        while len(events) == 1:
+            new_changes = wait_for_task_changes(bin_name, changes, date_limit)
+            if new_changes == changes:
+                break
+
+            changes = new_changes
+            tasks = [task for task in
+                     bin.get_tasks_query().fetch(BIN_INFO_TASKS_LIMIT)
+                     if tasks_etag_values.get(task.key()) != \
+                         task.get_etag_values()]
+            events.extend(self.get_task_events(bin, tasks, changes))
+
+        self.response.headers['Content-Type'] = MIME_TYPE_EVENT_STREAM
+        self.response.headers['Cache-Control'] = 'no-cache'
+        self.response.out.write(''.join(events))
+
+    def get_task_events(self, bin, tasks, changes):
+        """ Constructs the server-sent events for tasks, oldest first.
+
+        Args:
+            bin: the Bin that tasks belong to
+            tasks: list of Tasks, newest first
+            changes: number of changes of the tasks of bin, used as the id
+                     of the events, see get_task_changes
+
+        Returns:
+            List of strings, one per event.
+        """
+
+        return ['id: %s\nevent: task\ndata: %s\n\n' % \
+                (changes, json.dumps(task.get_info(bin)))
+                for task in reversed(tasks)]
 
 class MainHandler(webapp2.RequestHandler):
     """ Handler for the main page and root API endpoint. """
@@ -1926,6 +5396,11 @@ class OAuthGitHubTokenHandler(webapp2.RequestHandler):
 
         scope = result.headers['X-OAuth-Scopes']
 
+        user_id = str(json.loads(result.content)['id'])
+        for storage_backend in [STORAGE_BACKEND_GIST,
+                                STORAGE_BACKEND_GITHUB_REPO]:
+            Bin.cache_user_id(storage_backend, access_token, user_id)
+
         template = JINJA_ENVIRONMENT.get_template(TEMPLATE_OAUTH_TOKEN)
         resp_content = template.render({
             'service' : 'GitHub ' + scope,
@@ -1979,7 +5454,12 @@ class OAuthDropboxTokenHandler(webapp2.RequestHandler):
             raise status_map[result.status_code](\
                 'Error while creating Dropbox OAuth token. \n' + result.content)
 
-        access_token = json.loads(result.content)['access_token']
+        json_content = json.loads(result.content)
+        access_token = json_content['access_token']
+
+        Bin.cache_user_id(STORAGE_BACKEND_DROPBOX, access_token,
+                          str(json_content['uid']))
+
         template = JINJA_ENVIRONMENT.get_template(TEMPLATE_OAUTH_TOKEN)
         resp_content = template.render({
             'service' : 'Dropbox',
@@ -2006,6 +5486,18 @@ app = webapp2.WSGIApplication([
                   handler=DataHandler,
                   name=ROUTE_NAME_BIN),
 
+    webapp2.Route('/bins/<bin_name:\w+>/content',
+                  handler=ContentHandler,
+                  name=ROUTE_NAME_BIN_CONTENT),
+
+    webapp2.Route('/bins/<bin_name:\w+>/data',
+                  handler=TailHandler,
+                  name=ROUTE_NAME_BIN_DATA),
+
+    webapp2.Route('/bins/<bin_name:\w+>/events',
+                  handler=TaskEventsHandler,
+                  name=ROUTE_NAME_TASK_EVENTS),
+
     webapp2.Route('/bins/<bin_name:\w+>/tasks',
                   handler=TaskStatusHandler,
                   defaults={'task_name' : None},
@@ -2027,6 +5519,18 @@ app = webapp2.WSGIApplication([
                   handler=TaskStatusCleanupHandler,
                   name=ROUTE_NAME_TASK_STATUS_CLEANUP),
 
+    webapp2.Route('/tasks/rebalance_queues',
+                  handler=QueueRebalanceHandler,
+                  name=ROUTE_NAME_TASK_QUEUE_REBALANCE),
+
+    webapp2.Route('/tasks/queue_report',
+                  handler=QueueReportHandler,
+                  name=ROUTE_NAME_TASK_QUEUE_REPORT),
+
+    webapp2.Route('/tasks/demote_hot_bins',
+                  handler=HotBinDemotionHandler,
+                  name=ROUTE_NAME_TASK_HOT_BIN_DEMOTION),
+
     webapp2.Route('/oauth_token_github',
                   handler=OAuthGitHubTokenHandler,
                   name=ROUTE_NAME_OAUTH_GITHUB),
@@ -2037,5 +5541,6 @@ app = webapp2.WSGIApplication([
 ], debug=DEBUG)
 
 # Register the error handler with specific HTTP error codes
-for error_code in [400, 401, 403,404, 405, 406, 415, 422, 500, 501, 503]:
+for error_code in [400, 401, 403, 404, 405, 406, 409, 413, 415, 422, 500, 501,
+                   503]:
     app.error_handlers[error_code] = handle_error
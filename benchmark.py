@@ -0,0 +1,534 @@
+""" Benchmark of Appendr's ingest and append path.
+
+Runs the appendr WSGI application on top of the App Engine testbed stubs
+(datastore, memcache and task queues), with all urlfetch calls redirected to
+an in-process fake of the GitHub Gist, GitHub contents and Dropbox APIs. Data
+is posted to a bin at a configurable rate, the append tasks are executed from
+the task queue stub, and the throughput, task latency and traffic to the
+storage backend are reported.
+
+Usage:
+
+    python benchmark.py --sdk /path/to/google_appengine \\
+        --storage-backend github-gist --records 1000 --rate 50
+
+Run with --help for all options.
+"""
+
+import argparse
+import base64
+import imp
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
+import urlparse
+
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Dropbox share URLs are resolved to a URL of this format
+FAKE_DROPBOX_SHARE_URL = 'https://db.tt/%s'
+FAKE_DROPBOX_FINAL_URL = 'https://www.dropbox.com/s/%s/%s'
+
+# Id of the user that owns all fake storage
+FAKE_USER_ID = 1
+
+################################################################################
+# Fake storage service
+################################################################################
+
+class FakeResponse(object):
+    """ A response with the attributes of urlfetch responses that appendr
+        uses.
+    """
+
+    def __init__(self, status_code, content='', headers=None, final_url=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.final_url = final_url
+
+class FakeStorageService(object):
+    """ In-process fake of the parts of the GitHub Gist, GitHub contents and
+        Dropbox APIs that appendr calls. Every call is delayed by a fixed
+        latency, files larger than max_object_size are rejected and the
+        number of calls and bytes sent in each direction are counted.
+    """
+
+    def __init__(self, latency, max_object_size):
+        self.latency = latency
+        self.max_object_size = max_object_size
+        self.files = {}
+        self.versions = {}
+        self.calls = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def store(self, path, content):
+        """ Stores a file and returns its new version.
+
+        Args:
+            path: path of file
+            content: new content of file
+
+        Returns:
+            String version of the stored content, or None if the content is
+            larger than the maximum object size.
+        """
+
+        if self.max_object_size and len(content) > self.max_object_size:
+            return None
+
+        self.files[path] = content
+        self.versions[path] = self.versions.get(path, 0) + 1
+        return '%s-%s' % (abs(hash(path)), self.versions[path])
+
+    def version(self, path):
+        """ Gets the current version of a file. """
+
+        return '%s-%s' % (abs(hash(path)), self.versions[path])
+
+    def fetch(self, url, payload=None, method='GET', headers=None, **kwargs):
+        """ Replacement for urlfetch.fetch.
+
+        Args:
+            url: URL of the API resource
+            payload: request body
+            method: HTTP method
+            headers: request headers
+
+        Returns:
+            FakeResponse for the API call.
+        """
+
+        time.sleep(self.latency)
+        self.calls += 1
+        self.bytes_sent += len(payload or '')
+
+        response = self.dispatch(url, payload, method)
+        self.bytes_received += len(response.content)
+        return response
+
+    def dispatch(self, url, payload, method):
+        """ Routes an API call to the fake of the called API. """
+
+        parsed_url = urlparse.urlparse(url)
+        parts = parsed_url.path.strip('/').split('/')
+
+        if parsed_url.netloc == 'api.github.com':
+            if parts == ['user']:
+                return FakeResponse(200, json.dumps({'id' : FAKE_USER_ID}))
+            elif parts[0] == 'gists':
+                return self.gist(parts[1:], payload, method)
+            elif parts[0] == 'repos':
+                return self.repo('/'.join(parts[1:]), payload, method)
+
+        elif parsed_url.netloc in ['api.dropbox.com',
+                                   'api-content.dropbox.com']:
+            return self.dropbox(parts[1:], payload, method)
+
+        elif parsed_url.netloc == 'db.tt':
+            return FakeResponse(200, final_url=FAKE_DROPBOX_FINAL_URL % \
+                                (parts[0], 'data'))
+
+        return FakeResponse(404, 'Not found: ' + url)
+
+    def gist(self, parts, payload, method):
+        """ Fake of the GitHub Gist API. """
+
+        if len(parts) == 0:
+            gist_id = str(len(self.files) + 1)
+            body = json.loads(payload)
+            for filename, gist_file in body['files'].items():
+                self.store(gist_id + '/' + filename, gist_file['content'])
+            return FakeResponse(201, json.dumps({
+                'id' : gist_id,
+                'user' : {'id' : FAKE_USER_ID}}))
+
+        gist_id = parts[0]
+        gist_files = dict((path.split('/', 1)[1], content)
+                          for path, content in self.files.items()
+                          if path.startswith(gist_id + '/'))
+        gist_version = max([self.version(gist_id + '/' + filename)
+                            for filename in gist_files])
+
+        if parts[1:] == ['commits']:
+            return FakeResponse(200, json.dumps([{'version' : gist_version}]))
+
+        if method == 'GET':
+            return FakeResponse(200, json.dumps({
+                'files' : dict((filename, {'content' : content})
+                               for filename, content in gist_files.items()),
+                'history' : [{'version' : gist_version}]}))
+
+        body = json.loads(payload)
+        for filename, gist_file in body['files'].items():
+            gist_version = self.store(gist_id + '/' + filename,
+                                      gist_file['content'])
+            if gist_version is None:
+                return FakeResponse(422, 'File too large.')
+
+        return FakeResponse(200, json.dumps({
+            'history' : [{'version' : gist_version}]}))
+
+    def repo(self, path, payload, method):
+        """ Fake of the GitHub repository contents API. """
+
+        if method == 'GET':
+            if path not in self.files:
+                return FakeResponse(404, 'Not found.')
+            return FakeResponse(200, json.dumps({
+                'content' : base64.b64encode(self.files[path]),
+                'sha' : self.version(path)}))
+
+        body = json.loads(payload)
+
+        if path in self.files and body.get('sha') != self.version(path):
+            return FakeResponse(409, 'Conflict.')
+
+        status_code = 200 if path in self.files else 201
+        sha = self.store(path, base64.b64decode(body['content']))
+
+        if sha is None:
+            return FakeResponse(422, 'File too large.')
+
+        return FakeResponse(status_code,
+                            json.dumps({'content' : {'sha' : sha}}))
+
+    def dropbox(self, parts, payload, method):
+        """ Fake of the Dropbox API. """
+
+        api = parts[0]
+        path = '/'.join(parts[2:])
+
+        if api == 'account':
+            return FakeResponse(200, json.dumps({'uid' : FAKE_USER_ID}))
+
+        elif api == 'shares':
+            return FakeResponse(200, json.dumps({
+                'url' : FAKE_DROPBOX_SHARE_URL % (abs(hash(path)),)}))
+
+        elif api == 'metadata':
+            return FakeResponse(200, json.dumps({'rev' : self.version(path)}))
+
+        elif api == 'files':
+            metadata = json.dumps({'rev' : self.version(path)})
+            return FakeResponse(200, self.files[path],
+                                {'x-dropbox-metadata' : metadata})
+
+        elif api == 'files_put':
+            rev = self.store(path, payload)
+            if rev is None:
+                return FakeResponse(413, 'File too large.')
+            return FakeResponse(200, json.dumps({'rev' : rev}))
+
+        return FakeResponse(404, 'Not found.')
+
+################################################################################
+# Benchmark
+################################################################################
+
+def setup_environment(sdk_path, local_fs_root=None):
+    """ Makes the App Engine SDK importable, activates the testbed stubs and
+        imports appendr.
+
+    Args:
+        sdk_path: path of the App Engine SDK, or None if it is already on
+                  sys.path
+        local_fs_root: directory for the data of local-fs bins, or None if
+                       the local-fs storage backend is not enabled
+
+    Returns:
+        Tuple of the appendr module and the task queue stub.
+    """
+
+    if sdk_path is not None:
+        sys.path.insert(0, sdk_path)
+        import dev_appserver
+        dev_appserver.fix_sys_path()
+
+    sys.path.insert(0, ROOT_DIR)
+
+    from google.appengine.datastore import datastore_stub_util
+    from google.appengine.ext import testbed
+
+    bed = testbed.Testbed()
+    bed.activate()
+    bed.setup_env(app_id='appendr')
+    bed.init_datastore_v3_stub(
+        consistency_policy=datastore_stub_util.PseudoRandomHRConsistencyPolicy(
+            probability=1))
+    bed.init_memcache_stub()
+    bed.init_taskqueue_stub(root_path=ROOT_DIR)
+
+    # appendr_cfg only holds OAuth app secrets, which the fake services ignore
+    try:
+        imp.find_module('appendr_cfg', [ROOT_DIR])
+    except ImportError:
+        appendr_cfg = imp.new_module('appendr_cfg')
+        appendr_cfg.github_client_id = 'benchmark'
+        appendr_cfg.github_client_secret = 'benchmark'
+        appendr_cfg.dropbox_client_id = 'benchmark'
+        appendr_cfg.dropbox_client_secret = 'benchmark'
+        sys.modules['appendr_cfg'] = appendr_cfg
+
+    # The local-fs storage backend is registered only if it is configured
+    if local_fs_root is not None:
+        import appendr_cfg
+        appendr_cfg.local_fs_root = local_fs_root
+
+    import appendr
+
+    return appendr, bed.get_stub(testbed.TASKQUEUE_SERVICE_NAME)
+
+def create_bin(appendr, args):
+    """ Creates a bin through the appendr API.
+
+    Returns:
+        Name of the created bin.
+    """
+
+    params = {
+        'storage_backend' : args.storage_backend,
+        'output_format' : args.output_format,
+        'api_token' : 'benchmark',
+        'repo' : 'benchmark/benchmark'
+    }
+
+    response = appendr.app.get_response('/bins',
+                                        method='POST',
+                                        body=json.dumps(params),
+                                        content_type=appendr.MIME_TYPE_JSON,
+                                        headers={'Accept' : 'application/json'})
+
+    if response.status_int != 201:
+        raise Exception('Could not create bin:\n' + response.body)
+
+    return json.loads(response.body)['bin_id']
+
+def make_records(args, index):
+    """ Constructs the key-value data of one append request. """
+
+    value = 'x' * args.value_size
+    return [{'index' : str(index*args.batch + i), 'value' : value}
+            for i in range(args.batch)]
+
+def run_tasks(appendr, taskqueue_stub, pending_tasks, completed, failed):
+    """ Executes all append tasks in the task queues which are due, and
+        records the completion time of tasks which got completed and the
+        tasks which failed or were deleted.
+
+    Args:
+        appendr: the appendr module
+        taskqueue_stub: the task queue stub
+        pending_tasks: dict of Task keys to creation times of tasks which are
+                       not completed yet
+        completed: list to which latencies of completed tasks are added
+        failed: list to which keys of failed or deleted tasks are added
+
+    Returns:
+        Number of executed task requests.
+    """
+
+    executed = 0
+
+    for queue_name in taskqueue_stub.GetQueues():
+        for queued_task in taskqueue_stub.GetTasks(queue_name['name']):
+            # Tasks which were queued again with a countdown wait for it
+            if queued_task['eta_usec'] > time.time() * 1e6:
+                continue
+
+            headers = dict(queued_task['headers'])
+            headers['X-AppEngine-QueueName'] = queue_name['name']
+            headers['X-AppEngine-TaskName'] = queued_task['name']
+            headers['X-AppEngine-TaskExecutionCount'] = '0'
+
+            response = appendr.app.get_response(
+                queued_task['url'],
+                method=queued_task['method'],
+                body=base64.b64decode(queued_task.get('body', '')),
+                headers=headers)
+
+            executed += 1
+
+            if response.status_int < 300:
+                taskqueue_stub.DeleteTask(queue_name['name'],
+                                          queued_task['name'])
+
+    now = time.time()
+    task_keys = pending_tasks.keys()
+    tasks = appendr.db.get(task_keys)
+    for task_key, task in zip(task_keys, tasks):
+        if task is None or task.status == appendr.TASK_STATUS_FAILED:
+            pending_tasks.pop(task_key)
+            failed.append(task_key)
+        elif task.status == appendr.TASK_STATUS_COMPLETED:
+            completed.append(now - pending_tasks.pop(task_key))
+
+    return executed
+
+def get_document_sizes(args, storage):
+    """ Gets the sizes of the files stored by the storage backend, in bytes.
+    """
+
+    if args.storage_backend != 'local-fs':
+        return [len(content) for content in storage.files.values()]
+
+    return [os.path.getsize(os.path.join(dirpath, filename))
+            for dirpath, _, filenames in os.walk(args.local_fs_root)
+            for filename in filenames]
+
+def percentile(values, fraction):
+    """ Gets a percentile of a list of values. """
+
+    values = sorted(values)
+    if len(values) == 0:
+        return float('nan')
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def benchmark_ingest(args):
+    """ Posts data to a bin at a fixed rate, executes the append tasks and
+        prints the throughput, task latency and storage traffic.
+    """
+
+    if args.storage_backend == 'local-fs':
+        args.local_fs_root = tempfile.mkdtemp(prefix='appendr-benchmark-')
+    else:
+        args.local_fs_root = None
+
+    appendr, taskqueue_stub = setup_environment(args.sdk, args.local_fs_root)
+
+    storage = FakeStorageService(args.latency, args.max_object_size)
+    appendr.urlfetch.fetch = storage.fetch
+
+    bin_name = create_bin(appendr, args)
+    initial_calls, initial_bytes = \
+        storage.calls, storage.bytes_sent + storage.bytes_received
+
+    pending_tasks = {}
+    completed = []
+    failed = []
+    executed = 0
+    requests = args.records / args.batch
+    start = time.time()
+
+    for index in range(requests):
+        # wait until the next request is due, running tasks in the meantime
+        while time.time() < start + float(index) / args.rate:
+            if pending_tasks:
+                executed += run_tasks(appendr, taskqueue_stub,
+                                      pending_tasks, completed, failed)
+            else:
+                time.sleep(0.001)
+
+        response = appendr.app.get_response(
+            '/bins/' + bin_name,
+            method='POST',
+            body=json.dumps(make_records(args, index)),
+            content_type=appendr.MIME_TYPE_JSON,
+            headers={'Accept' : 'application/json'})
+
+        if response.status_int != 202:
+            raise Exception('Could not append data:\n' + response.body)
+
+        task = appendr.Task.get_for_bin(
+            bin_name, json.loads(response.body)['task_id'])
+        pending_tasks[task.key()] = time.time()
+
+        if not args.async_tasks:
+            executed += run_tasks(appendr, taskqueue_stub,
+                                  pending_tasks, completed, failed)
+
+    while pending_tasks:
+        task_executions = run_tasks(appendr, taskqueue_stub,
+                                    pending_tasks, completed, failed)
+        executed += task_executions
+
+        # wait for tasks which were queued again with a countdown
+        if task_executions == 0:
+            time.sleep(0.01)
+
+    elapsed = time.time() - start
+    calls = storage.calls - initial_calls
+    transferred = storage.bytes_sent + storage.bytes_received - initial_bytes
+
+    print 'storage backend:         %s (%s)' % (args.storage_backend,
+                                                 args.output_format)
+    print 'records appended:        %s in %s requests' % (args.records,
+                                                          requests)
+    print 'task executions:         %s' % (executed,)
+    print 'tasks failed:            %s of %s' % (len(failed), requests)
+    print 'elapsed:                 %.2f s' % (elapsed,)
+    print 'appends/sec:             %.1f' % (args.records / elapsed,)
+    print 'task latency p50:        %.3f s' % (percentile(completed, 0.5),)
+    print 'task latency p99:        %.3f s' % (percentile(completed, 0.99),)
+    print 'backend calls/append:    %.3f' % (float(calls) / args.records,)
+    print 'bytes transferred/append: %.0f' % \
+        (float(transferred) / args.records,)
+    print 'final document size:     %s bytes' % \
+        (max(get_document_sizes(args, storage) or [0]),)
+
+def benchmark_append_data(args):
+    """ Measures the CPU cost of appending a record to documents of
+        increasing size in each output format.
+    """
+
+    appendr, _ = setup_environment(args.sdk)
+
+    record = {'date_created' : datetime.utcnow(),
+              'key1' : 'foo',
+              'key2' : 'bar'}
+
+    for output_format in appendr.SUPPORTED_OUTPUT_EXTERNAL_DATA_MIME_TYPES:
+        for size in [100, 1000, 10000, 100000]:
+            content = appendr.OUTPUT_FORMATS_EMPTY_DATA[output_format]
+            content = appendr.append_data(content, output_format,
+                                          [record] * size)
+
+            seconds = min(timeit.repeat(
+                lambda: appendr.append_data(content, output_format, [record]),
+                number=10, repeat=3)) / 10
+
+            print '%-22s %7s records %9s bytes: %8.3f ms/append' % \
+                (output_format, size, len(content), seconds * 1000)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sdk', default=None,
+                        help='path of the App Engine SDK')
+    parser.add_argument('--mode', choices=['ingest', 'append-data'],
+                        default='ingest',
+                        help='benchmark the whole ingest path or only the '
+                             'CPU cost of append_data')
+    parser.add_argument('--storage-backend', default='github-gist',
+                        choices=['github-gist', 'github-repo', 'dropbox',
+                                 'local-fs'])
+    parser.add_argument('--output-format', default='application/json')
+    parser.add_argument('--records', type=int, default=1000,
+                        help='number of records to append')
+    parser.add_argument('--batch', type=int, default=1,
+                        help='number of records per append request')
+    parser.add_argument('--rate', type=float, default=50,
+                        help='append requests per second')
+    parser.add_argument('--value-size', type=int, default=32,
+                        help='size of the value of each record, in bytes')
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='latency of each storage API call, in seconds')
+    parser.add_argument('--max-object-size', type=int, default=None,
+                        help='largest file the fake storage accepts, in bytes')
+    parser.add_argument('--async-tasks', action='store_true',
+                        help='run tasks only while waiting for the next '
+                             'request, so that tasks can be coalesced')
+    args = parser.parse_args()
+
+    if args.mode == 'ingest':
+        benchmark_ingest(args)
+    else:
+        benchmark_append_data(args)
+
+if __name__ == '__main__':
+    main()